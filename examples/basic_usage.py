@@ -19,13 +19,7 @@ sequences = [
     "1", "1", "1"
 ]
 
-alphabet = pl.get_alphabet(sequences)
-states = pl.get_initial_states(sequences) 
-
-pathway_matrix = pl.get_transition_matrix(
-    sequences, 
-    alphabet, 
-)
+pathway_matrix, states, alphabet, prefix_states = pl.build_ppta(sequences)
 
 learned_matrix, learned_states, tracking = pl.alergia(
     pathway_matrix,
@@ -6,19 +6,47 @@ learning probabilistic deterministic finite automata using ALERGIA.
 from ._validation import (
     _validate_alpha,
     _validate_alphabet,
+    _iter_sequence_counts,
     _validate_sequences,
     _validate_states_for_merging,
     _validate_transition_matrix,
 )
 
 from .ppta import (
+    PPTA,
+    build_ppta,
+    encode_sequences,
     get_alphabet,
     get_initial_states,
     get_state_paths,
     get_transition_matrix,
+    read_sequences,
+    update_transition_matrix,
 )
 
+from .matrix_formats import (
+    DeltaTable,
+    load_delta_table,
+    save_delta_table,
+    to_delta_table,
+    to_dense_transition_matrix,
+    to_sparse_transition_matrix,
+)
+
+from .state_registry import StateRegistry
+
+from .merge_engine import MergeEngine
+
+from .compatibility_cache import CompatibilityCache
+
+from .red_blue_fringe import RedBlueFringe
+
 from .state_statistics import (
+    StateStatistics,
+    get_all_endpoints,
+    get_all_n,
+    get_all_pi,
+    get_all_pi_endpoints,
     get_endpoint,
     get_n,
     get_pi,
@@ -32,6 +60,7 @@ from .state_merging import (
     get_blue_states,
     get_pairs_to_check,
     hoeffding_bound,
+    hoeffding_bound_mask,
     merge_two_states,
     recursive_merge_two_states,
 )
@@ -60,10 +89,30 @@ from .evaluation import (
 from .visualisation import network_visualisation
 
 __all__ = [
+    "PPTA",
+    "build_ppta",
+    "encode_sequences",
     "get_alphabet",
     "get_initial_states",
     "get_state_paths",
     "get_transition_matrix",
+    "read_sequences",
+    "update_transition_matrix",
+    "DeltaTable",
+    "load_delta_table",
+    "save_delta_table",
+    "to_delta_table",
+    "to_dense_transition_matrix",
+    "to_sparse_transition_matrix",
+    "StateRegistry",
+    "MergeEngine",
+    "CompatibilityCache",
+    "RedBlueFringe",
+    "StateStatistics",
+    "get_all_endpoints",
+    "get_all_n",
+    "get_all_pi",
+    "get_all_pi_endpoints",
     "get_endpoint",
     "get_n",
     "get_pi",
@@ -72,6 +121,7 @@ __all__ = [
     "get_blue_states",
     "get_pairs_to_check",
     "hoeffding_bound",
+    "hoeffding_bound_mask",
     "merge_two_states",
     "recursive_merge_two_states",
     "alergia",
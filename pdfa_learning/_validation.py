@@ -8,7 +8,13 @@ intended for use by other modules within the package rather than as part
 of the public interface.
 """
 
+import os
+from collections.abc import Mapping
+
 import numpy as np
+import scipy.sparse as sp
+
+from .matrix_formats import DeltaTable
 
 
 def _validate_sequences(sequences):
@@ -52,6 +58,264 @@ def _validate_sequences(sequences):
     return sequences
 
 
+def _iter_sequence_counts(sequences):
+    """
+    Lazily validates observed or pre-aggregated input sequences for a PPTA.
+
+    Sequences may be supplied as individual observations, as a mapping
+    from sequence to count such as a ``collections.Counter``, or as an
+    iterable of ``(sequence, count)`` pairs. Individual observations and
+    pairs may be mixed. The sequences are never materialised, so
+    generators and open files are consumed in a single pass. Each element
+    is validated as it is yielded.
+
+    Parameters
+    ----------
+    sequences : iterable of str, mapping or iterable of tuple
+        Sequences from which the PPTA is constructed.
+
+    Returns
+    -------
+    iterator of tuple
+        The validated ``(sequence, count)`` pairs. Repeated sequences are
+        not aggregated.
+
+    Raises
+    ------
+    TypeError
+        If sequences is None, is a single string, or is not iterable.
+        When they are reached, non-string sequences and non-integer counts
+        raise TypeError, and an empty input or a count that is not
+        positive raises ValueError.
+    """
+    iterator, pairs = _iter_sequence_elements(sequences)
+
+    return _generate_sequence_counts(iterator, pairs=pairs)
+
+
+def _iter_sequence_elements(sequences):
+    """
+    Return an iterator over the unvalidated elements of input sequences.
+
+    Parameters
+    ----------
+    sequences : iterable of str, mapping or iterable of tuple
+        Sequences from which the PPTA is constructed.
+
+    Returns
+    -------
+    iterator : iterator
+        Iterator over the sequences, pairs or mapping items.
+    pairs : bool
+        True if every element is a ``(sequence, count)`` pair, as for the
+        items of a mapping.
+
+    Raises
+    ------
+    TypeError
+        If sequences is None, is a single string, or is not iterable.
+    """
+    if sequences is None:
+        raise TypeError("sequences must be an iterable of strings.")
+
+    if isinstance(sequences, str):
+        raise TypeError(
+            "sequences must be an iterable of strings, not a single string."
+        )
+
+    if isinstance(sequences, Mapping):
+        return iter(sequences.items()), True
+
+    try:
+        iterator = iter(sequences)
+    except TypeError as exc:
+        raise TypeError("sequences must be an iterable of strings.") from exc
+
+    return iterator, False
+
+
+def _is_sequence_count_pair(element):
+    """
+    Return whether a tuple is a ``(sequence, count)`` pair.
+
+    A tuple of tokens such as ``("ADM", "DIS")`` is itself a sequence, so a
+    tuple is only read as a pair when it has two elements, the first is a
+    sequence and the second is not a string token.
+
+    Parameters
+    ----------
+    element : object
+        Element of the input sequences.
+
+    Returns
+    -------
+    bool
+        True if element is a ``(sequence, count)`` pair.
+    """
+    return (
+        isinstance(element, tuple)
+        and len(element) == 2
+        and isinstance(element[0], (str, list, tuple, np.ndarray))
+        and not isinstance(element[1], str)
+    )
+
+
+def _sequence_kind(sequence):
+    """
+    Return the kind of a validated sequence.
+
+    Parameters
+    ----------
+    sequence : str, list or tuple
+        Sequence of single-character symbols, string tokens or integer
+        codes.
+
+    Returns
+    -------
+    str or None
+        ``"string"``, ``"tokens"`` or ``"codes"``, or None for an empty
+        sequence, which may appear with sequences of any kind.
+
+    Raises
+    ------
+    TypeError
+        If the elements of a list or tuple are neither all strings nor all
+        integers.
+    """
+    if isinstance(sequence, str):
+        return "string" if sequence else None
+
+    if not sequence:
+        return None
+
+    if all(isinstance(token, str) for token in sequence):
+        return "tokens"
+
+    if all(
+        isinstance(token, (int, np.integer)) and not isinstance(token, bool)
+        for token in sequence
+    ):
+        return "codes"
+
+    raise TypeError(
+        "every sequence must be a string, a list of tokens or an integer array."
+    )
+
+
+def _combine_sequence_kinds(corpus_kind, kind):
+    """
+    Return the kind of a corpus after another sequence is added.
+
+    Parameters
+    ----------
+    corpus_kind : str or None
+        Kind of the sequences seen so far, or None if all were empty.
+    kind : str or None
+        Kind of the added sequence, as returned by ``_sequence_kind``.
+
+    Returns
+    -------
+    str or None
+        Kind of the corpus.
+
+    Raises
+    ------
+    ValueError
+        If the kinds differ.
+    """
+    if kind is None or corpus_kind is None or kind == corpus_kind:
+        return corpus_kind if kind is None else kind
+
+    if "codes" in (kind, corpus_kind):
+        raise ValueError(
+            "sequences must not mix integer-coded and symbol sequences."
+        )
+
+    raise ValueError("sequences must not mix strings and lists of tokens.")
+
+
+def _generate_sequence_counts(iterator, pairs=False):
+    """
+    Yield validated ``(sequence, count)`` pairs from an iterator.
+
+    A sequence is a string of single-character symbols, a list or tuple of
+    string tokens, or a list, tuple or one-dimensional NumPy array of
+    integer codes that index an alphabet. A tuple is read as a
+    ``(sequence, count)`` pair when it has two elements, the first is a
+    sequence and the second is not a string. Integer arrays are converted
+    to lists so that every yielded sequence can be iterated cheaply. All
+    non-empty sequences must be of the same kind.
+
+    Parameters
+    ----------
+    iterator : iterator
+        Iterator over sequences or ``(sequence, count)`` pairs.
+    pairs : bool, default=False
+        If True, every element is a ``(sequence, count)`` pair, as for the
+        items of a mapping.
+
+    Yields
+    ------
+    tuple
+        The validated ``(sequence, count)`` pairs.
+
+    Returns
+    -------
+    str or None
+        Kind of the non-empty sequences, as returned by ``_sequence_kind``,
+        which is the value of the generator once it is exhausted.
+
+    Raises
+    ------
+    TypeError
+        If an element is not a sequence or a ``(sequence, int)`` pair, a
+        token is neither a string nor an integer code, or an array is not
+        a one-dimensional integer array.
+    ValueError
+        If the iterator is empty, a count is not positive, or sequences of
+        different kinds are mixed.
+    """
+    is_empty = True
+    corpus_kind = None
+
+    for element in iterator:
+        if pairs or _is_sequence_count_pair(element):
+            pair = element
+        else:
+            pair = (element, 1)
+
+        if not isinstance(pair[0], (str, list, tuple, np.ndarray)):
+            raise TypeError(
+                "every sequence must be a string, a list of tokens or an "
+                "integer array."
+            )
+
+        if isinstance(pair[0], np.ndarray):
+            if pair[0].ndim != 1 or not np.issubdtype(pair[0].dtype, np.integer):
+                raise TypeError(
+                    "integer-coded sequences must be one-dimensional integer "
+                    "arrays."
+                )
+
+            pair = (pair[0].tolist(), pair[1])
+
+        if isinstance(pair[1], bool) or not isinstance(pair[1], (int, np.integer)):
+            raise TypeError("every sequence count must be an integer.")
+
+        if pair[1] <= 0:
+            raise ValueError("every sequence count must be positive.")
+
+        corpus_kind = _combine_sequence_kinds(corpus_kind, _sequence_kind(pair[0]))
+
+        is_empty = False
+        yield pair
+
+    if is_empty:
+        raise ValueError("sequences must contain at least one sequence.")
+
+    return corpus_kind
+
+
 def _validate_alphabet(alphabet):
     """
     Validates the input alphabet for a PPTA.
@@ -72,8 +336,14 @@ def _validate_alphabet(alphabet):
         If alphabet is None, is a single string, or contains
         non-string elements.
     ValueError
-        If alphabet is empty, contains non-single-character strings,
-        or contains duplicate symbols.
+        If alphabet is empty, contains empty strings, or contains
+        duplicate symbols.
+
+    Notes
+    -----
+    Symbols may contain several characters, such as activity codes. Such
+    symbols are matched against token sequences, while string sequences
+    are read one character at a time.
     """
     if alphabet is None:
         raise TypeError("alphabet must be an iterable of strings.")
@@ -91,8 +361,8 @@ def _validate_alphabet(alphabet):
     if not all(isinstance(symbol, str) for symbol in alphabet):
         raise TypeError("every alphabet symbol must be a string.")
 
-    if not all(len(symbol) == 1 for symbol in alphabet):
-        raise ValueError("every alphabet symbol must contain exactly one character.")
+    if not all(len(symbol) > 0 for symbol in alphabet):
+        raise ValueError("every alphabet symbol must be a non-empty string.")
 
     if len(alphabet) != len(set(alphabet)):
         raise ValueError("alphabet must not contain duplicate symbols.")
@@ -106,9 +376,11 @@ def _validate_transition_matrix(transition_matrix, alphabet, states):
 
     Parameters
     ----------
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Three-dimensional transition-count matrix with shape
-        ``(n_symbols, n_states, n_states)``.
+        ``(n_symbols, n_states, n_states)``, a list containing one sparse
+        matrix with shape ``(n_states, n_states)`` per symbol, or a delta
+        table.
     alphabet : collection
         Alphabet associated with the first dimension of the transition
         matrix.
@@ -119,13 +391,24 @@ def _validate_transition_matrix(transition_matrix, alphabet, states):
     Raises
     ------
     TypeError
-        If transition_matrix is not a NumPy array.
+        If transition_matrix is not a NumPy array, a list of SciPy sparse
+        matrices or a DeltaTable.
     ValueError
         If transition_matrix is not three-dimensional, its final two
         dimensions are not equal, its dimensions do not agree with
         alphabet or states, or it contains non-finite or negative
         values.
     """
+    if isinstance(transition_matrix, DeltaTable):
+        _validate_delta_table(transition_matrix, alphabet, states)
+        return
+
+    if isinstance(transition_matrix, (list, tuple)) and any(
+        sp.issparse(m) for m in transition_matrix
+    ):
+        _validate_sparse_transition_matrix(transition_matrix, alphabet, states)
+        return
+
     if not isinstance(transition_matrix, np.ndarray):
         raise TypeError("transition_matrix must be a NumPy array.")
 
@@ -152,6 +435,120 @@ def _validate_transition_matrix(transition_matrix, alphabet, states):
         raise ValueError("transition_matrix must not contain negative values.")
 
 
+def _validate_sparse_transition_matrix(transition_matrix, alphabet, states):
+    """
+    Validate a sparse transition-count matrix and its dimensions.
+
+    Parameters
+    ----------
+    transition_matrix : list of scipy.sparse.csr_array
+        One sparse matrix with shape ``(n_states, n_states)`` per symbol.
+    alphabet : collection
+        Alphabet associated with the list of sparse matrices.
+    states : collection
+        State identifiers associated with the dimensions of each sparse
+        matrix.
+
+    Raises
+    ------
+    TypeError
+        If any element of transition_matrix is not a SciPy CSR matrix.
+    ValueError
+        If the number of matrices does not equal len(alphabet), any
+        matrix is not square with len(states) rows, or any matrix contains
+        non-finite or negative values.
+    """
+    if not all(
+        sp.issparse(m) and m.format == "csr" for m in transition_matrix
+    ):
+        raise TypeError(
+            "A sparse transition_matrix must be a list of SciPy CSR matrices."
+        )
+
+    if len(transition_matrix) != len(alphabet):
+        raise ValueError(
+            "The first transition_matrix dimension must equal len(alphabet)."
+        )
+
+    for m in transition_matrix:
+        if m.shape[0] != m.shape[1]:
+            raise ValueError(
+                "The final two transition_matrix dimensions must be equal."
+            )
+
+        if m.shape[0] != len(states):
+            raise ValueError(
+                "The transition_matrix state dimensions must equal len(states)."
+            )
+
+        if not np.all(np.isfinite(m.data)):
+            raise ValueError("transition_matrix must contain only finite values.")
+
+        if np.any(m.data < 0):
+            raise ValueError("transition_matrix must not contain negative values.")
+
+
+def _validate_delta_table(delta_table, alphabet, states):
+    """
+    Validate a delta table and its dimensions.
+
+    Parameters
+    ----------
+    delta_table : DeltaTable
+        Destination, count and terminating-count arrays of a deterministic
+        automaton.
+    alphabet : collection
+        Alphabet associated with the columns of the delta table.
+    states : collection
+        State identifiers associated with the rows of the delta table.
+
+    Raises
+    ------
+    TypeError
+        If any array is not a NumPy array or destinations does not have an
+        integer dtype.
+    ValueError
+        If the array shapes do not agree with alphabet and states, a
+        destination is out of range, or the counts contain non-finite or
+        negative values.
+    """
+    destinations, counts, final_counts = delta_table
+
+    if not all(isinstance(a, np.ndarray) for a in delta_table):
+        raise TypeError("The delta table arrays must be NumPy arrays.")
+
+    if not np.issubdtype(destinations.dtype, np.integer):
+        raise TypeError("The delta table destinations must be integers.")
+
+    if destinations.shape != (len(states), len(alphabet)):
+        raise ValueError(
+            "The delta table destinations and counts must have shape "
+            "(len(states), len(alphabet))."
+        )
+
+    if counts.shape != destinations.shape:
+        raise ValueError(
+            "The delta table destinations and counts must have shape "
+            "(len(states), len(alphabet))."
+        )
+
+    if final_counts.shape != (len(states),):
+        raise ValueError(
+            "The delta table final_counts must have shape (len(states),)."
+        )
+
+    if np.any(destinations < -1) or np.any(destinations >= len(states)):
+        raise ValueError(
+            "The delta table destinations must be state indices or -1."
+        )
+
+    if not np.all(np.isfinite(counts)) or not np.all(np.isfinite(final_counts)):
+        raise ValueError("transition_matrix must contain only finite values.")
+
+    if np.any(counts < 0):
+        raise ValueError("transition_matrix must not contain negative values.")
+
+
 def _validate_alpha(alpha):
     """
     Validate the alpha parameter for Hoeffding bound calculations.
@@ -177,6 +574,30 @@ def _validate_alpha(alpha):
         raise ValueError("alpha must be in the range (0, 2].")
 
 
+def _validate_min_count(min_count):
+    """
+    Validate the minimum count of a merge candidate.
+
+    Parameters
+    ----------
+    min_count : int
+        Smallest number of sequences entering a state for the state to be
+        considered for merging.
+
+    Raises
+    ------
+    TypeError
+        If min_count is not an integer.
+    ValueError
+        If min_count is negative.
+    """
+    if isinstance(min_count, bool) or not isinstance(min_count, (int, np.integer)):
+        raise TypeError("min_count must be an integer.")
+
+    if min_count < 0:
+        raise ValueError("min_count must be non-negative.")
+
+
 def _validate_states_for_merging(q1, q2, states):
     """
     Validate two states before performing a state merge.
@@ -207,4 +628,84 @@ def _validate_states_for_merging(q1, q2, states):
         raise ValueError("q1 and q2 must refer to different states.")
 
     if q1 == "*" or q2 == "*":
-        raise ValueError("The artificial initial state '*' cannot be merged.")
\ No newline at end of file
+        raise ValueError("The artificial initial state '*' cannot be merged.")
+
+
+def _validate_n_jobs(n_jobs):
+    """
+    Validate and resolve the number of worker processes to use.
+
+    Parameters
+    ----------
+    n_jobs : int or None
+        Number of worker processes. ``None`` and ``1`` run in the current
+        process, while ``-1`` uses every available CPU.
+
+    Returns
+    -------
+    int
+        The resolved number of worker processes.
+
+    Raises
+    ------
+    TypeError
+        If n_jobs is not an integer or None.
+    ValueError
+        If n_jobs is zero or less than -1.
+    """
+    if n_jobs is None:
+        return 1
+
+    if isinstance(n_jobs, bool) or not isinstance(n_jobs, (int, np.integer)):
+        raise TypeError("n_jobs must be an integer or None.")
+
+    if n_jobs == -1:
+        return os.cpu_count() or 1
+
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be a positive integer or -1.")
+
+    return int(n_jobs)
+
+
+def _validate_pruning(min_count, max_depth, pruning):
+    """
+    Validate the prefix pruning options of the PPTA builders.
+
+    Parameters
+    ----------
+    min_count : int
+        Minimum number of sequences that must share a prefix for it to
+        become a state.
+    max_depth : int or None
+        Maximum prefix length represented by a state, or None for no
+        limit.
+    pruning : {"truncate", "sink"}
+        How the pruned prefixes are represented.
+
+    Raises
+    ------
+    TypeError
+        If min_count is not an integer, or max_depth is not an integer or
+        None.
+    ValueError
+        If min_count is less than 1, max_depth is negative, or pruning is
+        not "truncate" or "sink".
+    """
+    if isinstance(min_count, bool) or not isinstance(min_count, (int, np.integer)):
+        raise TypeError("min_count must be an integer.")
+
+    if min_count < 1:
+        raise ValueError("min_count must be a positive integer.")
+
+    if max_depth is not None:
+        if isinstance(max_depth, bool) or not isinstance(
+            max_depth, (int, np.integer)
+        ):
+            raise TypeError("max_depth must be an integer or None.")
+
+        if max_depth < 0:
+            raise ValueError("max_depth must be non-negative.")
+
+    if pruning not in {"truncate", "sink"}:
+        raise ValueError("pruning must be either 'truncate' or 'sink'.")
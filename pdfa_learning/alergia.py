@@ -7,17 +7,41 @@ both the Carrasco and Oncina all pairs methodology and the de la Higuera
 red-blue framework methodology.
 """
 
+import heapq
+import multiprocessing
+import time
+
+import numpy as np
+
 from ._validation import (
     _validate_alpha,
     _validate_alphabet,
+    _validate_min_count,
+    _validate_n_jobs,
     _validate_transition_matrix,
 )
 from .state_merging import (
+    _below_min_count,
+    _fold_in_place,
+    _hoeffding_mask,
     _recursive_merge_two_states,
     get_blue_states,
     get_pairs_to_check,
     hoeffding_bound,
+    hoeffding_bound_mask,
 )
+from .compatibility_cache import CompatibilityCache, _cached_test
+from .merge_engine import MergeEngine
+from .red_blue_fringe import RedBlueFringe
+from .state_registry import StateRegistry
+from .state_statistics import StateStatistics
+
+# Number of carrasco pairs screened against the Hoeffding bound at once.
+_SCREEN_CHUNK_SIZE = 65536
+
+# Number of states below which de_la_higuera tries the red states in the
+# current process, where forking workers costs more than the trial merges.
+_PARALLEL_MIN_STATES = 10000
 
 
 def alergia(
@@ -27,6 +51,11 @@ def alergia(
     alpha,
     output_level="Suppressed",
     method="carrasco",
+    incremental=False,
+    cache=False,
+    blue_order=None,
+    min_count=0,
+    n_jobs=None,
 ):
     """
     Learn a probabilistic deterministic finite automaton using ALERGIA.
@@ -37,10 +66,12 @@ def alergia(
 
     Parameters
     ----------
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
-        ``(n_symbols, n_states, n_states)``.
-    states : list
+        ``(n_symbols, n_states, n_states)``, one sparse matrix per symbol,
+        or a delta table. A memory-mapped delta table is read a chunk of
+        rows at a time, and the learned delta table is held in memory.
+    states : list or StateRegistry
         State identifiers corresponding to the final two dimensions of
         transition_matrix.
     alphabet : iterable of str
@@ -64,26 +95,74 @@ def alergia(
         test presented by Carrasco and Oncina [1]_, while ``"de_la_higuera"`` 
         follows the red-blue merge formulation presented by de la Higuera [2]_. 
         See the Notes and References sections for further information.
+    incremental : bool, default=False
+        Used only by the ``"carrasco"`` method. If False, every pair of
+        states is checked again from the first pair after each successful
+        merge. If True, the remaining pairs are kept after a merge and only
+        the pairs involving a state whose counts changed are checked again,
+        so pairs that have already failed are not retested. This is faster
+        on large automata but may learn a different automaton.
+    cache : bool, default=False
+        If True, the result of every Hoeffding test is cached together with
+        version stamps of the two states' counts, and a pair is only tested
+        again once a merge has changed one of its states. The learned
+        automaton is unchanged, and tracking also reports the number of
+        cache hits and misses.
+    blue_order : {None, "identifier", "frequency"}, default=None
+        Used only by the ``"de_la_higuera"`` method, to choose the blue
+        state compared with the red states at each step. ``"identifier"``
+        and None take the blue state with the smallest identifier, while
+        ``"frequency"`` takes the blue state entered by the most sequences,
+        ``n(q)``, whose merge decisions rest on the most evidence. When
+        blue_order is not None, tracking also reports the order and the
+        wall-clock time taken, so that orders can be compared.
+    min_count : int, default=0
+        Frequency threshold, written ``t0`` by Carrasco and Oncina. A pair
+        of states in which either state is entered by fewer than
+        min_count sequences, ``n(q)``, carries too little evidence for the
+        Hoeffding test to reject it, so it is treated as compatible
+        without being tested. The same rule applies to the pairs compared
+        by the carrasco and de_la_higuera methods and to the pairs folded
+        by a recursive merge, so a low-count state is merged with the
+        first state whose recursive merge succeeds.
+    n_jobs : int, optional
+        Used only by the ``"de_la_higuera"`` method. Number of worker
+        processes used to evaluate a blue state against the red states.
+        When more than one red state passes the Hoeffding screen, the
+        recursive merge with each of them is tried in a worker on a
+        forked copy of the automaton and then undone, and the first red
+        state in the usual order whose merge succeeds is merged, so the
+        learned automaton does not depend on n_jobs. ``None`` and ``1``
+        try the red states one at a time, while ``-1`` uses every
+        available CPU. Automata of fewer than 10000 states are learned in
+        the current process. Ignored when output_level is ``"Full"``,
+        which prints the recursive merges in order, and on platforms
+        without the fork start method. With cache, the cache hits and misses
+        count only the tests made in the current process.
 
     Returns
     -------
-    current_matrix : np.ndarray
-        Final transition-count matrix.
-    current_states : list
+    current_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Final transition-count matrix, in the same format as
+        transition_matrix.
+    current_states : StateRegistry
         Final state identifiers after ALERGIA terminates.
     tracking : dict
         Summary statistics containing the initial and final state counts,
         attempted and successful merges, recursive merge attempts, and
-        recursive merge failures.
+        recursive merge failures. When cache is True, it also contains the
+        number of cache hits and misses, and when blue_order is given, the
+        blue-state order and the elapsed time in seconds.
 
     Raises
     ------
     TypeError
-        If alpha is not numeric, transition_matrix is not a NumPy array, or
-        alphabet has an invalid type.
+        If alpha is not numeric, min_count or n_jobs is not an integer,
+        transition_matrix is not a NumPy array, a list of SciPy sparse
+        matrices or a DeltaTable, or alphabet has an invalid type.
     ValueError
-        If output_level or method is invalid, alpha is outside ``(0, 2]``, or
-        alphabet or transition_matrix has invalid contents or dimensions.
+        If output_level, method or blue_order is invalid, alpha is outside ``(0, 2]``,
+        min_count is negative, n_jobs is zero or less than -1, or alphabet or transition_matrix has invalid contents or dimensions.
 
     Notes 
     ----- 
@@ -109,125 +188,104 @@ def alergia(
     if method not in valid_methods:
         raise ValueError("method must be either 'carrasco' or 'de_la_higuera'.")
 
-    _validate_alpha(alpha)
+    valid_blue_orders = {None, "identifier", "frequency"}
 
-    alphabet = _validate_alphabet(alphabet)
+    if blue_order not in valid_blue_orders:
+        raise ValueError("blue_order must be None, 'identifier' or 'frequency'.")
 
-    _validate_transition_matrix(transition_matrix, alphabet, states)
+    start_time = time.perf_counter()
 
-    if method == "carrasco":
-        current_matrix = transition_matrix
-        current_states = states
+    _validate_alpha(alpha)
 
-        initial_state_count = len(current_states)
+    _validate_min_count(min_count)
 
-        to_check = get_pairs_to_check(states)
+    n_jobs = _validate_n_jobs(n_jobs)
 
-        merge_counter = 0
-        iter_counter = 0
-        attempted_merge_counter = 0
-        recursive_attempt_counter = 0
-        recursive_failure_counter = 0
+    alphabet = _validate_alphabet(alphabet)
 
-        while to_check:
-            pair = to_check[0]
+    _validate_transition_matrix(transition_matrix, alphabet, states)
 
-            if output_level in ("Full", "Truncated"):
-                print(
-                    "The next pair of states to check is:",
-                    pair,
-                )
+    # State positions are looked up through a hash index, and the counts of
+    # every state are summed once and then updated by each merge. States are
+    # merged in place by a merge engine, and the merged matrix is built once
+    # learning has finished. A delta table is read into the engine a chunk
+    # of rows at a time rather than converted to another format first.
+    states = StateRegistry(states)
+    statistics = StateStatistics(transition_matrix, states)
+    engine = MergeEngine(transition_matrix, states, statistics=statistics)
+    cache = CompatibilityCache(statistics) if cache else None
 
-            if output_level == "Full":
-                iter_counter += 1
-                print("Iteration", iter_counter)
+    if method == "carrasco":
+        current_matrix = engine
+        current_states = engine.states
 
-            attempted_merge_counter += 1
+        initial_state_count = len(current_states)
 
-            if hoeffding_bound(
-                pair[0],
-                pair[1],
-                alpha,
+        counts = {
+            "attempted_merges": 0,
+            "successful_merges": 0,
+            "recursive_merge_attempts": 0,
+            "recursive_merge_failures": 0,
+        }
+
+        if incremental:
+            current_matrix, current_states = _carrasco_incremental(
                 current_matrix,
+                current_states,
+                alpha,
                 alphabet,
+                output_level,
+                statistics,
+                counts,
+                cache,
+                min_count,
+            )
+
+        else:
+            current_matrix, current_states = _carrasco_restart(
+                current_matrix,
                 current_states,
-            ):
-                if output_level in ("Full", "Truncated"):
-                    print(
-                        "Hoeffding Bound satisfied for",
-                        pair,
-                    )
-
-                recursive_attempt_counter += 1
-
-                (
-                    current_matrix,
-                    current_states,
-                    recursive_merge,
-                ) = _recursive_merge_two_states(
-                    pair[0],
-                    pair[1],
-                    current_matrix,
-                    current_states,
-                    alpha,
-                    alphabet,
-                    output_level=output_level,
-                    method="carrasco",
-                )
-
-                if recursive_merge:
-                    merge_counter += 1
-
-                    if output_level in ("Full", "Truncated"):
-                        print(
-                            "Recursively merged states. Successfully merged",
-                            pair,
-                        )
-
-                    to_check = get_pairs_to_check(current_states)
-
-                else:
-                    recursive_failure_counter += 1
-
-                    if output_level in ("Full", "Truncated"):
-                        print(
-                            "Recursive merge process failed. Cannot merge",
-                            pair,
-                        )
-
-                    to_check.pop(0)
-
-            else:
-                if output_level in ("Full", "Truncated"):
-                    print(
-                        "Hoeffding Bound not satisfied for",
-                        pair,
-                    )
+                alpha,
+                alphabet,
+                output_level,
+                statistics,
+                counts,
+                cache,
+                min_count,
+            )
 
-                to_check.pop(0)
+        if isinstance(current_matrix, MergeEngine):
+            current_matrix, current_states = current_matrix.compact()
 
         tracking = {
             "initial_states": initial_state_count,
             "final_states": len(current_states),
-            "attempted_merges": attempted_merge_counter,
-            "successful_merges": merge_counter,
-            "recursive_merge_attempts": recursive_attempt_counter,
-            "recursive_merge_failures": recursive_failure_counter,
+            **counts,
         }
 
+        if cache is not None:
+            tracking["cache_hits"] = cache.hits
+            tracking["cache_misses"] = cache.misses
+
         return current_matrix, current_states, tracking
 
     # de_la_higuera method using red and blue states
-    current_matrix = transition_matrix
-    current_states = states
+    current_matrix = engine
+    current_states = engine.states
 
     initial_state_count = len(current_states)
 
     red_states = [0]
+    fringe = RedBlueFringe(
+        current_matrix,
+        red_states,
+        key=_blue_order_key(blue_order, statistics),
+    )
     blue_states = get_blue_states(
         current_matrix,
         red_states,
         current_states,
+        fringe=fringe,
     )
 
     merge_counter = 0
@@ -236,80 +294,162 @@ def alergia(
     recursive_attempt_counter = 0
     recursive_failure_counter = 0
 
-    while len(blue_states) > 0:
-        if output_level == "Full":
-            iter_counter += 1
-            print("Iteration", iter_counter)
+    # Trial merges run in forked worker processes, which inherit the
+    # engine as it was when they were started.
+    parallel = (
+        n_jobs > 1
+        and output_level != "Full"
+        and "fork" in multiprocessing.get_all_start_methods()
+    )
+    pool = None
 
-        q2 = blue_states[0]
-        merged = False
+    try:
+        while len(blue_states) > 0:
+            if output_level == "Full":
+                iter_counter += 1
+                print("Iteration", iter_counter)
 
-        for q1 in red_states:
-            attempted_merge_counter += 1
+            q2 = blue_states[0] if fringe.key is None else fringe.first()
+            merged = False
 
-            if hoeffding_bound(
-                q1,
-                q2,
+            screen = hoeffding_bound_mask(
+                [(q1, q2) for q1 in red_states],
                 alpha,
                 current_matrix,
                 alphabet,
                 current_states,
+                statistics=statistics,
+                min_count=min_count,
+            )
+
+            trials = None
+
+            if (
+                parallel
+                and len(current_states) >= _PARALLEL_MIN_STATES
+                and np.count_nonzero(screen) > 1
             ):
-                if output_level in ("Full", "Truncated"):
-                    print(
-                        "Hoeffding Bound satisfied for",
-                        (q1, q2),
+                if pool is None:
+                    pool = _start_trial_pool(
+                        n_jobs,
+                        current_matrix,
+                        alpha,
+                        alphabet,
+                        min_count,
                     )
 
-                recursive_attempt_counter += 1
-
-                (
-                    current_matrix,
-                    current_states,
-                    recursive_merge,
-                    red_states,
-                ) = _recursive_merge_two_states(
-                    q1,
-                    q2,
-                    current_matrix,
-                    current_states,
-                    alpha,
-                    alphabet,
-                    red_states,
-                    output_level=output_level,
-                    method="de_la_higuera",
+                trials = pool.imap(
+                    _trial_merge,
+                    [
+                        (q1, q2)
+                        for q1, compatible in zip(red_states, screen)
+                        if compatible
+                    ],
                 )
 
-                if recursive_merge:
-                    merge_counter += 1
+            for q1, compatible in zip(red_states, screen):
+                attempted_merge_counter += 1
+                trial = next(trials) if compatible and trials is not None else True
 
+                if compatible and (
+                    _below_min_count(
+                        (q1, q2),
+                        min_count,
+                        current_matrix,
+                        current_states,
+                        statistics=statistics,
+                    )
+                    or _cached_test(
+                        cache,
+                        hoeffding_bound,
+                        q1,
+                        q2,
+                        alpha,
+                        current_matrix,
+                        alphabet,
+                        current_states,
+                        statistics=statistics,
+                    )
+                ):
                     if output_level in ("Full", "Truncated"):
                         print(
-                            "Recursively merged states. Successfully merged",
+                            "Hoeffding Bound satisfied for",
                             (q1, q2),
                         )
 
-                    merged = True
-                    break
+                    recursive_attempt_counter += 1
+
+                    # The trial failed on the worker's copy of the automaton,
+                    # so the merge would only be rolled back here.
+                    if not trial:
+                        recursive_failure_counter += 1
+                        continue
+
+                    (
+                        current_matrix,
+                        current_states,
+                        recursive_merge,
+                        red_states,
+                    ) = _recursive_merge_two_states(
+                        q1,
+                        q2,
+                        current_matrix,
+                        current_states,
+                        alpha,
+                        alphabet,
+                        red_states,
+                        output_level=output_level,
+                        method="de_la_higuera",
+                        statistics=statistics,
+                        cache=cache,
+                        min_count=min_count,
+                    )
 
-                recursive_failure_counter += 1
+                    if recursive_merge:
+                        merge_counter += 1
+                        fringe.update(red_states)
 
-        if merged == False:
-            red_states.append(q2)
-            red_states = sorted(red_states)
+                        # The workers hold copies of the automaton from before
+                        # the merge, so new ones are forked when next needed.
+                        if pool is not None:
+                            pool.terminate()
+                            pool = None
 
-            if output_level in ("Full", "Truncated"):
-                print(
-                    "Could not merge blue state",
-                    q2,
-                    "with any red state.",
-                )
+                        if output_level in ("Full", "Truncated"):
+                            print(
+                                "Recursively merged states. Successfully merged",
+                                (q1, q2),
+                            )
 
-        blue_states = get_blue_states(
-            current_matrix,
-            red_states,
-            current_states,
-        )
+                        merged = True
+                        break
+
+                    recursive_failure_counter += 1
+
+            if merged == False:
+                fringe.promote(q2)
+                red_states = fringe.red
+
+                if output_level in ("Full", "Truncated"):
+                    print(
+                        "Could not merge blue state",
+                        q2,
+                        "with any red state.",
+                    )
+
+            blue_states = get_blue_states(
+                current_matrix,
+                red_states,
+                current_states,
+                fringe=fringe,
+            )
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    if isinstance(current_matrix, MergeEngine):
+        current_matrix, current_states = current_matrix.compact()
 
     tracking = {
         "initial_states": initial_state_count,
@@ -320,4 +460,555 @@ def alergia(
         "recursive_merge_failures": recursive_failure_counter,
     }
 
-    return current_matrix, current_states, tracking
\ No newline at end of file
+    if cache is not None:
+        tracking["cache_hits"] = cache.hits
+        tracking["cache_misses"] = cache.misses
+
+    if blue_order is not None:
+        tracking["blue_order"] = blue_order
+        tracking["elapsed_time"] = time.perf_counter() - start_time
+
+    return current_matrix, current_states, tracking
+
+
+# Engine, significance level, alphabet and minimum count used by the trial
+# merges, set while the worker processes are forked so that they inherit them.
+_TRIAL_CONTEXT = None
+
+
+def _start_trial_pool(n_jobs, engine, alpha, alphabet, min_count):
+    """
+    Fork worker processes that try recursive merges on a copy of an engine.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Number of worker processes.
+    engine : MergeEngine
+        Engine holding the current automaton. Each worker inherits a
+        copy-on-write copy of it, so it is not sent to the workers.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    alphabet : collection of str
+        Alphabet of the automaton.
+    min_count : int
+        Pairs with a state entered by fewer than min_count sequences are
+        merged without the Hoeffding test.
+
+    Returns
+    -------
+    multiprocessing.pool.Pool
+        Pool whose workers run ``_trial_merge``.
+    """
+    global _TRIAL_CONTEXT
+
+    _TRIAL_CONTEXT = (engine, alpha, alphabet, min_count)
+
+    try:
+        return multiprocessing.get_context("fork").Pool(n_jobs)
+    finally:
+        _TRIAL_CONTEXT = None
+
+
+def _trial_merge(pair):
+    """
+    Try a recursive merge in a worker process and undo it.
+
+    Parameters
+    ----------
+    pair : tuple
+        Red state and blue state to merge.
+
+    Returns
+    -------
+    bool
+        True if the recursive merge of the pair succeeds.
+    """
+    engine, alpha, alphabet, min_count = _TRIAL_CONTEXT
+    checkpoint = engine.checkpoint()
+
+    recursive_merge, _ = _fold_in_place(
+        pair[0],
+        pair[1],
+        engine,
+        alpha,
+        alphabet,
+        min_count=min_count,
+    )
+
+    engine.rollback(checkpoint)
+
+    return recursive_merge
+
+
+def _blue_order_key(blue_order, statistics):
+    """
+    Return the key ordering the blue states of the red-blue procedure.
+
+    Parameters
+    ----------
+    blue_order : {None, "identifier", "frequency"}
+        Blue-state order passed to ``alergia``.
+    statistics : StateStatistics
+        Statistics of the current states.
+
+    Returns
+    -------
+    callable or None
+        Function of a state identifier whose smallest value is taken
+        first, or None to take blue states in identifier order.
+    """
+    if blue_order == "frequency":
+        return lambda q: (-statistics.n(q), q)
+
+    return None
+
+
+def _carrasco_restart(
+    current_matrix,
+    current_states,
+    alpha,
+    alphabet,
+    output_level,
+    statistics,
+    counts,
+    cache,
+    min_count,
+):
+    """
+    Run the carrasco method, restarting from the first pair after each merge.
+
+    Parameters
+    ----------
+    current_matrix : MergeEngine
+        Engine holding the automaton to learn.
+    current_states : StateRegistry
+        Current state identifiers.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    alphabet : collection of str
+        Alphabet of the automaton.
+    output_level : {"Suppressed", "Truncated", "Full"}
+        Amount of progress information printed.
+    statistics : StateStatistics
+        Statistics of the current states.
+    counts : dict
+        Merge counters, updated in place.
+    cache : CompatibilityCache or None
+        Cache of Hoeffding test results.
+    min_count : int
+        Pairs with a state entered by fewer than min_count sequences are
+        compatible without the Hoeffding test.
+
+    Returns
+    -------
+    current_matrix : MergeEngine, np.ndarray or list of scipy.sparse.csr_array
+        Learned automaton.
+    current_states : list
+        State identifiers of the learned automaton.
+    """
+    # Pairs are screened against the Hoeffding bound in chunks, starting
+    # from the current pair, so a merge only discards the screen of the
+    # chunk it was found in. A failed recursive merge restores the
+    # statistics, so the screen stays valid until a merge succeeds.
+    pair_states, pair_rows = _pair_rows(current_states, statistics)
+    n_pairs = len(pair_states) * (len(pair_states) - 1) // 2
+    chunk_start = 0
+    screen = np.zeros(0, dtype=bool)
+    position = 0
+
+    while position < n_pairs:
+        if position >= chunk_start + len(screen):
+            chunk_start = position
+            screen = _screen_pairs(
+                pair_rows,
+                chunk_start,
+                min(chunk_start + _SCREEN_CHUNK_SIZE, n_pairs),
+                statistics,
+                alpha,
+                min_count,
+            )
+
+        offset = position - chunk_start
+
+        if output_level == "Suppressed":
+            # Without progress output, pairs failing the screen are
+            # discarded in bulk up to the next candidate pair.
+            candidates = np.flatnonzero(screen[offset:])
+
+            if len(candidates) == 0:
+                counts["attempted_merges"] += len(screen) - offset
+                position = chunk_start + len(screen)
+                continue
+
+            counts["attempted_merges"] += int(candidates[0])
+            position += int(candidates[0])
+            offset += int(candidates[0])
+
+        j, i = _pair_index(position)
+
+        current_matrix, current_states, merged = _attempt_merge(
+            (pair_states[j], pair_states[i]),
+            screen[offset],
+            current_matrix,
+            current_states,
+            alpha,
+            alphabet,
+            output_level,
+            statistics,
+            counts,
+            cache,
+            min_count,
+        )
+
+        if merged:
+            pair_states, pair_rows = _pair_rows(current_states, statistics)
+            n_pairs = len(pair_states) * (len(pair_states) - 1) // 2
+            chunk_start = 0
+            screen = np.zeros(0, dtype=bool)
+            position = 0
+
+        else:
+            position += 1
+
+    return current_matrix, current_states
+
+
+def _pair_rows(states, statistics):
+    """
+    Return the states paired by the carrasco method and their rows.
+
+    Parameters
+    ----------
+    states : StateRegistry
+        Current state identifiers, including the artificial initial state
+        ``"*"``.
+    statistics : StateStatistics
+        Statistics of the current states.
+
+    Returns
+    -------
+    pair_states : list
+        State identifiers other than ``"*"``, in the order of states.
+    pair_rows : np.ndarray
+        Statistics row of each state of pair_states.
+    """
+    pair_states = [q for q in states if q != "*"]
+    rows = statistics.rows
+    pair_rows = np.fromiter(
+        (rows[q] for q in pair_states),
+        dtype=np.intp,
+        count=len(pair_states),
+    )
+
+    return pair_states, pair_rows
+
+
+def _pair_index(position):
+    """
+    Return the states of a pair from its position in ``get_pairs_to_check``.
+
+    Pair ``(pair_states[j], pair_states[i])`` with ``i < j`` is found at
+    position ``j * (j - 1) // 2 + i``.
+
+    Parameters
+    ----------
+    position : int or np.ndarray
+        Positions of pairs.
+
+    Returns
+    -------
+    j : int or np.ndarray
+        Index of the later state of each pair.
+    i : int or np.ndarray
+        Index of the earlier state of each pair.
+    """
+    j = ((1 + np.sqrt(1 + 8 * np.asarray(position, dtype=float))) // 2).astype(
+        np.intp
+    )
+
+    # Correct any rounding of the square root.
+    j = j - (j * (j - 1) // 2 > position)
+    j = j + ((j + 1) * j // 2 <= position)
+    i = position - j * (j - 1) // 2
+
+    if np.ndim(j) == 0:
+        return int(j), int(i)
+
+    return j, i
+
+
+def _screen_pairs(pair_rows, start, stop, statistics, alpha, min_count):
+    """
+    Screen a range of carrasco pairs against the Hoeffding bound.
+
+    Parameters
+    ----------
+    pair_rows : np.ndarray
+        Statistics rows returned by ``_pair_rows``.
+    start : int
+        Position of the first pair to screen.
+    stop : int
+        Position after the last pair to screen.
+    statistics : StateStatistics
+        Statistics of the current states.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    min_count : int
+        Pairs with a state entered by fewer than min_count sequences are
+        compatible without the Hoeffding test.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask that is True for every pair in the range satisfying
+        the bound or having a state below min_count.
+    """
+    j, i = _pair_index(np.arange(start, stop))
+
+    return _hoeffding_mask(statistics, pair_rows[j], pair_rows[i], alpha, min_count)
+
+
+def _carrasco_incremental(
+    current_matrix,
+    current_states,
+    alpha,
+    alphabet,
+    output_level,
+    statistics,
+    counts,
+    cache,
+    min_count,
+):
+    """
+    Run the carrasco method with an incremental worklist of pairs.
+
+    Pairs are taken from a heap in the order of ``get_pairs_to_check``.
+    After a successful merge, the pairs involving a removed state are
+    discarded as they reach the top of the heap, and only the pairs
+    involving a state whose counts changed are added again.
+
+    Parameters
+    ----------
+    current_matrix : MergeEngine
+        Engine holding the automaton to learn.
+    current_states : StateRegistry
+        Current state identifiers.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    alphabet : collection of str
+        Alphabet of the automaton.
+    output_level : {"Suppressed", "Truncated", "Full"}
+        Amount of progress information printed.
+    statistics : StateStatistics
+        Statistics of the current states.
+    counts : dict
+        Merge counters, updated in place.
+    cache : CompatibilityCache or None
+        Cache of Hoeffding test results.
+    min_count : int
+        Pairs with a state entered by fewer than min_count sequences are
+        compatible without the Hoeffding test.
+
+    Returns
+    -------
+    current_matrix : MergeEngine, np.ndarray or list of scipy.sparse.csr_array
+        Learned automaton.
+    current_states : list
+        State identifiers of the learned automaton.
+    """
+    rows = statistics.rows
+
+    # Pairs are ordered by the row of their later state and then the row of
+    # their earlier state, which is the order of get_pairs_to_check.
+    worklist = [
+        ((rows[q1], rows[q2]), (q1, q2))
+        for q1, q2 in get_pairs_to_check(current_states)
+    ]
+    heapq.heapify(worklist)
+    queued = {pair for _, pair in worklist}
+
+    while worklist:
+        _, pair = heapq.heappop(worklist)
+        queued.discard(pair)
+
+        if pair[0] not in rows or pair[1] not in rows:
+            continue
+
+        checkpoint = statistics.checkpoint()
+
+        current_matrix, current_states, merged = _attempt_merge(
+            pair,
+            True,
+            current_matrix,
+            current_states,
+            alpha,
+            alphabet,
+            output_level,
+            statistics,
+            counts,
+            cache,
+            min_count,
+        )
+
+        if not merged:
+            continue
+
+        for q in statistics.merged_since(checkpoint):
+            if q not in rows:
+                continue
+
+            for x in current_states:
+                if x == "*" or x == q:
+                    continue
+
+                if rows[q] > rows[x]:
+                    new_pair, key = (q, x), (rows[q], rows[x])
+                else:
+                    new_pair, key = (x, q), (rows[x], rows[q])
+
+                if new_pair not in queued:
+                    heapq.heappush(worklist, (key, new_pair))
+                    queued.add(new_pair)
+
+    return current_matrix, current_states
+
+
+def _attempt_merge(
+    pair,
+    screened,
+    current_matrix,
+    current_states,
+    alpha,
+    alphabet,
+    output_level,
+    statistics,
+    counts,
+    cache,
+    min_count,
+):
+    """
+    Test a pair of states and merge them recursively if they are compatible.
+
+    Parameters
+    ----------
+    pair : tuple
+        Pair of states to check.
+    screened : bool
+        False if the pair is already known to fail the Hoeffding bound.
+    current_matrix : MergeEngine, np.ndarray or list of scipy.sparse.csr_array
+        Current automaton.
+    current_states : list
+        Current state identifiers.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    alphabet : collection of str
+        Alphabet of the automaton.
+    output_level : {"Suppressed", "Truncated", "Full"}
+        Amount of progress information printed.
+    statistics : StateStatistics
+        Statistics of the current states.
+    counts : dict
+        Merge counters, updated in place.
+    cache : CompatibilityCache or None
+        Cache of Hoeffding test results.
+    min_count : int
+        Pairs with a state entered by fewer than min_count sequences are
+        compatible without the Hoeffding test.
+
+    Returns
+    -------
+    current_matrix : MergeEngine, np.ndarray or list of scipy.sparse.csr_array
+        Automaton after the merge attempt.
+    current_states : list
+        State identifiers after the merge attempt.
+    merged : bool
+        True if the pair was merged.
+    """
+    if output_level in ("Full", "Truncated"):
+        print(
+            "The next pair of states to check is:",
+            pair,
+        )
+
+    counts["attempted_merges"] += 1
+
+    if output_level == "Full":
+        print("Iteration", counts["attempted_merges"])
+
+    if not (
+        screened
+        and (
+            _below_min_count(
+                pair,
+                min_count,
+                current_matrix,
+                current_states,
+                statistics=statistics,
+            )
+            or _cached_test(
+                cache,
+                hoeffding_bound,
+                pair[0],
+                pair[1],
+                alpha,
+                current_matrix,
+                alphabet,
+                current_states,
+                statistics=statistics,
+            )
+        )
+    ):
+        if output_level in ("Full", "Truncated"):
+            print(
+                "Hoeffding Bound not satisfied for",
+                pair,
+            )
+
+        return current_matrix, current_states, False
+
+    if output_level in ("Full", "Truncated"):
+        print(
+            "Hoeffding Bound satisfied for",
+            pair,
+        )
+
+    counts["recursive_merge_attempts"] += 1
+
+    (
+        current_matrix,
+        current_states,
+        recursive_merge,
+    ) = _recursive_merge_two_states(
+        pair[0],
+        pair[1],
+        current_matrix,
+        current_states,
+        alpha,
+        alphabet,
+        output_level=output_level,
+        method="carrasco",
+        statistics=statistics,
+        cache=cache,
+        min_count=min_count,
+    )
+
+    if recursive_merge:
+        counts["successful_merges"] += 1
+
+        if output_level in ("Full", "Truncated"):
+            print(
+                "Recursively merged states. Successfully merged",
+                pair,
+            )
+
+    else:
+        counts["recursive_merge_failures"] += 1
+
+        if output_level in ("Full", "Truncated"):
+            print(
+                "Recursive merge process failed. Cannot merge",
+                pair,
+            )
+
+    return current_matrix, current_states, recursive_merge
@@ -0,0 +1,140 @@
+"""
+Memoised results of state compatibility tests.
+
+During ALERGIA the same pair of states is often tested again although
+neither state has changed: the carrasco method restarts from the first
+pair after every merge, the de la Higuera method compares each blue state
+with every red state, and recursive merges test pairs that were rejected
+before. ``CompatibilityCache`` stores the result of each test together
+with the version stamps of the two states' statistics, so a test is only
+evaluated again after a merge has changed one of the states.
+"""
+
+_MIN_PURGE_SIZE = 1024
+
+
+class CompatibilityCache:
+    """
+    Results of compatibility tests keyed on a pair of states.
+
+    Each result is stored with the version stamps that the two states had
+    in ``statistics`` when it was computed. A merge gives the surviving
+    state a new stamp, which invalidates every result involving it. A
+    rollback restores the old stamp, so a result stored before the merge
+    is valid again unless the pair was retested in the meantime. Only the
+    latest result of each pair is kept, and tests are assumed to be
+    symmetric in the two states.
+
+    Whenever the number of results doubles, those involving a state that
+    has been merged away or whose stamp has changed are discarded, so the
+    cache holds at most twice as many results as are currently valid.
+
+    Parameters
+    ----------
+    statistics : StateStatistics
+        Statistics of the states being tested.
+
+    Attributes
+    ----------
+    hits : int
+        Number of tests answered from the cache.
+    misses : int
+        Number of tests that had to be evaluated.
+    """
+
+    def __init__(self, statistics):
+        self.statistics = statistics
+        self.hits = 0
+        self.misses = 0
+        self._results = {}
+        self._purge_size = _MIN_PURGE_SIZE
+
+    def lookup(self, q1, q2, test, *args, **kwargs):
+        """
+        Return the result of a compatibility test, evaluating it if needed.
+
+        Parameters
+        ----------
+        q1 : int or str
+            First state to compare.
+        q2 : int or str
+            Second state to compare.
+        test : callable
+            Test to evaluate, called as ``test(q1, q2, *args, **kwargs)``
+            on a miss. Its other arguments must not change while the cache
+            is in use.
+        *args, **kwargs
+            Remaining arguments of test.
+
+        Returns
+        -------
+        bool
+            Result of the test.
+        """
+        rows = self.statistics.rows
+
+        if rows[q1] < rows[q2]:
+            key = (q1, q2)
+        else:
+            key = (q2, q1)
+
+        versions = (self.statistics.version(key[0]), self.statistics.version(key[1]))
+        entry = self._results.get(key)
+
+        if entry is not None and entry[0] == versions:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+
+        result = test(q1, q2, *args, **kwargs)
+        self._results[key] = (versions, result)
+
+        if len(self._results) >= self._purge_size:
+            self._purge()
+
+        return result
+
+    def _purge(self):
+        """
+        Discard the results that no longer match the states' stamps.
+        """
+        rows = self.statistics.rows
+        version = self.statistics.version
+
+        self._results = {
+            key: entry
+            for key, entry in self._results.items()
+            if key[0] in rows
+            and key[1] in rows
+            and entry[0] == (version(key[0]), version(key[1]))
+        }
+        self._purge_size = max(_MIN_PURGE_SIZE, 2 * len(self._results))
+
+
+def _cached_test(cache, test, q1, q2, *args, **kwargs):
+    """
+    Evaluate a compatibility test through a cache, if one is given.
+
+    Parameters
+    ----------
+    cache : CompatibilityCache or None
+        Cache to consult. If None, the test is evaluated directly.
+    test : callable
+        Test to evaluate.
+    q1 : int or str
+        First state to compare.
+    q2 : int or str
+        Second state to compare.
+    *args, **kwargs
+        Remaining arguments of test.
+
+    Returns
+    -------
+    bool
+        Result of the test.
+    """
+    if cache is None:
+        return test(q1, q2, *args, **kwargs)
+
+    return cache.lookup(q1, q2, test, *args, **kwargs)
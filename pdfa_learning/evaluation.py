@@ -33,9 +33,12 @@ def _prepare_sequences(
     """
     Convert an iterable of sequences to a validated list.
 
+    Token lists and integer-coded arrays are converted to tuples so that
+    every sequence can be counted and used as a table entry.
+
     Parameters
     ----------
-    sequences : iterable of str
+    sequences : iterable of str, list, tuple or np.ndarray
         Sequences to validate.
     parameter_name : str
         Name of the parameter being validated. This is used in error
@@ -43,14 +46,14 @@ def _prepare_sequences(
 
     Returns
     -------
-    list of str
+    list of str or tuple
         Validated sequences.
 
     Raises
     ------
     TypeError
         If sequences is a single string, is not iterable, or contains
-        non-string values.
+        values that are not strings or sequences of tokens.
     ValueError
         If no sequences are supplied or an empty sequence is present.
     """
@@ -72,12 +75,25 @@ def _prepare_sequences(
             f"{parameter_name} must contain at least one sequence."
         )
 
-    if not all(isinstance(sequence, str) for sequence in sequence_list):
+    if not all(
+        isinstance(sequence, (str, list, tuple, np.ndarray))
+        for sequence in sequence_list
+    ):
         raise TypeError(
-            f"All values in {parameter_name} must be strings."
+            f"All values in {parameter_name} must be strings, token lists "
+            "or integer arrays."
         )
 
-    if any(sequence == "" for sequence in sequence_list):
+    sequence_list = [
+        sequence
+        if isinstance(sequence, str)
+        else tuple(sequence.tolist())
+        if isinstance(sequence, np.ndarray)
+        else tuple(sequence)
+        for sequence in sequence_list
+    ]
+
+    if any(len(sequence) == 0 for sequence in sequence_list):
         raise ValueError(
             f"{parameter_name} must not contain empty sequences."
         )
@@ -143,11 +159,14 @@ def get_sequence_probability_table(
 
     Parameters
     ----------
-    sequences : iterable of str
-        Observed sequences. Repeated sequences are used to calculate their
-        empirical frequencies.
-    probability_matrix : numpy.ndarray
-        Probability transition matrix representing the learned PDFA.
+    sequences : iterable of str, list, tuple or np.ndarray
+        Observed sequences, given as strings, token lists or integer-coded
+        arrays. Repeated sequences are used to calculate their empirical
+        frequencies. Token lists and arrays appear as tuples in the
+        returned table.
+    probability_matrix : numpy.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Probability transition matrix representing the learned PDFA, in
+        the dense, sparse or delta-table format.
     alphabet : sequence of str
         Ordered alphabet corresponding to the first dimension of
         `probability_matrix`.
@@ -461,12 +480,14 @@ def evaluate_pdfa(
 
     Parameters
     ----------
-    test_sequences : iterable of str
+    test_sequences : iterable of str, list, tuple or np.ndarray
         Held-out sequences used to evaluate the learned PDFA.
-    train_sequences : iterable of str
-        Sequences used to learn the PDFA.
-    probability_matrix : numpy.ndarray
-        Probability transition matrix representing the learned PDFA.
+    train_sequences : iterable of str, list, tuple or np.ndarray
+        Sequences used to learn the PDFA, in the same form as
+        test_sequences.
+    probability_matrix : numpy.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Probability transition matrix representing the learned PDFA, in
+        the dense, sparse or delta-table format.
     alphabet : sequence of str
         Ordered alphabet corresponding to the first dimension of
         `probability_matrix`.
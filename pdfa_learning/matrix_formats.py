@@ -0,0 +1,948 @@
+"""
+Storage formats for transition-count and probability transition matrices.
+
+Transition matrices are stored either as a dense three-dimensional NumPy
+array with shape ``(n_symbols, n_states, n_states)`` or as a sparse list
+containing one ``scipy.sparse.csr_array`` with shape
+``(n_states, n_states)`` for each alphabet symbol. A PPTA has at most one
+outgoing transition per state and symbol, so the sparse format needs
+memory proportional to the number of transitions rather than to
+``n_symbols * n_states ** 2``. Deterministic automata can also be stored
+as a ``DeltaTable``, in which every transition is found by a single array
+lookup. This module converts between the formats and provides the private
+operations that let the rest of the package consume any of them.
+
+Delta tables can be saved to a directory of ``.npy`` files and reopened as
+memory-mapped arrays with ``load_delta_table``, so a saved PPTA can be
+reopened by other processes without being rebuilt. Learning and the
+conversion to probabilities read a mapped delta table a chunk of rows at a
+time, and exact-sequence scoring reads it in place. The merge engine and
+the other probability estimates still hold the transitions in memory, so
+the automaton must still fit in memory while it is learned or queried.
+"""
+
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from .state_registry import StateRegistry
+
+_DELTA_TABLE_FIELDS = ("destinations", "counts", "final_counts")
+
+# Number of rows of a delta table read at a time, so that a memory-mapped
+# table is never read into memory as a whole.
+_DELTA_CHUNK_ROWS = 65536
+
+
+class DeltaTable(NamedTuple):
+    """
+    Deterministic automaton stored as destination and count arrays.
+
+    Row ``i`` describes the state at index ``i`` of the corresponding
+    states list, and column ``z`` the symbol at index ``z`` of the
+    alphabet. The first row is the artificial initial state ``"*"``.
+    Converting a deterministic transition matrix to a delta table and back
+    is lossless.
+
+    Attributes
+    ----------
+    destinations : np.ndarray
+        Integer array with shape ``(n_states, n_symbols)`` containing the
+        destination index of each transition, or ``-1`` where a state has
+        no transition through a symbol.
+    counts : np.ndarray
+        Array with shape ``(n_states, n_symbols)`` containing the count of
+        each transition. Probability delta tables hold transition
+        probabilities instead.
+    final_counts : np.ndarray
+        Array with shape ``(n_states,)`` containing the number of
+        sequences terminating at each state, or the terminating
+        probabilities in a probability delta table. The entry of the
+        artificial initial state is zero.
+    """
+
+    destinations: np.ndarray
+    counts: np.ndarray
+    final_counts: np.ndarray
+
+
+def to_sparse_transition_matrix(transition_matrix):
+    """
+    Convert a transition matrix to the sparse format.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+
+    Returns
+    -------
+    list of scipy.sparse.csr_array
+        One matrix with shape ``(n_states, n_states)`` per alphabet
+        symbol.
+    """
+    if _is_delta(transition_matrix):
+        destinations, counts, _ = transition_matrix
+        n = len(destinations)
+
+        sparse_matrix = []
+
+        for z in range(destinations.shape[1]):
+            sources = np.flatnonzero(destinations[:, z] >= 0)
+            sparse_matrix.append(
+                sp.csr_array(
+                    (counts[sources, z], (sources, destinations[sources, z])),
+                    shape=(n, n),
+                )
+            )
+
+        return sparse_matrix
+
+    if _is_sparse(transition_matrix):
+        return [sp.csr_array(m) for m in transition_matrix]
+
+    return [sp.csr_array(m) for m in np.asarray(transition_matrix)]
+
+
+def to_dense_transition_matrix(transition_matrix):
+    """
+    Convert a transition matrix to the dense format.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+
+    Returns
+    -------
+    np.ndarray
+        Three-dimensional matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+    """
+    if _is_delta(transition_matrix):
+        destinations, counts, _ = transition_matrix
+        n = len(destinations)
+
+        sources, symbols = np.nonzero(destinations >= 0)
+        dense_matrix = np.zeros((destinations.shape[1], n, n), dtype=counts.dtype)
+        dense_matrix[symbols, sources, destinations[sources, symbols]] = counts[
+            sources, symbols
+        ]
+
+        return dense_matrix
+
+    if _is_sparse(transition_matrix):
+        return np.stack([m.toarray() for m in transition_matrix])
+
+    return np.asarray(transition_matrix)
+
+
+def to_delta_table(transition_matrix):
+    """
+    Convert a deterministic transition matrix to a delta table.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix in which every state has at most one
+        positive transition per symbol.
+
+    Returns
+    -------
+    DeltaTable
+        Destination, count and terminating-count arrays of the automaton.
+
+    Raises
+    ------
+    ValueError
+        If a state has more than one positive transition through the same
+        symbol.
+    """
+    if _is_delta(transition_matrix):
+        return _copy(transition_matrix)
+
+    symbols, sources, destinations, values = _transition_arrays(transition_matrix)
+
+    if _is_sparse(transition_matrix):
+        n = transition_matrix[0].shape[0]
+        n_symbols = len(transition_matrix)
+        dtype = transition_matrix[0].dtype
+    else:
+        n_symbols, n, _ = np.shape(transition_matrix)
+        dtype = np.asarray(transition_matrix).dtype
+
+    return _delta_table_from_transitions(
+        symbols,
+        sources,
+        destinations,
+        values,
+        n,
+        n_symbols,
+        dtype,
+    )
+
+
+def _delta_table_from_transitions(
+    symbols,
+    sources,
+    destinations,
+    values,
+    n,
+    n_symbols,
+    dtype,
+):
+    """
+    Build a delta table from the positive transitions of an automaton.
+
+    Parameters
+    ----------
+    symbols, sources, destinations, values : np.ndarray
+        Symbol index, source index, destination index and count of each
+        transition, as returned by ``_transition_arrays``.
+    n : int
+        Number of states.
+    n_symbols : int
+        Number of symbols in the alphabet.
+    dtype : data-type
+        Data type of the count arrays.
+
+    Returns
+    -------
+    DeltaTable
+        Destination, count and terminating-count arrays of the automaton.
+
+    Raises
+    ------
+    ValueError
+        If a state has more than one transition through the same symbol.
+    """
+    keys = sources * n_symbols + symbols
+
+    if len(np.unique(keys)) != len(keys):
+        raise ValueError(
+            "transition_matrix must be deterministic to be stored as a "
+            "delta table."
+        )
+
+    delta_destinations = np.full((n, n_symbols), -1, dtype=np.intp)
+    delta_destinations[sources, symbols] = destinations
+
+    counts = np.zeros((n, n_symbols), dtype=dtype)
+    counts[sources, symbols] = values
+
+    final_counts = np.zeros(n, dtype=dtype)
+    np.add.at(final_counts, destinations, values)
+    final_counts -= counts.sum(axis=1)
+    final_counts[0] = 0
+
+    return DeltaTable(delta_destinations, counts, final_counts)
+
+
+def save_delta_table(delta_table, states, alphabet, directory):
+    """
+    Save a delta table and its state and symbol index to a directory.
+
+    Each array of the delta table is written to its own ``.npy`` file, so
+    the saved automaton can be reopened with ``load_delta_table`` as
+    memory-mapped arrays.
+
+    Parameters
+    ----------
+    delta_table : DeltaTable
+        Delta table to save.
+    states : list
+        State identifiers corresponding to the rows of delta_table. The
+        first state must be the artificial initial state ``"*"`` and the
+        others must be integers.
+    alphabet : list of str
+        Alphabet corresponding to the columns of delta_table.
+    directory : str or os.PathLike
+        Directory in which to write the files. It is created if it does
+        not exist, and existing files are overwritten.
+
+    Raises
+    ------
+    TypeError
+        If delta_table is not a DeltaTable.
+    ValueError
+        If states does not match delta_table, or contains identifiers
+        other than ``"*"`` followed by integers.
+    """
+    if not _is_delta(delta_table):
+        raise TypeError("delta_table must be a DeltaTable.")
+
+    if len(states) != len(delta_table.destinations):
+        raise ValueError(
+            "states must contain one identifier per row of delta_table."
+        )
+
+    arrays = _create_delta_table(
+        directory,
+        states,
+        alphabet,
+        delta_table.counts.dtype,
+    )
+
+    for array, values in zip(arrays, delta_table):
+        array[...] = values
+        array.flush()
+
+
+def load_delta_table(directory, mmap_mode="r"):
+    """
+    Open a delta table saved by ``save_delta_table``.
+
+    Parameters
+    ----------
+    directory : str or os.PathLike
+        Directory containing the saved delta table.
+    mmap_mode : {"r", "r+", "c"} or None, default="r"
+        Mode used to memory-map the arrays, as in ``numpy.load``. With the
+        default, the arrays are read from disk on demand and cannot be
+        modified. If None, the arrays are read into memory.
+
+    Returns
+    -------
+    delta_table : DeltaTable
+        Delta table whose arrays are memory-mapped from directory.
+    states : StateRegistry
+        State identifiers corresponding to the rows of delta_table.
+    alphabet : list of str
+        Alphabet corresponding to the columns of delta_table.
+    """
+    delta_table = DeltaTable(
+        *(
+            np.load(os.path.join(directory, f"{field}.npy"), mmap_mode=mmap_mode)
+            for field in _DELTA_TABLE_FIELDS
+        )
+    )
+
+    state_ids = np.load(os.path.join(directory, "states.npy"))
+
+    with open(os.path.join(directory, "alphabet.json"), encoding="utf-8") as f:
+        alphabet = json.load(f)
+
+    return delta_table, StateRegistry(["*"] + state_ids.tolist()), alphabet
+
+
+def _create_delta_table(directory, states, alphabet, dtype):
+    """
+    Create the memory-mapped files of a delta table.
+
+    The destination array is filled with ``-1`` and the count arrays with
+    zeros. The state and symbol index is written immediately.
+
+    Parameters
+    ----------
+    directory : str or os.PathLike
+        Directory in which to create the files.
+    states : list
+        State identifiers of the rows, beginning with ``"*"`` and followed
+        by integers.
+    alphabet : list of str
+        Alphabet corresponding to the columns.
+    dtype : data-type
+        Data type of the count arrays.
+
+    Returns
+    -------
+    DeltaTable
+        Writable delta table of ``np.memmap`` arrays.
+
+    Raises
+    ------
+    ValueError
+        If states contains identifiers other than ``"*"`` followed by
+        integers.
+    """
+    if not states or states[0] != "*" or not all(
+        isinstance(state, (int, np.integer)) and not isinstance(state, bool)
+        for state in states[1:]
+    ):
+        raise ValueError(
+            "states must begin with '*' followed by integer identifiers to "
+            "be saved."
+        )
+
+    os.makedirs(directory, exist_ok=True)
+
+    n = len(states)
+    shapes = ((n, len(alphabet)), (n, len(alphabet)), (n,))
+    dtypes = (np.intp, dtype, dtype)
+
+    arrays = [
+        np.lib.format.open_memmap(
+            os.path.join(directory, f"{field}.npy"),
+            mode="w+",
+            dtype=field_dtype,
+            shape=shape,
+        )
+        for field, field_dtype, shape in zip(_DELTA_TABLE_FIELDS, dtypes, shapes)
+    ]
+
+    arrays[0][...] = -1
+
+    np.save(
+        os.path.join(directory, "states.npy"),
+        np.asarray(states[1:], dtype=np.int64),
+    )
+
+    with open(os.path.join(directory, "alphabet.json"), "w", encoding="utf-8") as f:
+        json.dump(list(alphabet), f)
+
+    return DeltaTable(*arrays)
+
+
+def _delta_row_chunks(n):
+    """
+    Return slices covering the rows of a delta table in chunks.
+
+    Parameters
+    ----------
+    n : int
+        Number of rows of the delta table.
+
+    Returns
+    -------
+    list of slice
+        Consecutive slices of at most ``_DELTA_CHUNK_ROWS`` rows.
+    """
+    return [
+        slice(start, min(start + _DELTA_CHUNK_ROWS, n))
+        for start in range(0, n, _DELTA_CHUNK_ROWS)
+    ]
+
+
+def _delta_transition_chunks(delta_table):
+    """
+    Yield the positive transitions of a delta table a chunk of rows at a
+    time.
+
+    Only one chunk of the destination and count arrays is read at a time,
+    so a memory-mapped delta table is not read into memory as a whole.
+
+    Parameters
+    ----------
+    delta_table : DeltaTable
+        Transition-count or probability delta table.
+
+    Yields
+    ------
+    symbols, sources, destinations, values : np.ndarray
+        Symbol index, source index, destination index and value of each
+        positive transition leaving the rows of the chunk.
+    """
+    for rows in _delta_row_chunks(len(delta_table.destinations)):
+        destinations = np.asarray(delta_table.destinations[rows])
+        counts = np.asarray(delta_table.counts[rows])
+        sources, symbols = np.nonzero((destinations >= 0) & (counts > 0))
+
+        yield (
+            symbols,
+            sources + rows.start,
+            destinations[sources, symbols],
+            counts[sources, symbols],
+        )
+
+
+def _is_sparse(transition_matrix):
+    """
+    Return whether a transition matrix uses the sparse format.
+
+    Parameters
+    ----------
+    transition_matrix : object
+        Transition matrix to inspect.
+
+    Returns
+    -------
+    bool
+        True if transition_matrix is a list or tuple of SciPy sparse
+        matrices.
+    """
+    return (
+        isinstance(transition_matrix, (list, tuple))
+        and len(transition_matrix) > 0
+        and all(sp.issparse(m) for m in transition_matrix)
+    )
+
+
+def _is_delta(transition_matrix):
+    """
+    Return whether a transition matrix uses the delta-table format.
+
+    Parameters
+    ----------
+    transition_matrix : object
+        Transition matrix to inspect.
+
+    Returns
+    -------
+    bool
+        True if transition_matrix is a DeltaTable.
+    """
+    return isinstance(transition_matrix, DeltaTable)
+
+
+def _copy(transition_matrix):
+    """
+    Return a copy of a dense or sparse transition matrix.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+
+    Returns
+    -------
+    np.ndarray or list of scipy.sparse.csr_array
+        Copy of transition_matrix in the same format.
+    """
+    if _is_delta(transition_matrix):
+        return DeltaTable(*(a.copy() for a in transition_matrix))
+
+    if _is_sparse(transition_matrix):
+        return [m.copy() for m in transition_matrix]
+
+    return np.copy(transition_matrix)
+
+
+def _incoming_count(transition_matrix, i):
+    """
+    Return the total of all transitions entering the state at index i.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+    i : int
+        Index of the state.
+
+    Returns
+    -------
+    int or float
+        Sum of the transitions entering the state.
+    """
+    if _is_delta(transition_matrix):
+        if i == 0:
+            return transition_matrix.final_counts[0]
+
+        return transition_matrix.final_counts[i] + transition_matrix.counts[i].sum()
+
+    if _is_sparse(transition_matrix):
+        return sum(m[:, [i]].sum() for m in transition_matrix)
+
+    return transition_matrix[:, :, i].sum()
+
+
+def _outgoing_count(transition_matrix, i, z=None):
+    """
+    Return the total of the transitions leaving the state at index i.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+    i : int
+        Index of the state.
+    z : int, optional
+        Index of a symbol. If given, only transitions through that symbol
+        are counted.
+
+    Returns
+    -------
+    int or float
+        Sum of the transitions leaving the state.
+    """
+    if _is_delta(transition_matrix):
+        if z is not None:
+            return transition_matrix.counts[i, z]
+
+        return transition_matrix.counts[i].sum()
+
+    if _is_sparse(transition_matrix):
+        if z is not None:
+            return transition_matrix[z][[i], :].sum()
+
+        return sum(m[[i], :].sum() for m in transition_matrix)
+
+    if z is not None:
+        return transition_matrix[z, i, :].sum()
+
+    return transition_matrix[:, i, :].sum()
+
+
+def _incoming_counts(transition_matrix):
+    """
+    Return the total of all transitions entering each state.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+
+    Returns
+    -------
+    np.ndarray
+        One-dimensional array with one total per state.
+    """
+    if _is_delta(transition_matrix):
+        incoming = transition_matrix.final_counts + transition_matrix.counts.sum(axis=1)
+        incoming[0] = transition_matrix.final_counts[0]
+        return incoming
+
+    if _is_sparse(transition_matrix):
+        return sum(np.asarray(m.sum(axis=0)).ravel() for m in transition_matrix)
+
+    return transition_matrix.sum(axis=(0, 1))
+
+
+def _outgoing_counts(transition_matrix):
+    """
+    Return the total of the transitions leaving each state through each
+    symbol.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+
+    Returns
+    -------
+    np.ndarray
+        Array with shape ``(n_states, n_symbols)``.
+    """
+    if _is_delta(transition_matrix):
+        return np.array(transition_matrix.counts)
+
+    if _is_sparse(transition_matrix):
+        return np.column_stack(
+            [np.asarray(m.sum(axis=1)).ravel() for m in transition_matrix]
+        )
+
+    return np.sum(transition_matrix, axis=2).T.copy()
+
+
+def _row_sums(transition_matrix, z):
+    """
+    Return the total of the transitions leaving each state through a
+    symbol.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+    z : int
+        Index of the symbol.
+
+    Returns
+    -------
+    np.ndarray
+        One-dimensional array with one total per state.
+    """
+    if _is_delta(transition_matrix):
+        return transition_matrix.counts[:, z].copy()
+
+    if _is_sparse(transition_matrix):
+        return np.asarray(transition_matrix[z].sum(axis=1)).ravel()
+
+    return np.sum(transition_matrix[z, :, :], axis=1)
+
+
+def _positive_destinations(transition_matrix, z, i):
+    """
+    Return the destinations of the positive transitions leaving a state
+    through a symbol.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+    z : int
+        Index of the symbol.
+    i : int
+        Index of the source state.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted destination state indices.
+    """
+    if _is_delta(transition_matrix):
+        destination = transition_matrix.destinations[i, z]
+
+        if destination >= 0 and transition_matrix.counts[i, z] > 0:
+            return np.array([destination])
+
+        return np.array([], dtype=np.intp)
+
+    if _is_sparse(transition_matrix):
+        m = transition_matrix[z]
+        start, end = m.indptr[i], m.indptr[i + 1]
+        destinations = m.indices[start:end][m.data[start:end] > 0]
+        return np.sort(destinations)
+
+    return np.where(transition_matrix[z, i, :] > 0)[0]
+
+
+def _nondeterministic_transitions(transition_matrix, z, rows=None):
+    """
+    Return the states with more than one positive transition through a
+    symbol, together with their first two destinations.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+    z : int
+        Index of the symbol.
+    rows : np.ndarray, optional
+        Sorted indices of the states to examine. If None, every state is
+        examined.
+
+    Returns
+    -------
+    sources : np.ndarray
+        Sorted indices of the nondeterministic states.
+    first : np.ndarray
+        Smallest destination index of each nondeterministic state.
+    second : np.ndarray
+        Second smallest destination index of each nondeterministic state.
+    """
+    if _is_delta(transition_matrix):
+        empty = np.array([], dtype=np.intp)
+        return empty, empty, empty
+
+    if rows is None:
+        rows = np.arange(transition_matrix[z].shape[0])
+
+    if _is_sparse(transition_matrix):
+        coo = sp.coo_array(transition_matrix[z][rows])
+        coo.sum_duplicates()
+
+        positive = coo.data > 0
+        sources = coo.row[positive]
+        destinations = coo.col[positive]
+
+        order = np.lexsort((destinations, sources))
+        sources = sources[order]
+        destinations = destinations[order]
+
+        starts = np.flatnonzero(np.diff(sources, prepend=-1) != 0)
+        lengths = np.diff(starts, append=len(sources))
+        multiple = starts[lengths > 1]
+
+        return (
+            rows[sources[multiple]],
+            destinations[multiple],
+            destinations[multiple + 1],
+        )
+
+    positive = transition_matrix[z][rows] > 0
+    multiple = np.flatnonzero(positive.sum(axis=1) > 1)
+    positive = positive[multiple]
+
+    first = np.argmax(positive, axis=1)
+    positive[np.arange(len(multiple)), first] = False
+    second = np.argmax(positive, axis=1)
+
+    return rows[multiple], first, second
+
+
+def _predecessors(transition_matrix, i):
+    """
+    Return the states with a positive transition into the state at index i.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+    i : int
+        Index of the destination state.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted indices of the source states.
+    """
+    if _is_delta(transition_matrix):
+        sources, _ = np.nonzero(
+            (transition_matrix.destinations == i) & (transition_matrix.counts > 0)
+        )
+        return np.unique(sources)
+
+    if _is_sparse(transition_matrix):
+        sources = []
+
+        for m in transition_matrix:
+            m = sp.csr_array(m)
+            row_of_entry = np.repeat(np.arange(m.shape[0]), np.diff(m.indptr))
+            sources.append(row_of_entry[(m.indices == i) & (m.data > 0)])
+
+        return np.unique(np.concatenate(sources))
+
+    return np.flatnonzero((transition_matrix[:, :, i] > 0).any(axis=0))
+
+
+def _transition_arrays(transition_matrix):
+    """
+    Return the positive transitions of a transition matrix as arrays.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+
+    Returns
+    -------
+    symbols : np.ndarray
+        Symbol index of each transition.
+    sources : np.ndarray
+        Source state index of each transition.
+    destinations : np.ndarray
+        Destination state index of each transition.
+    values : np.ndarray
+        Count or probability of each transition.
+    """
+    if _is_delta(transition_matrix):
+        delta_destinations, counts, _ = transition_matrix
+        sources, symbols = np.nonzero((delta_destinations >= 0) & (counts > 0))
+
+        return (
+            symbols,
+            sources,
+            delta_destinations[sources, symbols],
+            counts[sources, symbols],
+        )
+
+    if _is_sparse(transition_matrix):
+        symbols, sources, destinations, values = [], [], [], []
+
+        for z, m in enumerate(transition_matrix):
+            coo = sp.coo_array(m)
+            positive = coo.data > 0
+            sources.append(coo.row[positive])
+            destinations.append(coo.col[positive])
+            values.append(coo.data[positive])
+            symbols.append(np.full(positive.sum(), z))
+
+        return (
+            np.concatenate(symbols),
+            np.concatenate(sources),
+            np.concatenate(destinations),
+            np.concatenate(values),
+        )
+
+    transition_matrix = np.asarray(transition_matrix)
+    symbols, sources, destinations = np.nonzero(transition_matrix > 0)
+
+    return (
+        symbols,
+        sources,
+        destinations,
+        transition_matrix[symbols, sources, destinations],
+    )
+
+
+def _positive_transitions(transition_matrix):
+    """
+    Return the positive transitions of a transition matrix.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+
+    Returns
+    -------
+    list of tuple
+        ``(symbol_index, source_index, destination_index)`` triples sorted
+        by source, then destination, then symbol.
+    """
+    symbols, sources, destinations, _ = _transition_arrays(transition_matrix)
+
+    order = np.lexsort((symbols, destinations, sources))
+
+    return [
+        (int(symbols[k]), int(sources[k]), int(destinations[k]))
+        for k in order
+    ]
+
+
+def _entry(transition_matrix, z, i, j):
+    """
+    Return a single entry of a dense or sparse transition matrix.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count or probability transition matrix.
+    z : int
+        Index of the symbol.
+    i : int
+        Index of the source state.
+    j : int
+        Index of the destination state.
+
+    Returns
+    -------
+    int or float
+        Value of the transition.
+    """
+    if _is_delta(transition_matrix):
+        if transition_matrix.destinations[i, z] == j:
+            return transition_matrix.counts[i, z]
+
+        return 0
+
+    if _is_sparse(transition_matrix):
+        return transition_matrix[z][i, j]
+
+    return transition_matrix[z, i, j]
+
+
+def _merge_indices(transition_matrix, i1, i2):
+    """
+    Merge the states at indices i1 and i2 of a sparse transition matrix.
+
+    The merged state takes the smaller index and the larger index is
+    removed, matching the dense merge in ``state_merging``. A merge may
+    create nondeterministic transitions, so delta tables are merged in the
+    sparse format.
+
+    Parameters
+    ----------
+    transition_matrix : list of scipy.sparse.csr_array or DeltaTable
+        Sparse transition-count matrix.
+    i1 : int
+        Index of the first state.
+    i2 : int
+        Index of the second state.
+
+    Returns
+    -------
+    list of scipy.sparse.csr_array
+        The merged transition matrix.
+    """
+    if _is_delta(transition_matrix):
+        transition_matrix = to_sparse_transition_matrix(transition_matrix)
+
+    n = transition_matrix[0].shape[0]
+    which_min = min(i1, i2)
+    which_max = max(i1, i2)
+
+    new_index = np.arange(n)
+    new_index[which_max + 1 :] -= 1
+    new_index[which_max] = which_min
+
+    projection = sp.csr_array(
+        (np.ones(n, dtype=int), (np.arange(n), new_index)),
+        shape=(n, n - 1),
+    )
+
+    return [
+        sp.csr_array(projection.T @ m @ projection) for m in transition_matrix
+    ]
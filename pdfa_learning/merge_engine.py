@@ -0,0 +1,550 @@
+"""
+In-place state merging for ALERGIA.
+
+Merging two states of a transition-count matrix by copying the matrix and
+deleting a row and a column costs ``O(n_symbols * n_states ** 2)`` per
+merge, and a recursive merge repeats this for every nondeterministic pair
+it resolves. ``MergeEngine`` instead holds the transitions of every state
+in per-state dictionaries and folds one state into another in place, in
+time proportional to the number of transitions of the merged states.
+Removed states are recorded in a union-find structure and an active-state
+mask, and every change is journaled so that a failed recursive merge can
+be rolled back. The merged transition matrix is produced once, when
+learning has finished.
+
+A merge can only create conflicting transitions at the merged state and
+at states with transitions into both of the merged states, so a recursive
+merge folds the two subtrees together from a worklist of these conflicts
+instead of searching the whole automaton after every merge.
+"""
+
+import heapq
+
+import numpy as np
+import scipy.sparse as sp
+
+from .matrix_formats import (
+    _delta_table_from_transitions,
+    _delta_transition_chunks,
+    _is_delta,
+    _is_sparse,
+    _transition_arrays,
+)
+from .state_registry import StateRegistry
+from .state_statistics import StateStatistics
+
+# Kinds of journal entries.
+_COUNT = 0
+_LINK = 1
+_CONFLICT = 2
+_UNION = 3
+
+
+class MergeEngine:
+    """
+    Transition counts of an automaton that is merged in place.
+
+    The transitions leaving each state through each symbol are held in a
+    dictionary from destination row to count, together with the set of
+    ``(source_row, symbol)`` transitions entering each state. Rows are the
+    positions of the states in the original states list and are never
+    renumbered: a merged state keeps the row of whichever state appears
+    first, and the other row is deactivated. The states holding more than
+    one transition through a symbol are tracked as merges are made, and
+    kept in a worklist ordered by symbol and then by state, so the next
+    nondeterministic pair is found without scanning the automaton.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``. A delta table, which may be
+        memory-mapped, is read a chunk of rows at a time.
+    states : list
+        State identifiers corresponding to the final two dimensions of
+        transition_matrix.
+    statistics : StateStatistics, optional
+        Statistics of the states of transition_matrix, updated in step
+        with every merge and rollback. If None, they are computed from
+        transition_matrix.
+
+    Attributes
+    ----------
+    states : StateRegistry
+        Identifiers of the states that have not been merged away, in
+        their original order. Merges and rollbacks only mark the registry
+        as out of date, and it is rebuilt in place when next read.
+    statistics : StateStatistics
+        Statistics of the current states.
+    n_symbols : int
+        Number of symbols in the alphabet.
+    parent : np.ndarray
+        Union-find parent of each original row. A removed state points to
+        the row of the state it was merged into.
+    active : np.ndarray
+        Boolean mask of the original rows that are still states.
+    """
+
+    def __init__(self, transition_matrix, states, statistics=None):
+        if statistics is None:
+            statistics = StateStatistics(transition_matrix, states)
+
+        self._delta = _is_delta(transition_matrix)
+        self._sparse = _is_sparse(transition_matrix)
+
+        if self._delta:
+            self._dtype = transition_matrix.counts.dtype
+            n_symbols = transition_matrix.destinations.shape[1]
+            chunks = _delta_transition_chunks(transition_matrix)
+        elif self._sparse:
+            self._dtype = transition_matrix[0].dtype
+            n_symbols = len(transition_matrix)
+            chunks = [_transition_arrays(transition_matrix)]
+        else:
+            self._dtype = np.asarray(transition_matrix).dtype
+            n_symbols = len(transition_matrix)
+            chunks = [_transition_arrays(transition_matrix)]
+
+        n = len(states)
+
+        self.statistics = statistics
+        self.n_symbols = n_symbols
+        self.parent = np.arange(n)
+        self.active = np.ones(n, dtype=bool)
+
+        self._ids = list(states)
+        self._rows = {state: i for i, state in enumerate(states)}
+        self._states = StateRegistry(states)
+        self._states_stale = False
+        self._outgoing = [[{} for _ in range(self.n_symbols)] for _ in range(n)]
+        self._incoming = [set() for _ in range(n)]
+        self._journal = []
+        self._changed = set()
+
+        for symbols, sources, destinations, values in chunks:
+            for z, i, j, value in zip(
+                symbols.tolist(),
+                sources.tolist(),
+                destinations.tolist(),
+                values.tolist(),
+            ):
+                out = self._outgoing[i][z]
+                out[j] = out.get(j, 0) + value
+                self._incoming[j].add((i, z))
+
+        self._conflicts = {
+            (z, i)
+            for i in range(n)
+            for z in range(self.n_symbols)
+            if len(self._outgoing[i][z]) > 1
+        }
+
+        # Heap of conflicts, which may also hold conflicts that have since
+        # been resolved. These are discarded when they reach the top.
+        self._worklist = sorted(self._conflicts)
+
+    @property
+    def states(self):
+        """
+        Identifiers of the current states, in their original order.
+
+        The same registry is returned every time, and is rebuilt in place
+        from the active-state mask if a merge or rollback has been made
+        since it was last read.
+
+        Returns
+        -------
+        StateRegistry
+            Identifiers of the states that have not been merged away.
+        """
+        if self._states_stale:
+            self._states[:] = [self._ids[i] for i in np.flatnonzero(self.active)]
+            self._states_stale = False
+
+        return self._states
+
+    def _set(self, i, z, j, value):
+        """
+        Set the count of a transition and journal its previous value.
+
+        Parameters
+        ----------
+        i : int
+            Row of the source state.
+        z : int
+            Index of the symbol.
+        j : int
+            Row of the destination state.
+        value : int, float or None
+            New count. None removes the transition.
+        """
+        out = self._outgoing[i][z]
+        self._journal.append((_COUNT, i, z, j, out.get(j)))
+        self._changed.add(i)
+
+        if value is None:
+            del out[j]
+        else:
+            out[j] = value
+
+    def _link(self, j, transition, add):
+        """
+        Add or remove an entering transition and journal the change.
+
+        Parameters
+        ----------
+        j : int
+            Row of the destination state.
+        transition : tuple
+            ``(source_row, symbol)`` pair of the transition.
+        add : bool
+            True to add the transition and False to remove it.
+        """
+        incoming = self._incoming[j]
+
+        if (transition in incoming) == add:
+            return
+
+        if add:
+            incoming.add(transition)
+        else:
+            incoming.remove(transition)
+
+        self._journal.append((_LINK, j, transition, add))
+
+    def _update_conflict(self, z, i):
+        """
+        Record whether a state has more than one transition through a symbol.
+
+        Parameters
+        ----------
+        z : int
+            Index of the symbol.
+        i : int
+            Row of the state.
+        """
+        key = (z, i)
+        was_conflict = key in self._conflicts
+        is_conflict = bool(self.active[i]) and len(self._outgoing[i][z]) > 1
+
+        if was_conflict == is_conflict:
+            return
+
+        if is_conflict:
+            self._conflicts.add(key)
+            heapq.heappush(self._worklist, key)
+        else:
+            self._conflicts.remove(key)
+
+        self._journal.append((_CONFLICT, key, was_conflict))
+
+    def merge(self, q1, q2):
+        """
+        Merge two current states in place.
+
+        The merged state retains the identifier of whichever state appears
+        first in the states list, matching ``merge_two_states``. The merge
+        takes time proportional to the number of transitions entering and
+        leaving the removed state, and ``states`` is only rebuilt when it
+        is next read.
+
+        Parameters
+        ----------
+        q1 : int or str
+            First state to merge.
+        q2 : int or str
+            Second state to merge.
+
+        Returns
+        -------
+        surviving_state : int or str
+            State that represents the merged state.
+        removed_state : int or str
+            State removed by the merge.
+        """
+        i = self._rows[q1]
+        j = self._rows[q2]
+
+        if j < i:
+            i, j = j, i
+
+        touched = set()
+
+        # Redirect the transitions entering j to i.
+        for s, z in list(self._incoming[j]):
+            count = self._outgoing[s][z][j]
+            self._set(s, z, j, None)
+            self._set(s, z, i, self._outgoing[s][z].get(i, 0) + count)
+            self._link(j, (s, z), False)
+            self._link(i, (s, z), True)
+            touched.add((z, s))
+
+        # Add the transitions leaving j to those leaving i.
+        for z in range(self.n_symbols):
+            for d, count in list(self._outgoing[j][z].items()):
+                self._set(j, z, d, None)
+                self._set(i, z, d, self._outgoing[i][z].get(d, 0) + count)
+                self._link(d, (j, z), False)
+                self._link(d, (i, z), True)
+
+            touched.add((z, i))
+            touched.add((z, j))
+
+        self.parent[j] = i
+        self.active[j] = False
+        self._changed.update((i, j))
+        self._states_stale = True
+
+        self._journal.append((_UNION, j))
+
+        for z, s in touched:
+            self._update_conflict(z, s)
+
+        surviving_state = self._ids[i]
+        removed_state = self._ids[j]
+
+        self.statistics.merge(surviving_state, removed_state)
+
+        return surviving_state, removed_state
+
+    def checkpoint(self):
+        """
+        Return a marker for the current position in the merge journal.
+
+        Returns
+        -------
+        tuple of int
+            Positions of the transition and statistics journals.
+        """
+        return len(self._journal), self.statistics.checkpoint()
+
+    def rollback(self, checkpoint):
+        """
+        Undo every merge made after a checkpoint.
+
+        Parameters
+        ----------
+        checkpoint : tuple of int
+            Marker returned by ``checkpoint``.
+        """
+        position, statistics_checkpoint = checkpoint
+
+        while len(self._journal) > position:
+            entry = self._journal.pop()
+            kind = entry[0]
+
+            if kind == _COUNT:
+                _, i, z, j, value = entry
+                self._changed.add(i)
+
+                if value is None:
+                    del self._outgoing[i][z][j]
+                else:
+                    self._outgoing[i][z][j] = value
+
+            elif kind == _LINK:
+                _, j, transition, added = entry
+
+                if added:
+                    self._incoming[j].remove(transition)
+                else:
+                    self._incoming[j].add(transition)
+
+            elif kind == _CONFLICT:
+                _, key, was_conflict = entry
+
+                if was_conflict:
+                    self._conflicts.add(key)
+                    heapq.heappush(self._worklist, key)
+                else:
+                    self._conflicts.remove(key)
+
+            else:
+                _, j = entry
+
+                self._changed.update((int(self.parent[j]), j))
+                self.parent[j] = j
+                self.active[j] = True
+                self._states_stale = True
+
+        self.statistics.rollback(statistics_checkpoint)
+
+    def commit(self, checkpoint):
+        """
+        Discard the journal entries made after a checkpoint.
+
+        The merges made since the checkpoint can no longer be rolled back.
+
+        Parameters
+        ----------
+        checkpoint : tuple of int
+            Marker returned by ``checkpoint``.
+        """
+        del self._journal[checkpoint[0]:]
+
+    def find(self, q):
+        """
+        Return the current state that an original state has been merged into.
+
+        Parameters
+        ----------
+        q : int or str
+            Identifier of a state of the original transition matrix.
+
+        Returns
+        -------
+        int or str
+            Identifier of the current state containing q.
+        """
+        i = self._rows[q]
+
+        while self.parent[i] != i:
+            i = self.parent[i]
+
+        return self._ids[i]
+
+    def destinations(self, q, z):
+        """
+        Return the destinations of the transitions leaving a state through
+        a symbol.
+
+        Parameters
+        ----------
+        q : int or str
+            Identifier of a current state.
+        z : int
+            Index of the symbol.
+
+        Returns
+        -------
+        list
+            Destination state identifiers, in state order.
+        """
+        return [self._ids[j] for j in sorted(self._outgoing[self._rows[q]][z])]
+
+    def pop_changed_states(self):
+        """
+        Return the states changed by merges and rollbacks.
+
+        These are the merged states and the states whose outgoing
+        transitions have changed since the previous call, after which the
+        record is cleared.
+
+        Returns
+        -------
+        set
+            Identifiers of the changed states, including states that have
+            since been merged away.
+        """
+        changed = {self._ids[i] for i in self._changed}
+        self._changed = set()
+
+        return changed
+
+    def next_nondeterministic_pair(self):
+        """
+        Return the first nondeterministic state pair in the current automaton.
+
+        Returns
+        -------
+        tuple or None
+            First pair returned by ``nondeterministic_pairs``, or None if
+            the automaton is deterministic.
+        """
+        while self._worklist:
+            z, i = self._worklist[0]
+
+            if (z, i) in self._conflicts:
+                first, second = heapq.nsmallest(2, self._outgoing[i][z])
+                return self._ids[first], self._ids[second]
+
+            heapq.heappop(self._worklist)
+
+        return None
+
+    def nondeterministic_pairs(self):
+        """
+        Identify nondeterministic state pairs in the current automaton.
+
+        Returns
+        -------
+        list of tuple
+            Pairs of destination state identifiers involved in
+            nondeterministic transitions, in the order returned by
+            ``check_is_deterministic`` for the compacted matrix.
+        """
+        pairs = []
+
+        for z, i in sorted(self._conflicts):
+            first, second = sorted(self._outgoing[i][z])[:2]
+            pairs.append((self._ids[first], self._ids[second]))
+
+        return pairs
+
+    def compact(self):
+        """
+        Return the transition-count matrix of the current states.
+
+        Returns
+        -------
+        transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+            Transition-count matrix of the current states, in the format
+            of the matrix the engine was created from. A delta table is
+            returned in memory even if the engine was created from a
+            memory-mapped one.
+        states : StateRegistry
+            State identifiers corresponding to transition_matrix.
+
+        Raises
+        ------
+        ValueError
+            If the engine was created from a delta table and a state has
+            more than one transition through the same symbol.
+        """
+        rows = np.flatnonzero(self.active)
+        k = len(rows)
+
+        new_index = np.full(len(self.active), -1)
+        new_index[rows] = np.arange(k)
+
+        symbols, sources, destinations, values = [], [], [], []
+
+        for i in rows.tolist():
+            for z, out in enumerate(self._outgoing[i]):
+                for j, value in out.items():
+                    symbols.append(z)
+                    sources.append(new_index[i])
+                    destinations.append(new_index[j])
+                    values.append(value)
+
+        symbols = np.array(symbols, dtype=np.intp)
+        sources = np.array(sources, dtype=np.intp)
+        destinations = np.array(destinations, dtype=np.intp)
+        values = np.array(values, dtype=self._dtype)
+
+        if self._delta:
+            transition_matrix = _delta_table_from_transitions(
+                symbols,
+                sources,
+                destinations,
+                values,
+                k,
+                self.n_symbols,
+                self._dtype,
+            )
+        elif self._sparse:
+            transition_matrix = [
+                sp.csr_array(
+                    (
+                        values[symbols == z],
+                        (sources[symbols == z], destinations[symbols == z]),
+                    ),
+                    shape=(k, k),
+                )
+                for z in range(self.n_symbols)
+            ]
+        else:
+            transition_matrix = np.zeros((self.n_symbols, k, k), dtype=self._dtype)
+            transition_matrix[symbols, sources, destinations] = values
+
+        return transition_matrix, StateRegistry(self.states)
@@ -3,15 +3,874 @@ Construction utilities for probabilistic prefix tree acceptors.
 
 This module derives alphabets and prefix-state paths from observed
 sequences, constructs transition-count matrices for probabilistic prefix
-tree acceptors, and creates their initial state identifiers.
+tree acceptors, and creates their initial state identifiers. Sequences
+are consumed in a single pass, so they may be streamed from generators
+or from files using ``read_sequences``.
+
+A sequence is either a string of single-character symbols, a list of
+string tokens such as activity codes, or a list or NumPy array of integer
+codes that index the alphabet. ``encode_sequences`` converts symbol
+sequences to integer codes using a vocabulary that is built once.
+
+``build_ppta`` returns the alphabet, states, transition-count matrix and
+the state of every prefix from a single traversal of the sequences. The
+separate ``get_alphabet``, ``get_initial_states`` and
+``get_transition_matrix`` functions each traverse the sequences again.
 """
 
+import collections
+import itertools as it
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
 import numpy as np
+import scipy.sparse as sp
 
 from ._validation import (
+    _combine_sequence_kinds,
+    _generate_sequence_counts,
+    _iter_sequence_counts,
+    _iter_sequence_elements,
     _validate_alphabet,
-    _validate_sequences,
+    _validate_n_jobs,
+    _validate_pruning,
+    _validate_transition_matrix,
+)
+from .matrix_formats import (
+    DeltaTable,
+    _create_delta_table,
+    _is_delta,
+    _is_sparse,
+    _positive_destinations,
+    load_delta_table,
 )
+from .state_registry import StateRegistry
+
+# Sequences inserted by a worker process at a time, and the number of
+# sequences below which the prefix tree is built in the current process.
+_PARALLEL_BATCH_SIZE = 20000
+_PARALLEL_MIN_SEQUENCES = 100000
+
+
+class PPTA(NamedTuple):
+    """
+    Probabilistic prefix tree acceptor returned by ``build_ppta``.
+
+    The first three fields are in the order expected by ``alergia``, so a
+    PPTA can be unpacked directly into its arguments.
+
+    Attributes
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix of the PPTA.
+    states : StateRegistry
+        State identifiers, beginning with the artificial initial state
+        ``"*"``.
+    alphabet : list of str
+        Alphabet corresponding to the first dimension of
+        transition_matrix.
+    prefix_states : dict
+        Mapping from each prefix represented in the PPTA to the identifier
+        of its state. Prefixes are strings when every symbol is a single
+        character and tuples of symbols otherwise.
+    """
+
+    transition_matrix: object
+    states: list
+    alphabet: list
+    prefix_states: dict
+
+
+def _build_prefix_tree(sequence_counts):
+    """
+    Insert weighted sequences into a prefix tree in a single pass.
+
+    Every node of the tree corresponds to a prefix of at least one
+    sequence. Node ``0`` is the empty prefix. Each sequence is inserted
+    once regardless of its count.
+
+    Parameters
+    ----------
+    sequence_counts : iterable of tuple
+        Previously validated ``(sequence, count)`` pairs. The iterable is
+        consumed once and only the prefix tree is retained.
+
+    Returns
+    -------
+    children : list of dict
+        For each node, a mapping from symbol to the child node reached
+        through that symbol.
+    counts : list of int
+        For each node, the number of sequences beginning with its prefix.
+    """
+    children = [{}]
+    counts = [0]
+
+    for sequence, count in sequence_counts:
+        counts[0] += count
+        node = 0
+
+        for symbol in sequence:
+            child = children[node].get(symbol)
+
+            if child is None:
+                child = len(counts)
+                children[node][symbol] = child
+                children.append({})
+                counts.append(0)
+
+            counts[child] += count
+            node = child
+
+    return children, counts
+
+
+def _build_prefix_tree_parallel(sequences, n_jobs):
+    """
+    Build a prefix tree from batches of sequences in worker processes.
+
+    Consecutive batches of sequences are validated and inserted into
+    partial prefix trees by a pool of worker processes, so every worker
+    receives the same amount of input whatever the distribution of the
+    sequences. Each partial tree is returned as compact arrays, and the
+    trees are merged one depth at a time with array operations. At most
+    two batches per worker are held in memory at once, so the input is
+    still consumed in a single streaming pass. Inputs with fewer than
+    ``_PARALLEL_MIN_SEQUENCES`` sequences are built in the current
+    process, where starting the workers would cost more than it saves.
+
+    Parameters
+    ----------
+    sequences : iterable of str, mapping or iterable of tuple
+        Sequences from which the PPTA is constructed.
+    n_jobs : int
+        Number of worker processes.
+
+    Returns
+    -------
+    children : list of dict
+        For each node, a mapping from symbol to the child node reached
+        through that symbol.
+    counts : list of int
+        For each node, the number of sequences beginning with its prefix.
+
+    Raises
+    ------
+    TypeError
+        If the sequences or counts have invalid types.
+    ValueError
+        If the sequences are empty, mix kinds of sequence, or have invalid
+        counts.
+    concurrent.futures.process.BrokenProcessPool
+        If a worker process terminates abruptly.
+    """
+    iterator, pairs = _iter_sequence_elements(sequences)
+    head = list(it.islice(iterator, _PARALLEL_MIN_SEQUENCES))
+
+    if len(head) < _PARALLEL_MIN_SEQUENCES:
+        return _build_prefix_tree(_generate_sequence_counts(iter(head), pairs=pairs))
+
+    elements = it.chain(head, iterator)
+    del head
+
+    codes = {}
+    merged = _empty_prefix_arrays()
+    unmerged = []
+    unmerged_size = 0
+    corpus_kind = None
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = collections.deque()
+
+        try:
+            while True:
+                batch = list(it.islice(elements, _PARALLEL_BATCH_SIZE))
+
+                if batch:
+                    pending.append(
+                        executor.submit(_prefix_tree_arrays, batch, pairs)
+                    )
+
+                if not pending:
+                    break
+
+                # Results are taken in input order, so the first invalid
+                # sequence is reported as in the serial build.
+                if len(pending) >= 2 * n_jobs or not batch:
+                    kind, tree = pending.popleft().result()
+                    corpus_kind = _combine_sequence_kinds(corpus_kind, kind)
+
+                    unmerged.append(_recode_prefix_arrays(tree, codes))
+                    unmerged_size += len(tree[2])
+
+                    # Merging once the unmerged trees are as large as the
+                    # merged tree keeps the total merging work linear.
+                    if unmerged_size >= len(merged[2]):
+                        merged = _merge_prefix_arrays([merged, *unmerged])
+                        unmerged = []
+                        unmerged_size = 0
+        except BaseException:
+            for future in pending:
+                future.cancel()
+
+            raise
+
+    if unmerged:
+        merged = _merge_prefix_arrays([merged, *unmerged])
+
+    return _prefix_arrays_to_tree(merged, list(codes))
+
+
+def _prefix_tree_arrays(batch, pairs):
+    """
+    Validate a batch of sequences and return its prefix tree as arrays.
+
+    Parameters
+    ----------
+    batch : list
+        Sequences or ``(sequence, count)`` pairs.
+    pairs : bool
+        True if every element is a ``(sequence, count)`` pair.
+
+    Returns
+    -------
+    kind : str or None
+        Kind of the non-empty sequences of the batch, as returned by
+        ``_sequence_kind``.
+    tree : tuple
+        ``(parents, codes, counts, depths, symbols)``. The first four are
+        arrays over the nodes in breadth-first order, beginning with the
+        root, whose parent and code are ``-1``. The code of a node indexes
+        the symbols list.
+    """
+    kinds = []
+
+    def sequence_counts():
+        kinds.append((yield from _generate_sequence_counts(iter(batch), pairs=pairs)))
+
+    children, counts = _build_prefix_tree(sequence_counts())
+
+    symbols = {}
+    parents = [-1]
+    codes = [-1]
+    depths = [0]
+    order = [0]
+
+    for position, node in enumerate(order):
+        depth = depths[position] + 1
+
+        for symbol, child in children[node].items():
+            parents.append(position)
+            codes.append(symbols.setdefault(symbol, len(symbols)))
+            depths.append(depth)
+            order.append(child)
+
+    tree = (
+        np.array(parents, dtype=np.intp),
+        np.array(codes, dtype=np.intp),
+        np.array(counts, dtype=np.int64)[order],
+        np.array(depths, dtype=np.intp),
+        list(symbols),
+    )
+
+    return kinds[0], tree
+
+
+def _empty_prefix_arrays():
+    """
+    Return the arrays of a prefix tree holding no sequences.
+
+    Returns
+    -------
+    tuple
+        ``(parents, codes, counts, depths)`` of a tree with only a root.
+    """
+    return (
+        np.array([-1], dtype=np.intp),
+        np.array([-1], dtype=np.intp),
+        np.zeros(1, dtype=np.int64),
+        np.zeros(1, dtype=np.intp),
+    )
+
+
+def _recode_prefix_arrays(tree, codes):
+    """
+    Replace the symbol codes of a partial tree by shared codes.
+
+    Parameters
+    ----------
+    tree : tuple
+        Tree returned by ``_prefix_tree_arrays``.
+    codes : dict
+        Shared code of every symbol seen so far, updated in place.
+
+    Returns
+    -------
+    tuple
+        ``(parents, codes, counts, depths)`` using the shared codes.
+    """
+    parents, local_codes, counts, depths, symbols = tree
+    recode = np.array(
+        [-1] + [codes.setdefault(symbol, len(codes)) for symbol in symbols],
+        dtype=np.intp,
+    )
+
+    return parents, recode[local_codes + 1], counts, depths
+
+
+def _merge_prefix_arrays(trees):
+    """
+    Merge prefix trees held as arrays, one depth at a time.
+
+    Nodes of the same depth are identified by the merged node of their
+    parent and their symbol code, so all the nodes of a depth are merged
+    by a single sort.
+
+    Parameters
+    ----------
+    trees : list of tuple
+        ``(parents, codes, counts, depths)`` of each tree, with nodes in
+        breadth-first order beginning with the root.
+
+    Returns
+    -------
+    tuple
+        ``(parents, codes, counts, depths)`` of the merged tree, with
+        nodes in breadth-first order and the children of each node
+        ordered by code.
+    """
+    sizes = [len(tree[0]) for tree in trees]
+    offsets = np.cumsum([0] + sizes[:-1])
+
+    parents = np.concatenate(
+        [
+            np.where(tree[0] < 0, -1, tree[0] + offset)
+            for tree, offset in zip(trees, offsets)
+        ]
+    )
+    codes = np.concatenate([tree[1] for tree in trees])
+    counts = np.concatenate([tree[2] for tree in trees])
+    depths = np.concatenate([tree[3] for tree in trees])
+
+    n_codes = int(codes.max()) + 1 if len(codes) else 1
+    order = np.argsort(depths, kind="stable")
+    bounds = np.searchsorted(depths[order], np.arange(int(depths.max()) + 2))
+
+    merged_ids = np.zeros(len(parents), dtype=np.intp)
+    merged_parents = [np.array([-1], dtype=np.intp)]
+    merged_codes = [np.array([-1], dtype=np.intp)]
+    merged_counts = [counts[parents < 0].sum(keepdims=True)]
+    merged_depths = [np.zeros(1, dtype=np.intp)]
+    n_merged = 1
+
+    for depth in range(1, len(bounds) - 1):
+        nodes = order[bounds[depth] : bounds[depth + 1]]
+        keys = merged_ids[parents[nodes]] * n_codes + codes[nodes]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+        level_counts = np.zeros(len(unique_keys), dtype=np.int64)
+        np.add.at(level_counts, inverse, counts[nodes])
+
+        merged_ids[nodes] = n_merged + inverse
+        merged_parents.append(unique_keys // n_codes)
+        merged_codes.append(unique_keys % n_codes)
+        merged_counts.append(level_counts)
+        merged_depths.append(np.full(len(unique_keys), depth, dtype=np.intp))
+        n_merged += len(unique_keys)
+
+    return (
+        np.concatenate(merged_parents),
+        np.concatenate(merged_codes),
+        np.concatenate(merged_counts),
+        np.concatenate(merged_depths),
+    )
+
+
+def _prefix_arrays_to_tree(tree, symbols):
+    """
+    Convert a prefix tree held as arrays to child mappings.
+
+    Parameters
+    ----------
+    tree : tuple
+        ``(parents, codes, counts, depths)`` returned by
+        ``_merge_prefix_arrays``.
+    symbols : list
+        Symbol of every shared code.
+
+    Returns
+    -------
+    children : list of dict
+        For each node, a mapping from symbol to the child node reached
+        through that symbol.
+    counts : list of int
+        For each node, the number of sequences beginning with its prefix.
+    """
+    parents, codes, counts, _ = tree
+    children = [{} for _ in range(len(parents))]
+    node_symbols = np.array(symbols + [None], dtype=object)[codes[1:]]
+
+    for child, (parent, symbol) in enumerate(
+        zip(parents[1:].tolist(), node_symbols.tolist()), start=1
+    ):
+        children[parent][symbol] = child
+
+    return children, counts.tolist()
+
+
+def _prune_prefix_tree(children, counts, min_count, max_depth, pruning):
+    """
+    Remove infrequent and deep prefixes from a prefix tree.
+
+    A prefix is removed, together with every prefix extending it, when
+    fewer than min_count sequences begin with it or when it is longer
+    than max_depth. Because prefix counts never increase along a path,
+    only the first removed prefix of each path needs to be recorded.
+
+    Parameters
+    ----------
+    children : list of dict
+        Child mappings returned by ``_build_prefix_tree``.
+    counts : list of int
+        Prefix counts returned by ``_build_prefix_tree``.
+    min_count : int
+        Minimum prefix count of a retained node.
+    max_depth : int or None
+        Maximum depth of a retained node, or None for no limit.
+    pruning : {"truncate", "sink"}
+        With ``"truncate"``, sequences end at their last retained prefix.
+        With ``"sink"``, the transitions into removed prefixes are
+        redirected to a single shared sink state.
+
+    Returns
+    -------
+    children : list of dict
+        Child mappings of the pruned tree.
+    counts : list of int
+        Prefix counts of the pruned tree.
+    folded : list of dict or None
+        For each node of the pruned tree, a mapping from symbol to the
+        number of sequences redirected to the sink through that symbol.
+        None if pruning is ``"truncate"`` or no transition is redirected.
+    """
+    if min_count <= 1 and max_depth is None:
+        return children, counts, None
+
+    pruned_children = [{}]
+    pruned_counts = [counts[0]]
+    folded = [{}]
+    stack = [(0, 0, 0)]
+
+    while stack:
+        node, pruned_node, depth = stack.pop()
+
+        for symbol, child in children[node].items():
+            if counts[child] < min_count or (
+                max_depth is not None and depth >= max_depth
+            ):
+                folded[pruned_node][symbol] = counts[child]
+                continue
+
+            pruned_child = len(pruned_counts)
+            pruned_children[pruned_node][symbol] = pruned_child
+            pruned_children.append({})
+            pruned_counts.append(counts[child])
+            folded.append({})
+            stack.append((child, pruned_child, depth + 1))
+
+    if pruning == "truncate" or not any(folded):
+        folded = None
+
+    return pruned_children, pruned_counts, folded
+
+
+def _order_prefix_tree(children, build, key=None):
+    """
+    Return the nodes of a prefix tree in PPTA state order.
+
+    With ``build="depth"`` the nodes are listed level by level. With
+    ``build="breadth"`` the nodes are visited depth first and the sorted
+    children of each visited node are listed together.
+
+    Parameters
+    ----------
+    children : list of dict
+        Child mappings returned by ``_build_prefix_tree``.
+    build : {"breadth", "depth"}
+        Order in which the PPTA states are constructed.
+    key : callable, optional
+        Function applied to each symbol when sorting the children of a
+        node. Integer codes are sorted by the alphabet symbols they index,
+        so encoded and unencoded sequences produce the same state order.
+
+    Returns
+    -------
+    list of int
+        Prefix-tree nodes in state order, beginning with the empty prefix.
+    """
+    order = [0]
+
+    if build == "depth":
+        i = 0
+
+        while i < len(order):
+            node_children = children[order[i]]
+            order += [
+                node_children[symbol] for symbol in sorted(node_children, key=key)
+            ]
+            i += 1
+
+        return order
+
+    stack = [0]
+
+    while stack:
+        node_children = children[stack.pop()]
+        sorted_children = [
+            node_children[symbol] for symbol in sorted(node_children, key=key)
+        ]
+        order += sorted_children
+        stack += reversed(sorted_children)
+
+    return order
+
+
+def _prefix_tree_paths(children, order):
+    """
+    Return the prefix represented by each ordered prefix-tree node.
+
+    Parameters
+    ----------
+    children : list of dict
+        Child mappings returned by ``_build_prefix_tree``.
+    order : list of int
+        Prefix-tree nodes in state order. Every node must appear after
+        its parent.
+
+    Returns
+    -------
+    list of str or list of tuple
+        State paths in the given order. Paths are strings when every
+        symbol is a single character and tuples of symbols otherwise.
+    """
+    as_string = all(
+        isinstance(symbol, str) and len(symbol) == 1
+        for node in children
+        for symbol in node
+    )
+
+    paths = [""] * len(children) if as_string else [()] * len(children)
+
+    for node in order:
+        for symbol, child in children[node].items():
+            paths[child] = paths[node] + (symbol if as_string else (symbol,))
+
+    return [paths[node] for node in order]
+
+
+def _prefix_tree_to_matrix(
+    children,
+    counts,
+    order,
+    alphabet,
+    sparse=False,
+    folded=None,
+):
+    """
+    Construct a transition-count matrix from an ordered prefix tree.
+
+    Parameters
+    ----------
+    children : list of dict
+        Child mappings returned by ``_build_prefix_tree``.
+    counts : list of int
+        Prefix counts returned by ``_build_prefix_tree``.
+    order : list of int
+        Prefix-tree nodes in state order.
+    alphabet : list of str
+        Alphabet corresponding to the first dimension of the matrix.
+        Integer symbols are codes that already index alphabet.
+    sparse : bool, default=False
+        Whether to return one ``scipy.sparse.csr_array`` per symbol
+        instead of a dense array.
+    folded : list of dict, optional
+        Transitions into the sink state returned by
+        ``_prune_prefix_tree``. If given, the sink is the last state.
+
+    Returns
+    -------
+    np.ndarray or list of scipy.sparse.csr_array
+        Transition-count matrix whose first state is the artificial
+        initial state ``"*"``.
+    """
+    n, symbols, sources, destinations, values = _prefix_tree_transitions(
+        children,
+        counts,
+        order,
+        alphabet,
+        folded,
+    )
+
+    if sparse:
+        symbols = np.asarray(symbols)
+        sources = np.asarray(sources)
+        destinations = np.asarray(destinations)
+        values = np.asarray(values, dtype=int)
+
+        transition_matrix = []
+
+        for z in range(len(alphabet)):
+            mask = symbols == z
+            transition_matrix.append(
+                sp.csr_array(
+                    (values[mask], (sources[mask], destinations[mask])),
+                    shape=(n, n),
+                )
+            )
+
+        return transition_matrix
+
+    transition_matrix = np.zeros((len(alphabet), n, n), dtype=int)
+    transition_matrix[symbols, sources, destinations] = values
+
+    return transition_matrix
+
+
+def _prefix_tree_to_delta_table(
+    children,
+    counts,
+    order,
+    alphabet,
+    folded,
+    directory,
+):
+    """
+    Write an ordered prefix tree to a memory-mapped delta table.
+
+    Parameters
+    ----------
+    children : list of dict
+        Child mappings returned by ``_build_prefix_tree``.
+    counts : list of int
+        Prefix counts returned by ``_build_prefix_tree``.
+    order : list of int
+        Prefix-tree nodes in state order.
+    alphabet : list of str
+        Alphabet corresponding to the columns of the delta table.
+    folded : list of dict or None
+        Transitions into the sink state returned by
+        ``_prune_prefix_tree``.
+    directory : str or os.PathLike
+        Directory in which the delta table and its index are saved.
+
+    Returns
+    -------
+    DeltaTable
+        Delta table of read-only ``np.memmap`` arrays.
+    """
+    n, symbols, sources, destinations, values = _prefix_tree_transitions(
+        children,
+        counts,
+        order,
+        alphabet,
+        folded,
+    )
+
+    delta_table = _create_delta_table(
+        directory,
+        ["*"] + list(range(n - 1)),
+        alphabet,
+        int,
+    )
+    delta_destinations, delta_counts, final_counts = delta_table
+
+    delta_destinations[sources, symbols] = destinations
+    delta_counts[sources, symbols] = values
+
+    np.add.at(final_counts, destinations, values)
+    final_counts -= delta_counts.sum(axis=1)
+    final_counts[0] = 0
+
+    for array in delta_table:
+        array.flush()
+
+    return load_delta_table(directory)[0]
+
+
+def _prefix_tree_transitions(children, counts, order, alphabet, folded=None):
+    """
+    Return the transitions of an ordered prefix tree as index lists.
+
+    Parameters
+    ----------
+    children : list of dict
+        Child mappings returned by ``_build_prefix_tree``.
+    counts : list of int
+        Prefix counts returned by ``_build_prefix_tree``.
+    order : list of int
+        Prefix-tree nodes in state order.
+    alphabet : list of str
+        Alphabet of the transitions. Integer symbols are codes that
+        already index alphabet.
+    folded : list of dict, optional
+        Transitions into the sink state returned by
+        ``_prune_prefix_tree``. If given, the sink is the last state.
+
+    Returns
+    -------
+    n : int
+        Number of states, including the artificial initial state.
+    symbols, sources, destinations, values : list of int
+        Symbol index, source row, destination row and count of every
+        transition, beginning with the transition from ``"*"``.
+    """
+    n = len(order) + 1 + (folded is not None)
+
+    position = [0] * len(children)
+
+    for i, node in enumerate(order):
+        position[node] = i + 1
+
+    symbol_index = {symbol: k for k, symbol in enumerate(alphabet)}
+
+    symbols = [0]
+    sources = [0]
+    destinations = [1]
+    values = [counts[0]]
+
+    for node in order:
+        for symbol, child in children[node].items():
+            # Integer codes already index the alphabet.
+            symbols.append(symbol_index.get(symbol, symbol))
+            sources.append(position[node])
+            destinations.append(position[child])
+            values.append(counts[child])
+
+        if folded is not None:
+            for symbol, count in folded[node].items():
+                symbols.append(symbol_index.get(symbol, symbol))
+                sources.append(position[node])
+                destinations.append(n - 1)
+                values.append(count)
+
+    return n, symbols, sources, destinations, values
+
+
+def _check_observed_symbols(observed_symbols, alphabet):
+    """
+    Check that the symbols of a prefix tree are represented by an alphabet.
+
+    Parameters
+    ----------
+    observed_symbols : set
+        Symbols found in the sequences. String symbols must appear in
+        alphabet, while integer symbols are codes that index alphabet.
+    alphabet : list of str
+        Validated alphabet.
+
+    Returns
+    -------
+    callable or None
+        Sort key that orders integer codes by the symbols they index, or
+        None when the sequences contain string symbols.
+
+    Raises
+    ------
+    ValueError
+        If integer-coded and symbol sequences are mixed, or alphabet
+        omits an observed symbol or code.
+    """
+    codes = {
+        symbol
+        for symbol in observed_symbols
+        if isinstance(symbol, (int, np.integer)) and not isinstance(symbol, bool)
+    }
+
+    if not codes:
+        missing_symbols = observed_symbols - set(alphabet)
+    elif len(codes) == len(observed_symbols):
+        missing_symbols = {code for code in codes if not 0 <= code < len(alphabet)}
+    else:
+        raise ValueError(
+            "sequences must not mix integer-coded and symbol sequences."
+        )
+
+    if missing_symbols:
+        raise ValueError(
+            "alphabet is missing symbols found in sequences: "
+            f"{sorted(missing_symbols)}."
+        )
+
+    return alphabet.__getitem__ if codes else None
+
+
+def read_sequences(file, encoding="utf-8", delimiter=None):
+    """
+    Lazily read sequences from a text file with one sequence per line.
+
+    Lines are yielded one at a time without their line endings, so the
+    result can be passed to any PPTA construction function without
+    loading the file into memory. Blank lines are yielded as empty
+    sequences.
+
+    Parameters
+    ----------
+    file : str, os.PathLike or file object
+        Path to the text file, or an open text-mode file object.
+    encoding : str, default="utf-8"
+        Encoding used when file is a path.
+    delimiter : str, optional
+        String separating the tokens on each line, such as ``","`` for
+        lines like ``"ADM,XRAY,DIS"``. If given, each line is yielded as
+        a list of tokens. If None, each line is yielded as a string of
+        single-character symbols.
+
+    Yields
+    ------
+    str or list of str
+        The sequence on each line of the file.
+
+    Notes
+    -----
+    Data produced in chunks, for example by a chunked database or CSV
+    reader, can be streamed in the same way by flattening the chunks with
+    ``itertools.chain.from_iterable``.
+    """
+    if hasattr(file, "read"):
+        for line in file:
+            yield _split_line(line, delimiter)
+
+        return
+
+    with open(file, encoding=encoding) as f:
+        for line in f:
+            yield _split_line(line, delimiter)
+
+
+def _split_line(line, delimiter):
+    """
+    Return the sequence stored on a line of a sequence file.
+
+    Parameters
+    ----------
+    line : str
+        Line read from the file, including any line ending.
+    delimiter : str or None
+        String separating the tokens on the line, or None if the line is
+        a string of single-character symbols.
+
+    Returns
+    -------
+    str or list of str
+        The sequence without its line ending.
+    """
+    sequence = line.rstrip("\r\n")
+
+    if delimiter is None:
+        return sequence
+
+    return sequence.split(delimiter) if sequence else []
+
 
 def get_alphabet(sequences):
     """
@@ -19,8 +878,11 @@ def get_alphabet(sequences):
 
     Parameters
     ----------
-    sequences : iterable of str
-        Sequences from which the alphabet is obtained.
+    sequences : iterable of sequences, mapping or iterable of tuple
+        Sequences from which the alphabet is obtained. Pre-aggregated
+        data may be given as a mapping from sequence to count, such as a
+        ``collections.Counter``, or as ``(sequence, count)`` pairs. The
+        iterable is consumed in a single pass.
 
     Returns
     -------
@@ -31,171 +893,484 @@ def get_alphabet(sequences):
     ------
     TypeError
         If sequences is None, is a single string, or contains
-        non-string elements.
+        non-string sequences or non-integer counts.
     ValueError
-        If sequences is empty.
+        If sequences is empty or contains a count that is not positive.
     """
-    sequences = _validate_sequences(sequences)
-    return sorted(set("".join(sequences)))
+    sequence_counts = _iter_sequence_counts(sequences)
+
+    observed_symbols = set()
+
+    for sequence, _ in sequence_counts:
+        observed_symbols.update(sequence)
 
+    return _alphabet_from_symbols(observed_symbols)
 
-def get_state_paths(sequences, build="breadth"):
+
+def _alphabet_from_symbols(observed_symbols):
     """
-    Return the state paths within a PPTA.
+    Return the sorted alphabet of a set of observed symbols.
 
     Parameters
     ----------
-    sequences : iterable of str
-        Sequences used to construct the PPTA.
-    build : {"breadth", "depth"}, default="breadth"
-        Order in which the state paths are constructed.
+    observed_symbols : set
+        Symbols found in the sequences.
 
     Returns
     -------
     list of str
-        State paths in the requested construction order.
+        Sorted observed symbols.
 
     Raises
     ------
     TypeError
-        If sequences is None, is a single string, or contains
-        non-string elements.
+        If the symbols are integer codes, which do not determine the
+        alphabet they index.
+    """
+    if not all(isinstance(symbol, str) for symbol in observed_symbols):
+        raise TypeError(
+            "the alphabet of integer-coded sequences cannot be derived; use "
+            "the alphabet that the codes index."
+        )
+
+    return sorted(observed_symbols)
+
+
+def encode_sequences(sequences, alphabet=None):
+    """
+    Encode symbol sequences as arrays of integer codes.
+
+    The mapping from symbol to code is built once, and each code is the
+    index of its symbol in alphabet. The encoded sequences can be passed
+    with the same alphabet to the PPTA construction and probability
+    functions, which then work on integers rather than on strings.
+
+    Parameters
+    ----------
+    sequences : iterable of str or list of str
+        Sequences to encode. Each sequence is either a string of
+        single-character symbols or a list of string tokens.
+    alphabet : iterable of str, optional
+        Symbols to encode against, for example the alphabet returned when
+        the training sequences were encoded. If None, the sorted alphabet
+        of sequences is used.
+
+    Returns
+    -------
+    encoded_sequences : list of np.ndarray
+        One-dimensional integer array of codes for each sequence.
+    alphabet : list of str
+        Alphabet indexed by the codes.
+
+    Raises
+    ------
+    TypeError
+        If sequences is None, is a single string, or contains sequences
+        that are neither strings nor lists of tokens.
     ValueError
-        If sequences is empty or build is not "breadth" or "depth".
+        If sequences is empty, or alphabet omits observed symbols.
     """
-    sequences = _validate_sequences(sequences)
+    if sequences is None:
+        raise TypeError("sequences must be an iterable of strings.")
 
-    if build not in {"breadth", "depth"}:
-        raise ValueError("build must be either 'breadth' or 'depth'.")
+    if isinstance(sequences, str):
+        raise TypeError(
+            "sequences must be an iterable of strings, not a single string."
+        )
 
-    if build == "breadth":
-        all_paths = [""]
-        all_ordered = [""]
-        current_node = all_paths[0]
-        tracker = 0
-
-        while tracker < len(all_paths):
-            this_iter = sorted(
-                list(
-                    set(
-                        [
-                            x[: len(current_node) + 1]
-                            for x in sequences
-                            if len(x) > len(current_node) and x.startswith(current_node)
-                        ]
-                    )
-                )
+    sequences = list(sequences)
+
+    if not all(isinstance(sequence, (str, list, tuple)) for sequence in sequences):
+        raise TypeError(
+            "every sequence must be a string or a list of tokens."
+        )
+
+    if alphabet is None:
+        alphabet = get_alphabet(sequences)
+    else:
+        alphabet = _validate_alphabet(alphabet)
+
+    symbol_index = {symbol: k for k, symbol in enumerate(alphabet)}
+
+    try:
+        encoded_sequences = [
+            np.fromiter(
+                (symbol_index[symbol] for symbol in sequence),
+                dtype=np.intp,
+                count=len(sequence),
             )
+            for sequence in sequences
+        ]
+    except KeyError:
+        missing_symbols = {
+            symbol
+            for sequence in sequences
+            for symbol in sequence
+            if symbol not in symbol_index
+        }
 
-            for j in range(len(this_iter)):
-                all_paths.append(this_iter[j])
-                all_ordered.insert(
-                    all_ordered.index(current_node) + 1 + j,
-                    this_iter[j],
-                )
+        raise ValueError(
+            "alphabet is missing symbols found in sequences: "
+            f"{sorted(missing_symbols)}."
+        ) from None
+
+    return encoded_sequences, alphabet
 
-            tracker += 1
 
-            if tracker == len(all_paths):
-                break
+def get_state_paths(
+    sequences,
+    build="breadth",
+    min_count=1,
+    max_depth=None,
+    pruning="truncate",
+):
+    """
+    Return the state paths within a PPTA.
 
-            current_node = all_ordered[all_ordered.index(current_node) + 1]
+    The paths are read from a single walk of a prefix tree built from the
+    sequences, so the cost is linear in the total number of symbols.
 
-        return all_paths
+    Parameters
+    ----------
+    sequences : iterable of sequences, mapping or iterable of tuple
+        Sequences used to construct the PPTA. Pre-aggregated data may be
+        given as a mapping from sequence to count, such as a
+        ``collections.Counter``, or as ``(sequence, count)`` pairs. The
+        iterable is consumed in a single pass.
+    build : {"breadth", "depth"}, default="breadth"
+        Order in which the state paths are constructed.
+    min_count : int, default=1
+        Minimum number of sequences that must begin with a prefix for it
+        to become a state. Rarer prefixes are pruned together with every
+        prefix extending them.
+    max_depth : int, optional
+        Maximum length of the prefix represented by a state. Longer
+        prefixes are pruned. If None, the depth is not limited.
+    pruning : {"truncate", "sink"}, default="truncate"
+        How pruned prefixes are represented. With ``"truncate"``, the
+        affected sequences end at their last retained prefix. With
+        ``"sink"``, the transitions into pruned prefixes lead to a single
+        shared sink state, appended as the last state, at which those
+        sequences end.
 
-    all_paths = [""]
-    current_node = all_paths[0]
-    tracker = 0
+    Returns
+    -------
+    list of str
+        State paths in the requested construction order. The path of the
+        sink state, if any, is None.
 
-    while tracker < len(all_paths):
-        this_iter = sorted(
-            list(
-                set(
-                    [
-                        x[: len(current_node) + 1]
-                        for x in sequences
-                        if (
-                            len(x) > len(current_node)
-                            and x.startswith(current_node)
-                        )
-                    ]
-                )
-            )
-        )
+    Raises
+    ------
+    TypeError
+        If sequences is None, is a single string, or contains
+        non-string sequences or non-integer counts, or min_count or
+        max_depth is not an integer.
+    ValueError
+        If sequences is empty, contains a count that is not positive,
+        build is not "breadth" or "depth", or a pruning option is
+        invalid.
+    """
+    sequence_counts = _iter_sequence_counts(sequences)
 
-        for j in range(len(this_iter)):
-            all_paths.append(this_iter[j])
+    if build not in {"breadth", "depth"}:
+        raise ValueError("build must be either 'breadth' or 'depth'.")
 
-        tracker += 1
+    _validate_pruning(min_count, max_depth, pruning)
 
-        if tracker == len(all_paths):
-            break
+    children, counts = _build_prefix_tree(sequence_counts)
+    children, _, folded = _prune_prefix_tree(
+        children,
+        counts,
+        min_count,
+        max_depth,
+        pruning,
+    )
+    order = _order_prefix_tree(children, build)
+    paths = _prefix_tree_paths(children, order)
 
-        current_node = all_paths[all_paths.index(current_node) + 1]
+    if folded is not None:
+        paths.append(None)
 
-    return all_paths
+    return paths
 
 
-def get_transition_matrix(sequences, alphabet, build="breadth"):
+def get_transition_matrix(
+    sequences,
+    alphabet,
+    build="breadth",
+    n_jobs=None,
+    sparse=False,
+    min_count=1,
+    max_depth=None,
+    pruning="truncate",
+    memmap=None,
+):
     """
     Return the transition-count matrix of a PPTA.
 
+    Each sequence is inserted into a prefix tree once, so the matrix is
+    constructed in time linear in the total number of observed symbols.
+    The insertion work can be shared between several worker processes.
+
     Parameters
     ----------
-    sequences : iterable of str
-        Sequences used to construct the PPTA.
+    sequences : iterable of sequences, mapping or iterable of tuple
+        Sequences used to construct the PPTA. Pre-aggregated data may be
+        given as a mapping from sequence to count, such as a
+        ``collections.Counter``, or as ``(sequence, count)`` pairs. The
+        iterable is consumed in a single pass.
     alphabet : iterable of str
         Symbols represented in the transition matrix.
     build : {"breadth", "depth"}, default="breadth"
         Order in which the PPTA states are constructed.
+    n_jobs : int, optional
+        Number of worker processes used to build the prefix tree. ``None``
+        and ``1`` build it in the current process, while ``-1`` uses
+        every available CPU. Inputs of fewer than 100000 sequences are
+        built in the current process. The result does not depend on
+        n_jobs.
+    sparse : bool, default=False
+        Whether to return the sparse format, a list containing one
+        ``scipy.sparse.csr_array`` per symbol. Its memory use grows with
+        the number of transitions rather than the square of the number of
+        states.
+    min_count : int, default=1
+        Minimum number of sequences that must begin with a prefix for it
+        to become a state. Rarer prefixes are pruned together with every
+        prefix extending them.
+    max_depth : int, optional
+        Maximum length of the prefix represented by a state. Longer
+        prefixes are pruned. If None, the depth is not limited.
+    pruning : {"truncate", "sink"}, default="truncate"
+        How pruned prefixes are represented. With ``"truncate"``, the
+        affected sequences end at their last retained prefix. With
+        ``"sink"``, the transitions into pruned prefixes lead to a single
+        shared sink state, appended as the last state, at which those
+        sequences end.
+    memmap : str or os.PathLike, optional
+        Directory in which to store the PPTA as a delta table of
+        memory-mapped ``.npy`` files, together with its states and
+        alphabet. The PPTA is written to disk without allocating a dense
+        or sparse matrix, and can be reopened by other processes using
+        ``load_delta_table``. The prefix tree is still built in memory.
+        Cannot be combined with sparse.
 
     Returns
     -------
-    np.ndarray
+    np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Three-dimensional transition-count matrix with shape
-        (number of symbols, number of states, number of states).
+        (number of symbols, number of states, number of states), or a
+        read-only memory-mapped delta table if memmap is given.
 
     Raises
     ------
     TypeError
-        If sequences or alphabet has an invalid type.
+        If sequences, alphabet, n_jobs, min_count or max_depth has an
+        invalid type.
     ValueError
-        If sequences or alphabet is empty, build is invalid, alphabet
-        contains duplicate symbols, or alphabet omits observed symbols.
+        If sequences or alphabet is empty, build, n_jobs or a pruning
+        option is invalid, alphabet contains duplicate symbols, alphabet
+        omits observed symbols, or both sparse and memmap are given.
+
+    Notes
+    -----
+    Pruning rare or deep prefixes shrinks the matrix and the number of
+    state pairs that ``alergia`` must test, at the cost of no longer
+    distinguishing the histories of the pruned sequences. The same
+    pruning options must be passed to ``get_initial_states``.
     """
-    sequences = _validate_sequences(sequences)
+    sequence_counts = _iter_sequence_counts(sequences)
     alphabet = _validate_alphabet(alphabet)
 
-    observed_symbols = set("".join(sequences))
-    missing_symbols = observed_symbols - set(alphabet)
+    if build not in {"breadth", "depth"}:
+        raise ValueError("build must be either 'breadth' or 'depth'.")
 
-    if missing_symbols:
-        raise ValueError(
-            "alphabet is missing symbols found in sequences: "
-            f"{sorted(missing_symbols)}."
+    n_jobs = _validate_n_jobs(n_jobs)
+    _validate_pruning(min_count, max_depth, pruning)
+
+    if sparse and memmap is not None:
+        raise ValueError("sparse and memmap cannot both be given.")
+
+    if n_jobs > 1:
+        children, counts = _build_prefix_tree_parallel(sequences, n_jobs)
+    else:
+        children, counts = _build_prefix_tree(sequence_counts)
+
+    observed_symbols = {symbol for node in children for symbol in node}
+    key = _check_observed_symbols(observed_symbols, alphabet)
+
+    children, counts, folded = _prune_prefix_tree(
+        children,
+        counts,
+        min_count,
+        max_depth,
+        pruning,
+    )
+    order = _order_prefix_tree(children, build, key)
+
+    if memmap is not None:
+        return _prefix_tree_to_delta_table(
+            children,
+            counts,
+            order,
+            alphabet,
+            folded,
+            memmap,
         )
 
-    all_nodes = get_state_paths(sequences, build=build)
-    all_nodes.insert(0, "*")
+    return _prefix_tree_to_matrix(
+        children,
+        counts,
+        order,
+        alphabet,
+        sparse,
+        folded,
+    )
 
-    n = len(all_nodes)
 
-    transition_matrix = np.zeros((len(alphabet), n, n), dtype=int)
-    transition_matrix[0, 0, 1] = len(sequences)
+def build_ppta(
+    sequences,
+    alphabet=None,
+    build="breadth",
+    n_jobs=None,
+    sparse=False,
+    min_count=1,
+    max_depth=None,
+    pruning="truncate",
+    memmap=None,
+):
+    """
+    Build a PPTA and return its matrix, states, alphabet and prefix index.
 
-    for i in range(1, n):
-        for k in range(len(alphabet)):
-            next_node = all_nodes[i] + alphabet[k]
+    The sequences are validated and inserted into a prefix tree once, and
+    every component of the PPTA is read from that tree. This replaces
+    separate calls to ``get_alphabet``, ``get_initial_states``,
+    ``get_transition_matrix`` and ``get_state_paths``, each of which
+    traverses the sequences again.
 
-            if next_node in all_nodes:
-                transition_matrix[k, i, all_nodes.index(next_node)] = len(
-                    [x for x in sequences if x.startswith(next_node)]
-                )
+    Parameters
+    ----------
+    sequences : iterable of sequences, mapping or iterable of tuple
+        Sequences used to construct the PPTA. Pre-aggregated data may be
+        given as a mapping from sequence to count, such as a
+        ``collections.Counter``, or as ``(sequence, count)`` pairs. The
+        iterable is consumed in a single pass.
+    alphabet : iterable of str, optional
+        Symbols represented in the transition matrix. If None, the sorted
+        symbols observed in sequences are used. Required for
+        integer-coded sequences.
+    build : {"breadth", "depth"}, default="breadth"
+        Order in which the PPTA states are constructed.
+    n_jobs : int, optional
+        Number of worker processes used to build the prefix tree. ``None``
+        and ``1`` build it in the current process, while ``-1`` uses
+        every available CPU. Inputs of fewer than 100000 sequences are
+        built in the current process.
+    sparse : bool, default=False
+        Whether to return the transition matrix in the sparse format.
+    min_count : int, default=1
+        Minimum number of sequences that must begin with a prefix for it
+        to become a state.
+    max_depth : int, optional
+        Maximum length of the prefix represented by a state. If None, the
+        depth is not limited.
+    pruning : {"truncate", "sink"}, default="truncate"
+        How pruned prefixes are represented. See
+        ``get_transition_matrix``.
+    memmap : str or os.PathLike, optional
+        Directory in which to store the transition matrix as a
+        memory-mapped delta table. See ``get_transition_matrix``.
 
-    return transition_matrix
+    Returns
+    -------
+    PPTA
+        Transition-count matrix, states, alphabet and the state of every
+        represented prefix. The sink state of ``pruning="sink"`` has no
+        prefix.
+
+    Raises
+    ------
+    TypeError
+        If sequences, alphabet, n_jobs, min_count or max_depth has an
+        invalid type, or alphabet is None for integer-coded sequences.
+    ValueError
+        If sequences or alphabet is empty, alphabet is None and the
+        sequences contain no symbols, build, n_jobs or a pruning option is
+        invalid, alphabet contains duplicate symbols, alphabet omits
+        observed symbols, or both sparse and memmap are given.
+    """
+    sequence_counts = _iter_sequence_counts(sequences)
+
+    if alphabet is not None:
+        alphabet = _validate_alphabet(alphabet)
+
+    if build not in {"breadth", "depth"}:
+        raise ValueError("build must be either 'breadth' or 'depth'.")
+
+    n_jobs = _validate_n_jobs(n_jobs)
+    _validate_pruning(min_count, max_depth, pruning)
+
+    if sparse and memmap is not None:
+        raise ValueError("sparse and memmap cannot both be given.")
+
+    if n_jobs > 1:
+        children, counts = _build_prefix_tree_parallel(sequences, n_jobs)
+    else:
+        children, counts = _build_prefix_tree(sequence_counts)
+
+    observed_symbols = {symbol for node in children for symbol in node}
+
+    if alphabet is None:
+        alphabet = _alphabet_from_symbols(observed_symbols)
+
+        if not alphabet:
+            raise ValueError("alphabet must contain at least one symbol.")
+
+    key = _check_observed_symbols(observed_symbols, alphabet)
 
+    children, counts, folded = _prune_prefix_tree(
+        children,
+        counts,
+        min_count,
+        max_depth,
+        pruning,
+    )
+    order = _order_prefix_tree(children, build, key)
 
-def get_initial_states(sequences):
+    if memmap is not None:
+        transition_matrix = _prefix_tree_to_delta_table(
+            children,
+            counts,
+            order,
+            alphabet,
+            folded,
+            memmap,
+        )
+    else:
+        transition_matrix = _prefix_tree_to_matrix(
+            children,
+            counts,
+            order,
+            alphabet,
+            sparse,
+            folded,
+        )
+
+    n_states = len(order) + (folded is not None)
+    states = StateRegistry(["*"] + list(range(n_states)))
+    prefix_states = dict(
+        zip(_prefix_tree_paths(children, order), range(len(order)))
+    )
+
+    return PPTA(transition_matrix, states, alphabet, prefix_states)
+
+
+def get_initial_states(
+    sequences,
+    min_count=1,
+    max_depth=None,
+    pruning="truncate",
+):
     """
     Return the initial state identifiers of a PPTA.
 
@@ -204,24 +1379,349 @@ def get_initial_states(sequences):
 
     Parameters
     ----------
-    sequences : iterable of str
-        Sequences used to construct the PPTA.
+    sequences : iterable of sequences, mapping or iterable of tuple
+        Sequences used to construct the PPTA. Pre-aggregated data may be
+        given as a mapping from sequence to count, such as a
+        ``collections.Counter``, or as ``(sequence, count)`` pairs. The
+        iterable is consumed in a single pass.
+    min_count : int, default=1
+        Minimum number of sequences that must begin with a prefix for it
+        to become a state. Rarer prefixes are pruned together with every
+        prefix extending them.
+    max_depth : int, optional
+        Maximum length of the prefix represented by a state. Longer
+        prefixes are pruned. If None, the depth is not limited.
+    pruning : {"truncate", "sink"}, default="truncate"
+        How pruned prefixes are represented. With ``"truncate"``, the
+        affected sequences end at their last retained prefix. With
+        ``"sink"``, the transitions into pruned prefixes lead to a single
+        shared sink state, appended as the last state, at which those
+        sequences end.
 
     Returns
     -------
-    list
+    StateRegistry
         State identifiers, beginning with the artificial initial state
-        ``"*"``.
+        ``"*"``. The registry is a list with constant-time lookup of
+        state positions.
 
     Raises
     ------
     TypeError
         If sequences is None, is a single string, or contains non-string
-        elements.
+        sequences or non-integer counts, or min_count or max_depth is not
+        an integer.
     ValueError
-        If sequences is empty.
+        If sequences is empty, contains a count that is not positive, or
+        a pruning option is invalid.
     """
-    states = list(range(len(get_state_paths(sequences))))
+    sequence_counts = _iter_sequence_counts(sequences)
+    _validate_pruning(min_count, max_depth, pruning)
+
+    children, counts = _build_prefix_tree(sequence_counts)
+    children, _, folded = _prune_prefix_tree(
+        children,
+        counts,
+        min_count,
+        max_depth,
+        pruning,
+    )
+
+    states = StateRegistry(range(len(children) + (folded is not None)))
     states.insert(0, "*")
 
-    return states
\ No newline at end of file
+    return states
+
+
+def update_transition_matrix(sequences, transition_matrix, states, alphabet):
+    """
+    Add new sequences to an existing PPTA.
+
+    Only the states visited by the new sequences are inspected, so the
+    sequences the existing PPTA was built from are not reprocessed. New
+    states receive the next unused integer identifiers and new symbols are
+    appended to the alphabet in sorted order, so the indices of existing
+    states and symbols are unchanged.
+
+    Parameters
+    ----------
+    sequences : iterable of sequences, mapping or iterable of tuple
+        New sequences to add. Pre-aggregated data may be given as a
+        mapping from sequence to count, such as a ``collections.Counter``,
+        or as ``(sequence, count)`` pairs. The iterable is consumed in a
+        single pass.
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix of the existing PPTA, as returned by
+        ``get_transition_matrix``. Sparse matrices and delta tables are
+        updated without allocating a dense array.
+    states : list
+        State identifiers of the existing PPTA, as returned by
+        ``get_initial_states``.
+    alphabet : iterable of str
+        Alphabet corresponding to the first dimension of
+        transition_matrix. Integer-coded sequences index this alphabet.
+
+    Returns
+    -------
+    updated_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix including the new sequences, in the same
+        format as transition_matrix.
+    updated_states : list
+        State identifiers corresponding to updated_matrix.
+    updated_alphabet : list of str
+        Alphabet corresponding to the first dimension of updated_matrix.
+
+    Raises
+    ------
+    TypeError
+        If sequences, transition_matrix or alphabet has an invalid type.
+    ValueError
+        If sequences or alphabet is empty, transition_matrix has invalid
+        contents or dimensions, states does not contain a root state, an
+        integer code is outside the alphabet, or a visited state has more
+        than one transition for the same symbol.
+
+    Notes
+    -----
+    The states of the updated PPTA are equivalent to those of a PPTA
+    rebuilt from all of the sequences, but new states are appended rather
+    than placed in breadth or depth order.
+    """
+    alphabet = _validate_alphabet(alphabet)
+
+    _validate_transition_matrix(
+        transition_matrix,
+        alphabet,
+        states,
+    )
+
+    if len(states) < 2:
+        raise ValueError("states must contain the artificial and root states.")
+
+    n = len(states)
+    symbol_index = {symbol: k for k, symbol in enumerate(alphabet)}
+
+    children = {}
+    increments = {}
+    new_symbols = set()
+    new_state_count = 0
+    total = 0
+
+    for sequence, count in _iter_sequence_counts(sequences):
+        total += count
+        node = 1
+
+        for symbol in sequence:
+            if not isinstance(symbol, str):
+                # Integer codes index the existing alphabet.
+                if not 0 <= symbol < len(alphabet):
+                    raise ValueError(
+                        "alphabet is missing symbols found in sequences: "
+                        f"[{symbol}]."
+                    )
+
+                symbol = alphabet[symbol]
+
+            if node not in children:
+                children[node] = _get_existing_children(
+                    transition_matrix,
+                    alphabet,
+                    node,
+                )
+
+            child = children[node].get(symbol)
+
+            if child is None:
+                child = n + new_state_count
+                new_state_count += 1
+                children[node][symbol] = child
+                children[child] = {}
+
+                if symbol not in symbol_index:
+                    new_symbols.add(symbol)
+
+            key = (symbol, node, child)
+            increments[key] = increments.get(key, 0) + count
+            node = child
+
+    updated_alphabet = alphabet + sorted(new_symbols)
+    symbol_index = {symbol: k for k, symbol in enumerate(updated_alphabet)}
+    updated_n = n + new_state_count
+
+    increments[(alphabet[0], 0, 1)] = total
+
+    if _is_delta(transition_matrix):
+        updated_matrix = _update_delta_table(
+            transition_matrix,
+            increments,
+            symbol_index,
+            updated_n,
+        )
+    elif _is_sparse(transition_matrix):
+        updated_matrix = _update_sparse_matrix(
+            transition_matrix,
+            increments,
+            symbol_index,
+            updated_n,
+        )
+    else:
+        updated_matrix = np.zeros(
+            (len(updated_alphabet), updated_n, updated_n),
+            dtype=transition_matrix.dtype,
+        )
+        updated_matrix[: len(alphabet), :n, :n] = transition_matrix
+
+        for (symbol, source, destination), count in increments.items():
+            updated_matrix[symbol_index[symbol], source, destination] += count
+
+    next_identifier = 1 + max(
+        (
+            state
+            for state in states
+            if isinstance(state, (int, np.integer)) and not isinstance(state, bool)
+        ),
+        default=-1,
+    )
+
+    updated_states = StateRegistry(states)
+    updated_states += range(next_identifier, next_identifier + new_state_count)
+
+    return updated_matrix, updated_states, updated_alphabet
+
+
+def _get_existing_children(transition_matrix, alphabet, node):
+    """
+    Return the children of an existing PPTA state.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix of the PPTA.
+    alphabet : list of str
+        Alphabet corresponding to the first dimension of
+        transition_matrix.
+    node : int
+        Index of the state whose children are returned.
+
+    Returns
+    -------
+    dict
+        Mapping from symbol to the index of the child state.
+
+    Raises
+    ------
+    ValueError
+        If the state has more than one transition for the same symbol.
+    """
+    existing_children = {}
+
+    for k, symbol in enumerate(alphabet):
+        destinations = _positive_destinations(transition_matrix, k, node)
+
+        if len(destinations) > 1:
+            raise ValueError(
+                "transition_matrix must be deterministic for the states "
+                "visited by the new sequences."
+            )
+
+        if len(destinations) == 1:
+            existing_children[symbol] = int(destinations[0])
+
+    return existing_children
+
+
+def _update_delta_table(delta_table, increments, symbol_index, n):
+    """
+    Add transition counts to a delta table.
+
+    Parameters
+    ----------
+    delta_table : DeltaTable
+        Existing delta table of the PPTA.
+    increments : dict
+        Mapping from ``(symbol, source, destination)`` to the count added
+        to that transition.
+    symbol_index : dict
+        Mapping from each symbol of the updated alphabet to its index.
+    n : int
+        Number of states of the updated delta table.
+
+    Returns
+    -------
+    DeltaTable
+        Updated delta table with one column per symbol of the updated
+        alphabet.
+    """
+    n_states, n_symbols = delta_table.destinations.shape
+    shape = (n, len(symbol_index))
+
+    destinations = np.full(shape, -1, dtype=delta_table.destinations.dtype)
+    destinations[:n_states, :n_symbols] = delta_table.destinations
+
+    counts = np.zeros(shape, dtype=delta_table.counts.dtype)
+    counts[:n_states, :n_symbols] = delta_table.counts
+
+    final_counts = np.zeros(n, dtype=delta_table.final_counts.dtype)
+    final_counts[:n_states] = delta_table.final_counts
+
+    for (symbol, source, destination), count in increments.items():
+        z = symbol_index[symbol]
+        destinations[source, z] = destination
+        counts[source, z] += count
+        final_counts[destination] += count
+
+        if source > 0:
+            final_counts[source] -= count
+
+    return DeltaTable(destinations, counts, final_counts)
+
+
+def _update_sparse_matrix(transition_matrix, increments, symbol_index, n):
+    """
+    Add transition counts to a sparse transition-count matrix.
+
+    Only the new counts are converted, so the cost of an update grows with
+    the number of new transitions rather than with the number of states.
+
+    Parameters
+    ----------
+    transition_matrix : list of scipy.sparse.csr_array
+        Existing sparse transition-count matrix.
+    increments : dict
+        Mapping from ``(symbol, source, destination)`` to the count added
+        to that transition.
+    symbol_index : dict
+        Mapping from each symbol of the updated alphabet to its index.
+    n : int
+        Number of states of the updated matrix.
+
+    Returns
+    -------
+    list of scipy.sparse.csr_array
+        Updated transition-count matrix with one matrix per symbol of the
+        updated alphabet.
+    """
+    entries = [([], [], []) for _ in symbol_index]
+
+    for (symbol, source, destination), count in increments.items():
+        values, sources, destinations = entries[symbol_index[symbol]]
+        values.append(count)
+        sources.append(source)
+        destinations.append(destination)
+
+    updated_matrix = []
+
+    for z, (values, sources, destinations) in enumerate(entries):
+        added = sp.csr_array(
+            (np.asarray(values, dtype=int), (sources, destinations)),
+            shape=(n, n),
+        )
+
+        if z < len(transition_matrix):
+            existing = sp.csr_array(transition_matrix[z], copy=True)
+            existing.resize((n, n))
+            added = existing + added
+
+        updated_matrix.append(sp.csr_array(added))
+
+    return updated_matrix
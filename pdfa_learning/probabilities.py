@@ -6,22 +6,95 @@ matrices and estimates probabilities associated with symbols, ordered
 patterns, exact sequences, fixed-distance events, and digrams. It also
 provides utilities for enumerating strings, calculating probabilities for
 collections of strings, and evaluating sampling-based probability
-constraints.
+constraints. Probability transition matrices may be dense arrays or
+sparse lists with one ``scipy.sparse.csr_array`` per symbol, in which
+case linear systems are solved directly rather than by inverting dense
+matrices. Exact sequences are scored on delta tables by direct lookups,
+while the other estimates convert delta tables to the sparse format.
+Delta tables are converted to probabilities a chunk of rows at a time, and
+the result can be written to memory-mapped files.
+Symbols may be given as alphabet entries or as integer codes indexing the
+alphabet, as produced by ``encode_sequences``.
 """
 
 import itertools as it
 
 import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve
 from scipy.stats import norm
 
 from ._validation import (
     _validate_alphabet,
     _validate_transition_matrix,
 )
-from .state_statistics import get_n
+from .matrix_formats import (
+    DeltaTable,
+    _create_delta_table,
+    _delta_row_chunks,
+    _is_delta,
+    _is_sparse,
+    _positive_destinations,
+    _row_sums,
+    load_delta_table,
+    to_sparse_transition_matrix,
+)
+from .state_statistics import get_all_n
 
 
-def probability_transition_matrix(transition_matrix, states, alphabet):
+def _symbol_index(symbol, alphabet):
+    """
+    Return the alphabet index of a symbol.
+
+    Parameters
+    ----------
+    symbol : str or int
+        Alphabet symbol, or an integer code indexing alphabet.
+    alphabet : list of str
+        Alphabet corresponding to the first dimension of the matrix.
+
+    Returns
+    -------
+    int
+        Index of symbol in alphabet.
+
+    Raises
+    ------
+    ValueError
+        If symbol is not in alphabet or an integer code is out of range.
+    """
+    if isinstance(symbol, (int, np.integer)) and not isinstance(symbol, bool):
+        if not 0 <= symbol < len(alphabet):
+            raise ValueError(f"{symbol} is not a valid code for alphabet.")
+
+        return int(symbol)
+
+    return alphabet.index(symbol)
+
+
+def _symbol_indices(sequence, alphabet):
+    """
+    Return the alphabet indices of the symbols in a sequence.
+
+    Parameters
+    ----------
+    sequence : str, list or np.ndarray
+        Sequence of alphabet symbols or integer codes.
+    alphabet : list of str
+        Alphabet corresponding to the first dimension of the matrix.
+
+    Returns
+    -------
+    list of int
+        Index of each symbol in alphabet.
+    """
+    if isinstance(sequence, np.ndarray):
+        sequence = sequence.tolist()
+
+    return [_symbol_index(symbol, alphabet) for symbol in sequence]
+
+
+def probability_transition_matrix(transition_matrix, states, alphabet, memmap=None):
     """
     Convert a transition-count matrix into a probability transition matrix.
 
@@ -31,7 +104,7 @@ def probability_transition_matrix(transition_matrix, states, alphabet):
 
     Parameters
     ----------
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -39,20 +112,29 @@ def probability_transition_matrix(transition_matrix, states, alphabet):
         transition_matrix.
     alphabet : iterable of str
         Alphabet corresponding to the first dimension of transition_matrix.
+    memmap : str or os.PathLike, optional
+        Directory in which to save the probability delta table as
+        memory-mapped arrays, as ``save_delta_table`` does. Only allowed
+        when transition_matrix is a delta table, which is then read and
+        converted a chunk of rows at a time.
 
     Returns
     -------
-    np.ndarray
-        Probability transition matrix with the same shape as
-        transition_matrix.
+    np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Probability transition matrix with the same shape and format as
+        transition_matrix. A probability delta table holds transition
+        probabilities in counts and terminating probabilities in
+        final_counts, and is a read-only memory-mapped delta table if
+        memmap is given.
 
     Raises
     ------
     TypeError
-        If transition_matrix is not a NumPy array or alphabet has an invalid
-        type.
+        If transition_matrix is not a NumPy array, a list of SciPy sparse
+        matrices or a DeltaTable, or alphabet has an invalid type.
     ValueError
-        If alphabet or transition_matrix has invalid contents or dimensions.
+        If alphabet or transition_matrix has invalid contents or dimensions,
+        or memmap is given and transition_matrix is not a delta table.
     """
     alphabet = _validate_alphabet(alphabet)
 
@@ -62,14 +144,52 @@ def probability_transition_matrix(transition_matrix, states, alphabet):
         states,
     )
 
-    p_mat = transition_matrix.copy().astype(float)
-    for j in range(len(alphabet)):
-        p_mat[j, 0, :] = transition_matrix[j, 0, :] / transition_matrix[0, 0, :].sum()
-        for i in range(1, len(states)):
-            p_mat[j, i, :] = transition_matrix[j, i, :] / get_n(
-                states[i], transition_matrix, states
+    if memmap is not None and not _is_delta(transition_matrix):
+        raise ValueError("memmap can only be given for a delta table.")
+
+    if _is_delta(transition_matrix):
+        destinations, counts, final_counts = transition_matrix
+
+        scale = get_all_n(transition_matrix).astype(float)
+        scale[0] = counts[0, 0]
+
+        if memmap is None:
+            p_mat = DeltaTable(
+                np.empty(destinations.shape, dtype=destinations.dtype),
+                np.empty(counts.shape, dtype=float),
+                np.empty(final_counts.shape, dtype=float),
             )
-    return p_mat
+        else:
+            p_mat = _create_delta_table(memmap, list(states), alphabet, float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for rows in _delta_row_chunks(len(destinations)):
+                p_mat.destinations[rows] = destinations[rows]
+                p_mat.counts[rows] = counts[rows] / scale[rows, np.newaxis]
+                p_mat.final_counts[rows] = final_counts[rows] / scale[rows]
+
+        if memmap is None:
+            return p_mat
+
+        for array in p_mat:
+            array.flush()
+
+        return load_delta_table(memmap)[0]
+
+    if _is_sparse(transition_matrix):
+        scale = get_all_n(transition_matrix).astype(float)
+        scale[0] = transition_matrix[0][[0], :].sum()
+
+        with np.errstate(divide="ignore"):
+            scale = sp.diags_array(1 / scale)
+
+        return [sp.csr_array(scale @ m) for m in transition_matrix]
+
+    scale = get_all_n(transition_matrix).astype(float)
+    scale[0] = transition_matrix[0, 0, :].sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return transition_matrix / scale[np.newaxis, :, np.newaxis]
 
 
 def probability_estimate_of_symbol(p_mat, symbol, alphabet):
@@ -82,11 +202,12 @@ def probability_estimate_of_symbol(p_mat, symbol, alphabet):
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix with shape
         ``(n_symbols, n_states, n_states)``.
-    symbol : str
-        Symbol whose occurrence probability is estimated.
+    symbol : str or int
+        Symbol, or integer code, whose occurrence probability is
+        estimated.
     alphabet : list of str
         Alphabet corresponding to the first dimension of p_mat.
 
@@ -95,13 +216,63 @@ def probability_estimate_of_symbol(p_mat, symbol, alphabet):
     np.ndarray
         Estimated occurrence probability for each starting state.
     """
-    matrix_index = alphabet.index(symbol)
+    matrix_index = _symbol_index(symbol, alphabet)
+
+    if _is_delta(p_mat):
+        p_mat = to_sparse_transition_matrix(p_mat)
+
+    if _is_sparse(p_mat):
+        return _solve_avoiding_symbol(
+            p_mat,
+            matrix_index,
+            _row_sums(p_mat, matrix_index),
+        )
+
     rho = np.sum(np.delete(p_mat, matrix_index, 0), axis=0)
     inverse = np.linalg.inv(np.identity(p_mat.shape[1]) - rho)
     p_symbol = np.sum(p_mat[matrix_index, :, :], axis=1)
     return np.matmul(inverse, p_symbol)
 
 
+def _solve_avoiding_symbol(p_mat, matrix_index, rhs, transpose=False):
+    """
+    Solve the linear system for paths that avoid a symbol.
+
+    This returns ``x`` satisfying ``(I - rho) x = rhs``, where ``rho`` is
+    the sum of the sparse probability matrices of every other symbol. It
+    replaces multiplication by the dense inverse of ``I - rho``.
+
+    Parameters
+    ----------
+    p_mat : list of scipy.sparse.csr_array
+        Sparse probability transition matrix.
+    matrix_index : int
+        Index of the symbol excluded from rho.
+    rhs : np.ndarray
+        Right-hand side of the linear system.
+    transpose : bool, default=False
+        Whether to solve the transposed system ``(I - rho)^T x = rhs``
+        instead.
+
+    Returns
+    -------
+    np.ndarray
+        Solution of the linear system.
+    """
+    n = p_mat[0].shape[0]
+    rho = sum(m for z, m in enumerate(p_mat) if z != matrix_index)
+
+    if isinstance(rho, int):
+        rho = sp.csr_array((n, n))
+
+    system = sp.identity(n, format="csc") - rho
+
+    if transpose:
+        system = system.T
+
+    return np.atleast_1d(spsolve(sp.csc_array(system), rhs))
+
+
 def probability_estimate_of_pattern(p_mat, pattern, alphabet):
     """
     Estimate the probability that a generated sequence contains a pattern.
@@ -112,11 +283,12 @@ def probability_estimate_of_pattern(p_mat, pattern, alphabet):
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix with shape
         ``(n_symbols, n_states, n_states)``.
-    pattern : str
-        Non-empty ordered sequence of symbols to encounter.
+    pattern : str, list or np.ndarray
+        Non-empty ordered sequence of symbols or integer codes to
+        encounter.
     alphabet : list of str
         Alphabet corresponding to the first dimension of p_mat.
 
@@ -125,11 +297,27 @@ def probability_estimate_of_pattern(p_mat, pattern, alphabet):
     np.ndarray
         Estimated pattern probability for each starting state.
     """
+    if _is_delta(p_mat):
+        p_mat = to_sparse_transition_matrix(p_mat)
+
+    if _is_sparse(p_mat):
+        p_pattern = probability_estimate_of_symbol(p_mat, pattern[-1], alphabet)
+
+        for i in reversed(range(len(pattern) - 1)):
+            matrix_index = _symbol_index(pattern[i], alphabet)
+            p_pattern = _solve_avoiding_symbol(
+                p_mat,
+                matrix_index,
+                p_mat[matrix_index] @ p_pattern,
+            )
+
+        return p_pattern
+
     p_pattern = np.identity(p_mat.shape[1])
     for i in range(len(pattern)):
         if i != len(pattern) - 1:
             symbol = pattern[i]
-            matrix_index = alphabet.index(symbol)
+            matrix_index = _symbol_index(symbol, alphabet)
             rho = np.sum(np.delete(p_mat, matrix_index, 0), axis=0)
             inverse = np.linalg.inv(np.identity(p_mat.shape[1]) - rho)
             gamma = p_mat[matrix_index, :, :]
@@ -154,12 +342,13 @@ def probability_estimate_of_exact_sequence(p_mat, sequence, alphabet):
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix with shape
         ``(n_symbols, n_states, n_states)``. The first state is assumed to
         be the artificial initial state.
-    sequence : str
-        Non-empty exact sequence whose probability is estimated.
+    sequence : str, list or np.ndarray
+        Non-empty exact sequence of symbols or integer codes whose
+        probability is estimated.
     alphabet : list of str
         Alphabet corresponding to the first dimension of p_mat.
 
@@ -168,10 +357,33 @@ def probability_estimate_of_exact_sequence(p_mat, sequence, alphabet):
     float
         Estimated probability of generating the exact sequence.
     """
-    indices = [
-        alphabet.index(symbol)
-        for symbol in sequence
-    ]
+    return _probability_of_exact_indices(
+        p_mat,
+        _symbol_indices(sequence, alphabet),
+    )
+
+
+def _probability_of_exact_indices(p_mat, indices):
+    """
+    Estimate the probability of an exact sequence of alphabet indices.
+
+    Parameters
+    ----------
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Probability transition matrix.
+    indices : list of int
+        Non-empty alphabet index of each symbol in the sequence.
+
+    Returns
+    -------
+    float
+        Estimated probability of generating the exact sequence.
+    """
+    if _is_delta(p_mat):
+        return _delta_probability_of_exact_sequence(p_mat, indices)
+
+    if _is_sparse(p_mat):
+        return _sparse_probability_of_exact_sequence(p_mat, indices)
 
     p_mat = np.delete(p_mat, 0, axis=1)
     p_mat = np.delete(p_mat, 0, axis=2)
@@ -184,13 +396,13 @@ def probability_estimate_of_exact_sequence(p_mat, sequence, alphabet):
 
     next_state = np.where(first_transition > 0)[0][0]
 
-    if len(sequence) == 1:
+    if len(indices) == 1:
         p_est *= 1 - np.sum(
             p_mat[:, next_state, :]
         )
         return p_est
 
-    for i in range(1, len(sequence)):
+    for i in range(1, len(indices)):
         transitions = p_mat[
             indices[i],
             next_state,
@@ -216,6 +428,114 @@ def probability_estimate_of_exact_sequence(p_mat, sequence, alphabet):
     return p_est
 
 
+def _sparse_probability_of_exact_sequence(p_mat, indices):
+    """
+    Estimate the probability of an exact sequence from a sparse matrix.
+
+    This follows ``probability_estimate_of_exact_sequence`` but reads only
+    the rows of the states visited by the sequence. Transitions into the
+    artificial initial state are ignored.
+
+    Parameters
+    ----------
+    p_mat : list of scipy.sparse.csr_array
+        Sparse probability transition matrix whose first state is the
+        artificial initial state.
+    indices : list of int
+        Alphabet indices of the symbols in the sequence.
+
+    Returns
+    -------
+    float
+        Estimated probability of generating the exact sequence.
+    """
+
+    def row(z, i):
+        m = p_mat[z]
+        start, end = m.indptr[i], m.indptr[i + 1]
+        destinations = m.indices[start:end]
+        values = m.data[start:end]
+        return destinations[destinations > 0], values[destinations > 0]
+
+    def leaving(i):
+        return sum(row(z, i)[1].sum() for z in range(len(p_mat)))
+
+    destinations, values = row(indices[0], 1)
+    p_est = np.sum(values)
+
+    if p_est == 0:
+        return 0
+
+    next_state = destinations[values > 0].min()
+
+    if len(indices) == 1:
+        p_est *= 1 - leaving(next_state)
+        return p_est
+
+    for i in range(1, len(indices)):
+        destinations, values = row(indices[i], next_state)
+
+        p_est *= np.sum(values)
+
+        if not np.any(values > 0):
+            return 0
+
+        next_state = destinations[values > 0].min()
+
+    p_est *= 1 - min(leaving(next_state), 1)
+
+    return p_est
+
+
+def _delta_probability_of_exact_sequence(p_mat, indices):
+    """
+    Estimate the probability of an exact sequence from a delta table.
+
+    This follows ``probability_estimate_of_exact_sequence`` but finds each
+    transition with a single lookup. Transitions into the artificial
+    initial state are ignored.
+
+    Parameters
+    ----------
+    p_mat : DeltaTable
+        Probability delta table whose first state is the artificial
+        initial state.
+    indices : list of int
+        Alphabet indices of the symbols in the sequence.
+
+    Returns
+    -------
+    float
+        Estimated probability of generating the exact sequence.
+    """
+    destinations, probabilities, _ = p_mat
+    leaving = np.where(destinations > 0, probabilities, 0).sum(axis=1)
+
+    next_state = destinations[1, indices[0]]
+
+    if next_state <= 0 or probabilities[1, indices[0]] == 0:
+        return 0
+
+    p_est = probabilities[1, indices[0]]
+
+    if len(indices) == 1:
+        p_est *= 1 - leaving[next_state]
+        return p_est
+
+    for z in indices[1:]:
+        destination = destinations[next_state, z]
+
+        if destination <= 0 or probabilities[next_state, z] == 0:
+            return 0
+
+        p_est *= probabilities[next_state, z]
+        next_state = destination
+
+    p_est *= 1 - min(leaving[next_state], 1)
+
+    return p_est
+
+
 def probability_sequence_contains_letter_at_distance_theta(
     p_mat, letter, theta, alphabet
 ):
@@ -227,11 +547,12 @@ def probability_sequence_contains_letter_at_distance_theta(
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix with shape
         ``(n_symbols, n_states, n_states)``.
-    letter : str
-        Letter whose occurrence probability is estimated.
+    letter : str or int
+        Letter, or integer code, whose occurrence probability is
+        estimated.
     theta : int
         Number of transitions between the starting state and the emission
         of letter. Expected to be non-negative.
@@ -249,7 +570,20 @@ def probability_sequence_contains_letter_at_distance_theta(
     if theta < 0:
         raise ValueError("theta must be non-negative.")
 
-    matrix_index = alphabet.index(letter)
+    matrix_index = _symbol_index(letter, alphabet)
+
+    if _is_delta(p_mat):
+        p_mat = to_sparse_transition_matrix(p_mat)
+
+    if _is_sparse(p_mat):
+        tau = sum(p_mat)
+        p_letter = _row_sums(p_mat, matrix_index)
+
+        for _ in range(theta):
+            p_letter = tau @ p_letter
+
+        return p_letter
+
     tau_theta = np.linalg.matrix_power(np.sum(p_mat, axis=0), theta)
     pi_symbol = np.sum(p_mat[matrix_index, :, :], axis=1)
     return np.matmul(tau_theta, pi_symbol)
@@ -270,11 +604,11 @@ def probability_to_encounter_a_pattern_at_a_distance_theta(
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix with shape
         ``(n_symbols, n_states, n_states)``.
-    pattern : str
-        Ordered pattern containing at least two symbols.
+    pattern : str, list or np.ndarray
+        Ordered pattern containing at least two symbols or integer codes.
     theta : int
         Non-negative number of transitions before the first pattern symbol
         is emitted.
@@ -307,16 +641,39 @@ def probability_to_encounter_a_pattern_at_a_distance_theta(
     if theta < 0:
         raise ValueError("theta must be non-negative.")
 
-    symbol = pattern[0]
-    matrix_index = alphabet.index(symbol)
+    matrix_index = _symbol_index(pattern[0], alphabet)
+    remaining_pattern = pattern[1:]
+
+    if _is_delta(p_mat):
+        p_mat = to_sparse_transition_matrix(p_mat)
+
+    if _is_sparse(p_mat):
+        if len(remaining_pattern) > 1:
+            p_pattern = probability_estimate_of_pattern(
+                p_mat,
+                remaining_pattern,
+                alphabet,
+            )
+        else:
+            p_pattern = probability_estimate_of_symbol(
+                p_mat,
+                remaining_pattern[0],
+                alphabet,
+            )
+
+        tau = sum(p_mat)
+        p_pattern = p_mat[matrix_index] @ p_pattern
+
+        for _ in range(theta):
+            p_pattern = tau @ p_pattern
+
+        return p_pattern
 
     gamma = p_mat[matrix_index, :, :]
     transition_matrix = np.sum(p_mat, axis=0)
     tau_theta = np.linalg.matrix_power(transition_matrix, theta)
     f_x_theta = np.matmul(tau_theta, gamma)
 
-    remaining_pattern = pattern[1:]
-
     if len(remaining_pattern) > 1:
         est_of_pattern = probability_estimate_of_pattern(
             p_mat,
@@ -327,7 +684,7 @@ def probability_to_encounter_a_pattern_at_a_distance_theta(
     else:
         est_of_pattern = probability_estimate_of_symbol(
             p_mat,
-            remaining_pattern,
+            remaining_pattern[0],
             alphabet,
         )
 
@@ -351,7 +708,7 @@ def proportion_constraint(
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix.
     pattern : str
         Pattern or exact sequence being evaluated.
@@ -432,10 +789,10 @@ def probability_sequence_contains_digram(
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix.
-    digram : str
-        Sequence containing exactly two symbols.
+    digram : str, list or np.ndarray
+        Sequence containing exactly two symbols or integer codes.
     alphabet : list of str
         Alphabet associated with the probability transition matrix.
 
@@ -452,11 +809,26 @@ def probability_sequence_contains_digram(
     if len(digram) != 2:
         raise ValueError("digram must contain exactly two symbols.")
 
-    symbol_1 = digram[0]
-    symbol_2 = digram[1]
+    matrix_index_1, matrix_index_2 = _symbol_indices(digram, alphabet)
+
+    if _is_delta(p_mat):
+        p_mat = to_sparse_transition_matrix(p_mat)
+
+    if _is_sparse(p_mat):
+        p_symbol_2 = _row_sums(p_mat, matrix_index_2)
+        tau = np.zeros(p_mat[0].shape[0])
 
-    matrix_index_1 = alphabet.index(symbol_1)
-    matrix_index_2 = alphabet.index(symbol_2)
+        for state_index, p_symbol_1 in enumerate(_row_sums(p_mat, matrix_index_1)):
+            destinations = _positive_destinations(p_mat, matrix_index_1, state_index)
+            emitted = destinations[0] if len(destinations) > 0 else 0
+            tau[state_index] = p_symbol_1 * p_symbol_2[emitted]
+
+        return _solve_avoiding_symbol(
+            p_mat,
+            matrix_index_1,
+            tau,
+            transpose=True,
+        ).reshape(1, -1)
 
     rho = np.sum(
         np.delete(p_mat, matrix_index_1, 0),
@@ -509,8 +881,10 @@ def string_enumerator(alphabet, n):
 
     Returns
     -------
-    list of str
-        All possible strings with lengths from 1 to n.
+    list of str or list of tuple
+        All possible strings with lengths from 1 to n. If any symbol is
+        longer than one character, each string is returned as a tuple of
+        symbols so that the symbols remain separable.
 
     Raises
     ------
@@ -525,10 +899,15 @@ def string_enumerator(alphabet, n):
     if n <= 0:
         raise ValueError("n must be greater than 0.")
 
+    alphabet = list(alphabet)
+    join = all(len(symbol) == 1 for symbol in alphabet)
     strings = []
 
     for i in range(1, n + 1):
-        strings += ["".join(x) for x in it.product(alphabet, repeat=i)]
+        if join:
+            strings += ["".join(x) for x in it.product(alphabet, repeat=i)]
+        else:
+            strings += list(it.product(alphabet, repeat=i))
 
     return strings
 
@@ -539,27 +918,35 @@ def string_probabilities(p_mat, alphabet, strings):
 
     Parameters
     ----------
-    p_mat : np.ndarray
+    p_mat : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Probability transition matrix with shape
         ``(n_symbols, n_states, n_states)``.
     alphabet : list of str
         Alphabet corresponding to the first dimension of p_mat.
-    strings : iterable of str
-        Non-empty exact strings whose probabilities are estimated.
+    strings : iterable of str, tuple, list or np.ndarray
+        Non-empty exact strings, or sequences of integer codes, whose
+        probabilities are estimated.
 
     Returns
     -------
     list of tuple
         Pairs containing each input string and its estimated probability.
     """
+    symbol_index = {symbol: k for k, symbol in enumerate(alphabet)}
+
+    def indices(string):
+        if isinstance(string, np.ndarray):
+            return _symbol_indices(string, alphabet)
+
+        try:
+            return [symbol_index[symbol] for symbol in string]
+        except (KeyError, TypeError):
+            return _symbol_indices(string, alphabet)
+
     return [
         (
             string,
-            probability_estimate_of_exact_sequence(
-                p_mat,
-                string,
-                alphabet,
-            ),
+            _probability_of_exact_indices(p_mat, indices(string)),
         )
         for string in strings
     ]
@@ -0,0 +1,218 @@
+"""
+Incremental red-blue fringe for the de la Higuera procedure.
+
+The red-blue procedure needs the blue states, the non-red states reached
+directly from a red state, after every promotion and merge. Recomputing
+them visits the transitions of every red state each time, and keeping the
+red states ordered by re-sorting them repeats the work for every
+promotion. ``RedBlueFringe`` instead counts the transitions from red
+states into each state of a merge engine. A promotion adds the successors
+of one state, and a merge recounts only the red states whose transitions
+the engine reports as changed, so each step costs time proportional to
+the number of transitions that changed.
+
+The blue states may also be ordered by a key, such as the number of
+sequences entering each state, through a heap that is checked lazily:
+entries of states that are no longer blue, or whose key has changed, are
+discarded when they reach the top.
+"""
+
+import bisect
+import heapq
+import operator
+
+
+class RedBlueFringe:
+    """
+    Red states of a merge engine and the blue states reached from them.
+
+    Parameters
+    ----------
+    engine : MergeEngine
+        Engine holding the automaton being learned.
+    red_states : list
+        State identifiers currently classified as red.
+    key : callable, optional
+        Function of a state identifier giving the order in which blue
+        states are taken by ``first``, smallest first. If None, blue states
+        are taken in identifier order.
+
+    Attributes
+    ----------
+    engine : MergeEngine
+        Engine holding the automaton being learned.
+    red : list
+        Red state identifiers, in the order in which they are compared
+        with a blue state.
+    blue : list
+        Sorted blue-state identifiers. The list is updated in place and
+        must not be modified.
+    key : callable or None
+        Order in which blue states are taken by ``first``.
+    """
+
+    def __init__(self, engine, red_states, key=None):
+        self.engine = engine
+        self.red = []
+        self.blue = []
+        self.key = key
+
+        self._red = set()
+        self._blue = set()
+        self._successors = {}
+        self._counts = {}
+        self._heap = []
+        self._sorted = True
+
+        engine.pop_changed_states()
+        self.update(red_states)
+
+    def _add_successors(self, q, affected):
+        """
+        Count the transitions leaving a red state.
+
+        Parameters
+        ----------
+        q : int or str
+            Red state identifier.
+        affected : set
+            States whose counts have changed, updated in place.
+        """
+        successors = [
+            x
+            for z in range(self.engine.n_symbols)
+            for x in self.engine.destinations(q, z)
+        ]
+        self._successors[q] = successors
+
+        for x in successors:
+            self._counts[x] = self._counts.get(x, 0) + 1
+
+        affected.update(successors)
+
+    def _remove_successors(self, q, affected):
+        """
+        Discount the transitions last counted for a state.
+
+        Parameters
+        ----------
+        q : int or str
+            State identifier.
+        affected : set
+            States whose counts have changed, updated in place.
+        """
+        for x in self._successors.pop(q, ()):
+            count = self._counts[x] - 1
+
+            if count:
+                self._counts[x] = count
+            else:
+                del self._counts[x]
+
+            affected.add(x)
+
+    def _apply(self, removed, added):
+        """
+        Update the counts and blue states after the red states change.
+
+        Parameters
+        ----------
+        removed : iterable
+            States that are no longer red.
+        added : iterable
+            States that have become red.
+        """
+        affected = set(removed) | set(added)
+
+        for q in removed:
+            self._remove_successors(q, affected)
+
+        self._red.difference_update(removed)
+        self._red.update(added)
+
+        changed = self.engine.pop_changed_states()
+
+        # Red states whose transitions have changed are counted again.
+        for q in changed:
+            if q in self._successors:
+                self._remove_successors(q, affected)
+                self._add_successors(q, affected)
+
+        for q in added:
+            self._add_successors(q, affected)
+
+        if self.key is not None:
+            affected |= changed
+
+        for x in affected:
+            is_blue = x in self._counts and x not in self._red
+            was_blue = x in self._blue
+
+            if is_blue and not was_blue:
+                self._blue.add(x)
+                bisect.insort(self.blue, x)
+            elif was_blue and not is_blue:
+                self._blue.remove(x)
+                del self.blue[bisect.bisect_left(self.blue, x)]
+
+            # A merged state may have a new key, so it is pushed again.
+            if is_blue and self.key is not None and (not was_blue or x in changed):
+                heapq.heappush(self._heap, (self.key(x), x))
+
+    def first(self):
+        """
+        Return the blue state to take next.
+
+        Returns
+        -------
+        int, str or None
+            Blue state with the smallest key, or the smallest identifier if
+            there is no key. None if there are no blue states.
+        """
+        if self.key is None:
+            return self.blue[0] if self.blue else None
+
+        while self._heap:
+            key, q = self._heap[0]
+
+            if q in self._blue and key == self.key(q):
+                return q
+
+            heapq.heappop(self._heap)
+
+        return None
+
+    def promote(self, q):
+        """
+        Make a blue state red.
+
+        Parameters
+        ----------
+        q : int or str
+            Blue state identifier.
+        """
+        if self._sorted:
+            bisect.insort(self.red, q)
+        else:
+            self.red.append(q)
+            self.red.sort()
+            self._sorted = True
+
+        self._apply((), (q,))
+
+    def update(self, red_states):
+        """
+        Replace the red states, for example after a merge.
+
+        Parameters
+        ----------
+        red_states : list
+            State identifiers currently classified as red, in the order in
+            which they are compared with a blue state.
+        """
+        red = set(red_states)
+
+        self.red = red_states
+        self._sorted = all(map(operator.le, red_states, red_states[1:]))
+
+        self._apply(self._red - red, red - self._red)
@@ -5,7 +5,12 @@ This module implements Hoeffding-bound compatibility testing, direct and
 recursive state merging, and checks for nondeterministic transitions
 created by a merge. It also provides helper functions for selecting state
 pairs under the Carrasco and Oncina all-pairs procedure and identifying
-red and blue states under the de la Higuera procedure.
+red and blue states under the de la Higuera procedure. The internal
+merge functions accept a ``StateStatistics`` object, which they keep in
+step with the merged transition matrix so that compatibility tests read
+stored counts, and ``_recursive_merge_two_states`` and
+``get_blue_states`` also accept a ``MergeEngine`` in place of a transition
+matrix, which is then merged in place.
 """
 
 import numpy as np
@@ -13,17 +18,41 @@ import numpy as np
 from ._validation import (
     _validate_alpha,
     _validate_alphabet,
+    _validate_min_count,
     _validate_states_for_merging,
     _validate_transition_matrix,
 )
+from .matrix_formats import (
+    _copy,
+    _is_delta,
+    _is_sparse,
+    _merge_indices,
+    _nondeterministic_transitions,
+    _positive_destinations,
+    _predecessors,
+    to_delta_table,
+    to_sparse_transition_matrix,
+)
+from .compatibility_cache import _cached_test
+from .merge_engine import MergeEngine
+from .state_registry import StateRegistry
 from .state_statistics import (
+    StateStatistics,
     get_n,
     get_pi,
     get_pi_endpoint,
 )
 
 
-def hoeffding_bound(q1, q2, alpha, transition_matrix, alphabet, states):
+def hoeffding_bound(
+    q1,
+    q2,
+    alpha,
+    transition_matrix,
+    alphabet,
+    states,
+    statistics=None,
+):
     """
     Determine whether two states satisfy the Hoeffding compatibility bound.
 
@@ -40,7 +69,7 @@ def hoeffding_bound(q1, q2, alpha, transition_matrix, alphabet, states):
         Significance level used by the Hoeffding compatibility test.
         Smaller values generally permit more merges, while larger values 
         generally permit fewer merges. Must lie in the interval ``(0, 2]``.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     alphabet : collection of str
@@ -48,6 +77,10 @@ def hoeffding_bound(q1, q2, alpha, transition_matrix, alphabet, states):
     states : list
         State identifiers corresponding to the final two dimensions of
         transition_matrix.
+    statistics : StateStatistics, optional
+        Statistics of the states of transition_matrix. If given, the
+        counts are read from statistics instead of being summed from
+        transition_matrix.
 
     Returns
     -------
@@ -57,6 +90,20 @@ def hoeffding_bound(q1, q2, alpha, transition_matrix, alphabet, states):
     """
     alpha_constant = (np.log(2 / alpha) / 2) ** 0.5
 
+    if statistics is not None:
+        rhs = alpha_constant * (
+            (1 / np.sqrt(statistics.n(q1))) + (1 / np.sqrt(statistics.n(q2)))
+        )
+
+        pi_1 = statistics.pi(q1)
+        pi_2 = statistics.pi(q2)
+
+        if np.any(np.abs(pi_1 - pi_2) > rhs):
+            return False
+
+        # Summed in alphabet order to match get_pi_endpoint exactly.
+        return not abs((1 - sum(pi_1)) - (1 - sum(pi_2))) > rhs
+
     rhs = alpha_constant * (
         (1 / np.sqrt(get_n(q1, transition_matrix, states)))
         + (1 / np.sqrt(get_n(q2, transition_matrix, states)))
@@ -82,6 +129,153 @@ def hoeffding_bound(q1, q2, alpha, transition_matrix, alphabet, states):
     return True
 
 
+def hoeffding_bound_mask(
+    pairs,
+    alpha,
+    transition_matrix,
+    alphabet,
+    states,
+    statistics=None,
+    min_count=0,
+):
+    """
+    Test many state pairs against the Hoeffding compatibility bound at once.
+
+    The symbol and terminating probabilities of every pair are compared
+    using array operations over all pairs and symbols, rather than one
+    pair and one symbol at a time. With the default min_count, each entry
+    of the result equals ``hoeffding_bound`` for the corresponding pair.
+
+    Parameters
+    ----------
+    pairs : sequence of tuple
+        State pairs ``(q1, q2)`` to compare, such as those returned by
+        ``get_pairs_to_check``.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+        Must lie in the interval ``(0, 2]``.
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+    alphabet : collection of str
+        Alphabet associated with the first dimension of transition_matrix.
+    states : list
+        State identifiers corresponding to the final two dimensions of
+        transition_matrix.
+    statistics : StateStatistics, optional
+        Statistics of the states of transition_matrix. If None, they are
+        computed from transition_matrix.
+    min_count : int, default=0
+        Pairs with a state entered by fewer than min_count sequences are
+        compatible without the Hoeffding test.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask that is True for every pair satisfying the bound or
+        having a state below min_count.
+    """
+    if statistics is None:
+        statistics = StateStatistics(transition_matrix, states)
+
+    state_rows = statistics.rows
+    rows = np.fromiter(
+        (state_rows[q] for pair in pairs for q in pair),
+        dtype=np.intp,
+        count=2 * len(pairs),
+    ).reshape(-1, 2)
+
+    return _hoeffding_mask(statistics, rows[:, 0], rows[:, 1], alpha, min_count)
+
+
+def _hoeffding_mask(statistics, rows_1, rows_2, alpha, min_count=0):
+    """
+    Evaluate the Hoeffding bound for arrays of statistics rows.
+
+    Parameters
+    ----------
+    statistics : StateStatistics
+        Statistics of the states being compared.
+    rows_1 : np.ndarray
+        Statistics rows of the first state of each pair.
+    rows_2 : np.ndarray
+        Statistics rows of the second state of each pair.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    min_count : int, default=0
+        Pairs with a state entered by fewer than min_count sequences are
+        compatible without the Hoeffding test.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask that is True for every pair satisfying the bound or
+        having a state below min_count.
+    """
+    alpha_constant = (np.log(2 / alpha) / 2) ** 0.5
+
+    n_1 = statistics.incoming[rows_1]
+    n_2 = statistics.incoming[rows_2]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rhs = alpha_constant * ((1 / np.sqrt(n_1)) + (1 / np.sqrt(n_2)))
+
+        pi_1 = statistics.outgoing[rows_1] / n_1[:, np.newaxis]
+        pi_2 = statistics.outgoing[rows_2] / n_2[:, np.newaxis]
+
+        compatible = ~np.any(np.abs(pi_1 - pi_2) > rhs[:, np.newaxis], axis=1)
+
+        # Summed one symbol at a time to match get_pi_endpoint exactly.
+        sum_1 = np.zeros(len(rows_1))
+        sum_2 = np.zeros(len(rows_2))
+
+        for z in range(pi_1.shape[1]):
+            sum_1 = sum_1 + pi_1[:, z]
+            sum_2 = sum_2 + pi_2[:, z]
+
+        compatible &= ~(np.abs((1 - sum_1) - (1 - sum_2)) > rhs)
+
+    if min_count > 0:
+        compatible |= np.minimum(n_1, n_2) < min_count
+
+    return compatible
+
+
+def _below_min_count(pair, min_count, transition_matrix, states, statistics=None):
+    """
+    Return whether a state of a pair is entered by too few sequences.
+
+    Parameters
+    ----------
+    pair : tuple
+        Pair of state identifiers.
+    min_count : int
+        Smallest number of sequences entering a state for the Hoeffding
+        test to be applied.
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+    states : list
+        State identifiers corresponding to the final two dimensions of
+        transition_matrix.
+    statistics : StateStatistics, optional
+        Statistics of the states of transition_matrix. If given, the
+        counts are read from statistics.
+
+    Returns
+    -------
+    bool
+        True if either state is entered by fewer than min_count sequences.
+    """
+    if min_count <= 0:
+        return False
+
+    if statistics is not None:
+        return min(statistics.n(pair[0]), statistics.n(pair[1])) < min_count
+
+    return min(get_n(q, transition_matrix, states) for q in pair) < min_count
+
+
 def merge_two_states(
     q1,
     q2,
@@ -102,7 +296,7 @@ def merge_two_states(
         First state to merge.
     q2 : int or str
         Second state to merge.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -115,8 +309,10 @@ def merge_two_states(
 
     Returns
     -------
-    transition_matrix_copy : np.ndarray
-        Transition-count matrix after merging the states.
+    transition_matrix_copy : np.ndarray or list of scipy.sparse.csr_array
+        Transition-count matrix after merging the states, in the same
+        format as transition_matrix. A merge may create nondeterministic
+        transitions, so delta tables are returned in the sparse format.
     states_copy : list
         Updated state identifiers.
     red_states_copy : list, optional
@@ -125,8 +321,8 @@ def merge_two_states(
     Raises
     ------
     TypeError
-        If transition_matrix is not a NumPy array or alphabet has an invalid
-        type.
+        If transition_matrix is not a NumPy array, a list of SciPy sparse
+        matrices or a DeltaTable, or alphabet has an invalid type.
     ValueError
         If alphabet or transition_matrix has invalid contents or dimensions,
         q1 or q2 is not present in states, q1 and q2 are identical, or the
@@ -155,7 +351,14 @@ def merge_two_states(
     )
 
 
-def _merge_two_states(q1, q2, transition_matrix, states, red_states=None):
+def _merge_two_states(
+    q1,
+    q2,
+    transition_matrix,
+    states,
+    red_states=None,
+    statistics=None,
+):
     """
     Internal function that merges two states in a transition-count matrix.
 
@@ -169,7 +372,7 @@ def _merge_two_states(q1, q2, transition_matrix, states, red_states=None):
         First state to merge.
     q2 : int or str
         Second state to merge.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -177,11 +380,16 @@ def _merge_two_states(q1, q2, transition_matrix, states, red_states=None):
         transition_matrix.
     red_states : list, optional
         Red states to update after the merge.
+    statistics : StateStatistics, optional
+        Statistics of the states of transition_matrix, updated in place
+        to describe the merged matrix.
 
     Returns
     -------
-    transition_matrix_copy : np.ndarray
-        Transition-count matrix after merging the states.
+    transition_matrix_copy : np.ndarray or list of scipy.sparse.csr_array
+        Transition-count matrix after merging the states, in the same
+        format as transition_matrix. A merge may create nondeterministic
+        transitions, so delta tables are returned in the sparse format.
     states_copy : list
         Updated state identifiers.
     red_states_copy : list, optional
@@ -196,37 +404,44 @@ def _merge_two_states(q1, q2, transition_matrix, states, red_states=None):
     surviving_state = states[which_min]
     removed_state = states[which_max]
 
-    transition_matrix_copy = np.copy(transition_matrix)
     states_copy = states.copy()
 
-    transition_matrix_copy[:, :, which_min] = (
-        transition_matrix_copy[:, :, i1] + transition_matrix_copy[:, :, i2]
-    )
+    if _is_sparse(transition_matrix) or _is_delta(transition_matrix):
+        transition_matrix_copy = _merge_indices(transition_matrix, i1, i2)
+    else:
+        transition_matrix_copy = np.copy(transition_matrix)
 
-    transition_matrix_copy = np.delete(
-        transition_matrix_copy,
-        which_max,
-        axis=2,
-    )
+        transition_matrix_copy[:, :, which_min] = (
+            transition_matrix_copy[:, :, i1] + transition_matrix_copy[:, :, i2]
+        )
 
-    transition_matrix_copy[:, which_min, :] = (
-        transition_matrix_copy[:, i1, :] + transition_matrix_copy[:, i2, :]
-    )
+        transition_matrix_copy = np.delete(
+            transition_matrix_copy,
+            which_max,
+            axis=2,
+        )
 
-    transition_matrix_copy = np.delete(
-        transition_matrix_copy,
-        which_max,
-        axis=1,
-    )
+        transition_matrix_copy[:, which_min, :] = (
+            transition_matrix_copy[:, i1, :] + transition_matrix_copy[:, i2, :]
+        )
+
+        transition_matrix_copy = np.delete(
+            transition_matrix_copy,
+            which_max,
+            axis=1,
+        )
 
     states_copy.remove(removed_state)
 
-    if red_states is not None:
-        updated_red_states = [
-            surviving_state if state == removed_state else state for state in red_states
-        ]
+    if statistics is not None:
+        statistics.merge(surviving_state, removed_state)
 
-        red_states_copy = list(dict.fromkeys(updated_red_states))
+    if red_states is not None:
+        red_states_copy = _update_red_states(
+            red_states,
+            surviving_state,
+            removed_state,
+        )
 
         return (
             transition_matrix_copy,
@@ -237,18 +452,73 @@ def _merge_two_states(q1, q2, transition_matrix, states, red_states=None):
     return transition_matrix_copy, states_copy
 
 
-def check_is_deterministic(transition_matrix, states, alphabet):
+def _update_red_states(red_states, surviving_state, removed_state):
+    """
+    Replace a removed state by the state it was merged into.
+
+    Parameters
+    ----------
+    red_states : list
+        Red states before the merge.
+    surviving_state : int or str
+        State that represents the merged state.
+    removed_state : int or str
+        State removed by the merge.
+
+    Returns
+    -------
+    list
+        Red states after the merge, without duplicates.
+    """
+    updated_red_states = [
+        surviving_state if state == removed_state else state for state in red_states
+    ]
+
+    return list(dict.fromkeys(updated_red_states))
+
+
+def _merge_in_place(q1, q2, engine, red_states=None):
+    """
+    Merge two states of a merge engine in place.
+
+    Parameters
+    ----------
+    q1 : int or str
+        First state to merge.
+    q2 : int or str
+        Second state to merge.
+    engine : MergeEngine
+        Engine holding the current automaton.
+    red_states : list, optional
+        Red states to update after the merge.
+
+    Returns
+    -------
+    list or None
+        Updated red states, or None when red_states is not provided.
+    """
+    surviving_state, removed_state = engine.merge(q1, q2)
+
+    if red_states is None:
+        return None
+
+    return _update_red_states(red_states, surviving_state, removed_state)
+
+
+def check_is_deterministic(transition_matrix, states, alphabet, candidates=None):
     """
     Identify nondeterministic state pairs in a transition matrix.
 
     A state is considered nondeterministic when it has positive transitions
     to more than one destination through the same alphabet symbol. For each
     such state-symbol combination, the first pair of destination states is
-    returned.
+    returned. The states of each symbol are examined together with array
+    operations, and a delta table, which holds at most one destination per
+    state and symbol, is deterministic without being examined.
 
     Parameters
     ----------
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -256,31 +526,76 @@ def check_is_deterministic(transition_matrix, states, alphabet):
         transition_matrix.
     alphabet : collection of str
         Alphabet associated with the first dimension of transition_matrix.
+    candidates : iterable, optional
+        States to examine. If None, every state is examined. After a
+        merge, only the merged state and the states with transitions into
+        it can have become nondeterministic.
 
     Returns
     -------
     list of tuple
         Pairs of destination state identifiers involved in
         nondeterministic transitions. An empty list indicates that the
-        transition matrix is deterministic.
+        transition matrix, or the candidate states, are deterministic.
     """
+    if _is_delta(transition_matrix):
+        return []
+
+    rows = None
+
+    if candidates is not None:
+        rows = np.unique(
+            np.array([states.index(q) for q in candidates], dtype=np.intp)
+        )
+
     nondeterministic_pairs = []
 
     for a in range(len(alphabet)):
-        rows = np.where((transition_matrix[a, :, :] > 0).sum(axis=1) > 1)[0]
+        _, first, second = _nondeterministic_transitions(transition_matrix, a, rows)
 
-        for row in rows:
-            where_non_det = np.where(transition_matrix[a, row, :] > 0)[0]
+        nondeterministic_pairs += [
+            (states[i], states[j]) for i, j in zip(first.tolist(), second.tolist())
+        ]
 
-            if len(where_non_det) > 2:
-                nond_pairs = np.reshape(where_non_det[:2], (1, 2))
+    return nondeterministic_pairs
 
-            else:
-                nond_pairs = np.reshape(where_non_det, (1, 2))
 
-            nondeterministic_pairs += [tuple(states[i] for i in r) for r in nond_pairs]
+def _conflict_candidates(transition_matrix, states, non_det_pairs):
+    """
+    Return the states that can be nondeterministic after resolving a pair.
 
-    return nondeterministic_pairs
+    The first pair of non_det_pairs has just been merged. New conflicts
+    can only arise at the merged state and at the states with transitions
+    into it, and every remaining conflict has a transition into the first
+    destination of its pair, so only the predecessors of these states need
+    to be examined rather than the whole automaton.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix after the merge.
+    states : list
+        State identifiers corresponding to transition_matrix.
+    non_det_pairs : list of tuple
+        Nondeterministic pairs found before the merge, beginning with the
+        merged pair.
+
+    Returns
+    -------
+    set
+        States to pass to ``check_is_deterministic``.
+    """
+    merged_pair = non_det_pairs[0]
+    merged_state = merged_pair[0] if merged_pair[0] in states else merged_pair[1]
+
+    candidates = {merged_state}
+
+    for q in {merged_state} | {pair[0] for pair in non_det_pairs}:
+        if q in states:
+            i = states.index(q)
+            candidates.update(states[k] for k in _predecessors(transition_matrix, i))
+
+    return candidates
 
 
 def recursive_merge_two_states(
@@ -293,13 +608,15 @@ def recursive_merge_two_states(
     red_states=None,
     output_level="Suppressed",
     method="carrasco",
+    min_count=0,
 ):
     """
     Recursively merge states until the resulting automaton is deterministic.
 
     The initial pair is merged and any nondeterministic state pairs created
     by that merge are considered recursively. A recursive pair is merged
-    only when it satisfies the Hoeffding compatibility bound.
+    only when it satisfies the Hoeffding compatibility bound, or when one
+    of its states is entered by fewer than min_count sequences.
 
     Parameters
     ----------
@@ -307,7 +624,7 @@ def recursive_merge_two_states(
         First state to merge.
     q2 : int or str
         Second state to merge.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -337,11 +654,16 @@ def recursive_merge_two_states(
         test presented by Carrasco and Oncina [1]_, while ``"de_la_higuera"`` 
         follows the red-blue merge formulation presented by de la Higuera [2]_. 
         See the Notes and References sections for further information.
+    min_count : int, default=0
+        Recursive pairs with a state entered by fewer than min_count
+        sequences are merged without the Hoeffding test, since the bound
+        is too loose at such counts to reject a merge.
 
     Returns
     -------
-    new_matrix : np.ndarray
-        Transition-count matrix after the recursive merge attempt.
+    new_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix after the recursive merge attempt, in the
+        same format as transition_matrix.
     new_states : list
         State identifiers corresponding to new_matrix.
     recursive_merge : bool
@@ -353,11 +675,13 @@ def recursive_merge_two_states(
     Raises
     ------
     TypeError
-        If alpha is not numeric, transition_matrix is not a NumPy array, or
-        alphabet has an invalid type.
+        If alpha is not numeric, transition_matrix is not a NumPy array, a
+        list of SciPy sparse matrices or a DeltaTable, or alphabet has an
+        invalid type.
     ValueError
         If output_level or method is invalid, red_states is not provided for the
-        de_la_higuera method, alpha is outside ``(0, 2]``, alphabet or
+        de_la_higuera method, alpha is outside ``(0, 2]``, min_count is
+        negative, alphabet or
         transition_matrix is invalid, either state is unknown, the states are
         identical, or the artificial initial state is selected.
     
@@ -390,6 +714,8 @@ def recursive_merge_two_states(
 
     _validate_alpha(alpha)
 
+    _validate_min_count(min_count)
+
     alphabet = _validate_alphabet(alphabet)
 
     _validate_transition_matrix(
@@ -404,6 +730,26 @@ def recursive_merge_two_states(
         states,
     )
 
+    states = StateRegistry(states)
+    statistics = StateStatistics(transition_matrix, states)
+
+    if _is_delta(transition_matrix):
+        result = _recursive_merge_two_states(
+            q1,
+            q2,
+            to_sparse_transition_matrix(transition_matrix),
+            states,
+            alpha,
+            alphabet,
+            red_states=red_states,
+            output_level=output_level,
+            method=method,
+            statistics=statistics,
+            min_count=min_count,
+        )
+
+        return (to_delta_table(result[0]),) + result[1:]
+
     return _recursive_merge_two_states(
         q1,
         q2,
@@ -414,6 +760,8 @@ def recursive_merge_two_states(
         red_states=red_states,
         output_level=output_level,
         method=method,
+        statistics=statistics,
+        min_count=min_count,
     )
 
 
@@ -427,6 +775,9 @@ def _recursive_merge_two_states(
     red_states=None,
     output_level="Suppressed",
     method="carrasco",
+    statistics=None,
+    cache=None,
+    min_count=0,
 ):
     """
     Recursively merge previously validated states until determinism is restored.
@@ -442,7 +793,7 @@ def _recursive_merge_two_states(
         First state to merge.
     q2 : int or str
         Second state to merge.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -461,11 +812,24 @@ def _recursive_merge_two_states(
         Amount of progress information printed.
     method : {"carrasco", "de_la_higuera"}, default="carrasco"
         State-merging methodology to use.
+    statistics : StateStatistics, optional
+        Statistics of the states of transition_matrix. They are updated
+        in place by a successful merge and left unchanged by a failed one.
+        Ignored when transition_matrix is a MergeEngine, which keeps its
+        own statistics.
+    cache : CompatibilityCache, optional
+        Cache of Hoeffding test results for the same statistics. If given,
+        pairs whose counts have not changed since they were last tested
+        are not tested again.
+    min_count : int, default=0
+        Pairs with a state entered by fewer than min_count sequences are
+        merged without the Hoeffding test.
 
     Returns
     -------
-    new_matrix : np.ndarray
-        Transition-count matrix after the recursive merge attempt.
+    new_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix after the recursive merge attempt, in the
+        same format as transition_matrix.
     new_states : list
         State identifiers corresponding to new_matrix.
     recursive_merge : bool
@@ -473,9 +837,32 @@ def _recursive_merge_two_states(
     red_states_result : list, optional
         Red states produced by the merge. Returned only when method is
         ``"de_la_higuera"``.
+
+    Notes
+    -----
+    transition_matrix may also be a ``MergeEngine``, in which case the
+    states are merged in place, a failed merge is rolled back through the
+    engine journal, and the engine and its states are returned in place of
+    new_matrix and new_states.
     """
+    if isinstance(transition_matrix, MergeEngine):
+        return _recursive_merge_in_place(
+            q1,
+            q2,
+            transition_matrix,
+            alpha,
+            alphabet,
+            red_states=red_states,
+            output_level=output_level,
+            method=method,
+            cache=cache,
+            min_count=min_count,
+        )
+
+    checkpoint = statistics.checkpoint() if statistics is not None else None
+
     if method == "carrasco":
-        initial_transition_matrix = np.copy(transition_matrix)
+        initial_transition_matrix = _copy(transition_matrix)
         initial_states = states.copy()
 
         new_matrix, new_states = _merge_two_states(
@@ -483,6 +870,7 @@ def _recursive_merge_two_states(
             q2,
             transition_matrix,
             states,
+            statistics=statistics,
         )
 
         non_det_pairs = check_is_deterministic(
@@ -502,13 +890,22 @@ def _recursive_merge_two_states(
         recursive_merge = True
 
         while non_det_pairs:
-            if hoeffding_bound(
+            if _below_min_count(
+                non_det_pairs[0],
+                min_count,
+                new_matrix,
+                new_states,
+                statistics=statistics,
+            ) or _cached_test(
+                cache,
+                hoeffding_bound,
                 non_det_pairs[0][0],
                 non_det_pairs[0][1],
                 alpha,
                 new_matrix,
                 alphabet,
                 new_states,
+                statistics=statistics,
             ):
                 if output_level == "Full":
                     print(
@@ -522,12 +919,18 @@ def _recursive_merge_two_states(
                     non_det_pairs[0][1],
                     new_matrix,
                     new_states,
+                    statistics=statistics,
                 )
 
                 non_det_pairs = check_is_deterministic(
                     new_matrix,
                     new_states,
                     alphabet,
+                    candidates=_conflict_candidates(
+                        new_matrix,
+                        new_states,
+                        non_det_pairs,
+                    ),
                 )
 
                 if len(non_det_pairs) > 0 and output_level == "Full":
@@ -538,6 +941,9 @@ def _recursive_merge_two_states(
                     )
 
             else:
+                if statistics is not None:
+                    statistics.rollback(checkpoint)
+
                 recursive_merge = False
                 return (
                     initial_transition_matrix,
@@ -547,7 +953,7 @@ def _recursive_merge_two_states(
 
         return new_matrix, new_states, recursive_merge
 
-    initial_transition_matrix = np.copy(transition_matrix)
+    initial_transition_matrix = _copy(transition_matrix)
     initial_states = states.copy()
     initial_red_states = red_states.copy()
 
@@ -557,6 +963,7 @@ def _recursive_merge_two_states(
         transition_matrix,
         states,
         red_states=red_states,
+        statistics=statistics,
     )
 
     non_det_pairs = check_is_deterministic(
@@ -578,13 +985,22 @@ def _recursive_merge_two_states(
     while non_det_pairs:
         pair = non_det_pairs[0]
 
-        if hoeffding_bound(
+        if _below_min_count(
+            pair,
+            min_count,
+            new_matrix,
+            new_states,
+            statistics=statistics,
+        ) or _cached_test(
+            cache,
+            hoeffding_bound,
             pair[0],
             pair[1],
             alpha,
             new_matrix,
             alphabet,
             new_states,
+            statistics=statistics,
         ):
             if output_level == "Full":
                 print(
@@ -599,12 +1015,18 @@ def _recursive_merge_two_states(
                 new_matrix,
                 new_states,
                 red_states=red_states,
+                statistics=statistics,
             )
 
             non_det_pairs = check_is_deterministic(
                 new_matrix,
                 new_states,
                 alphabet,
+                candidates=_conflict_candidates(
+                    new_matrix,
+                    new_states,
+                    non_det_pairs,
+                ),
             )
 
             if len(non_det_pairs) > 0 and output_level == "Full":
@@ -615,6 +1037,9 @@ def _recursive_merge_two_states(
                 )
 
         else:
+            if statistics is not None:
+                statistics.rollback(checkpoint)
+
             recursive_merge = False
             return (
                 initial_transition_matrix,
@@ -626,7 +1051,201 @@ def _recursive_merge_two_states(
     return new_matrix, new_states, recursive_merge, red_states
 
 
-def get_blue_states(transition_matrix, red_states, states):
+def _recursive_merge_in_place(
+    q1,
+    q2,
+    engine,
+    alpha,
+    alphabet,
+    red_states=None,
+    output_level="Suppressed",
+    method="carrasco",
+    cache=None,
+    min_count=0,
+):
+    """
+    Recursively merge two states of a merge engine in place.
+
+    The two subtrees rooted at the merged states are folded together. Each
+    merge adds the conflicts it creates to the engine worklist, and the
+    next pair is taken from that worklist, so the work done is proportional
+    to the size of the folded subtrees rather than the automaton. Pairs
+    are resolved in the same order as ``_recursive_merge_two_states``
+    resolves them for a transition matrix, so both produce the same
+    automaton.
+
+    Parameters
+    ----------
+    q1 : int or str
+        First state to merge.
+    q2 : int or str
+        Second state to merge.
+    engine : MergeEngine
+        Engine holding the current automaton.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    alphabet : collection of str
+        Alphabet of the automaton.
+    red_states : list, optional
+        Red states to update during a de_la_higuera merge.
+    output_level : {"Suppressed", "Truncated", "Full"}, default="Suppressed"
+        Amount of progress information printed.
+    method : {"carrasco", "de_la_higuera"}, default="carrasco"
+        State-merging methodology to use.
+    cache : CompatibilityCache, optional
+        Cache of Hoeffding test results for the engine statistics.
+    min_count : int, default=0
+        Pairs with a state entered by fewer than min_count sequences are
+        merged without the Hoeffding test.
+
+    Returns
+    -------
+    engine : MergeEngine
+        The engine, merged in place or restored after a failed merge.
+    states : StateRegistry
+        Current states of the engine.
+    recursive_merge : bool
+        True if the complete recursive merge succeeds; otherwise False.
+    red_states_result : list, optional
+        Red states produced by the merge. Returned only when method is
+        ``"de_la_higuera"``.
+    """
+    checkpoint = engine.checkpoint()
+    initial_red_states = red_states.copy() if red_states is not None else None
+
+    recursive_merge, red_states = _fold_in_place(
+        q1,
+        q2,
+        engine,
+        alpha,
+        alphabet,
+        red_states=red_states,
+        output_level=output_level,
+        cache=cache,
+        min_count=min_count,
+    )
+
+    if recursive_merge:
+        engine.commit(checkpoint)
+    else:
+        engine.rollback(checkpoint)
+        red_states = initial_red_states
+
+    if method == "carrasco":
+        return engine, engine.states, recursive_merge
+
+    return engine, engine.states, recursive_merge, red_states
+
+
+def _fold_in_place(
+    q1,
+    q2,
+    engine,
+    alpha,
+    alphabet,
+    red_states=None,
+    output_level="Suppressed",
+    cache=None,
+    min_count=0,
+):
+    """
+    Merge two states of a merge engine and fold their subtrees together.
+
+    The fold stops at the first nondeterministic pair that fails the
+    Hoeffding test. Nothing is committed or rolled back, so the caller
+    decides whether to keep the merges made since its own checkpoint.
+
+    Parameters
+    ----------
+    q1 : int or str
+        First state to merge.
+    q2 : int or str
+        Second state to merge.
+    engine : MergeEngine
+        Engine holding the current automaton.
+    alpha : float
+        Significance level used by the Hoeffding compatibility test.
+    alphabet : collection of str
+        Alphabet of the automaton.
+    red_states : list, optional
+        Red states to update during a de_la_higuera merge.
+    output_level : {"Suppressed", "Truncated", "Full"}, default="Suppressed"
+        Amount of progress information printed.
+    cache : CompatibilityCache, optional
+        Cache of Hoeffding test results for the engine statistics.
+    min_count : int, default=0
+        Pairs with a state entered by fewer than min_count sequences are
+        merged without the Hoeffding test.
+
+    Returns
+    -------
+    recursive_merge : bool
+        True if every nondeterministic pair was resolved; otherwise False.
+    red_states : list or None
+        Red states after the merges that were made, or None when
+        red_states is not provided.
+    """
+    # The tests read counts from the engine statistics, so the states are
+    # not brought up to date after every merge of the fold.
+    states = engine.states
+
+    red_states = _merge_in_place(q1, q2, engine, red_states)
+
+    pair = engine.next_nondeterministic_pair()
+
+    if pair is not None and output_level == "Full":
+        print(
+            "Merging of states",
+            (q1, q2),
+            "results in non-deterministic pairs:",
+            engine.nondeterministic_pairs(),
+        )
+
+    while pair is not None:
+        if not (
+            _below_min_count(
+                pair,
+                min_count,
+                engine,
+                states,
+                statistics=engine.statistics,
+            )
+            or _cached_test(
+                cache,
+                hoeffding_bound,
+                pair[0],
+                pair[1],
+                alpha,
+                engine,
+                alphabet,
+                states,
+                statistics=engine.statistics,
+            )
+        ):
+            return False, red_states
+
+        if output_level == "Full":
+            print(
+                "Successfully merged states",
+                pair,
+                "into a deterministic state.",
+            )
+
+        red_states = _merge_in_place(pair[0], pair[1], engine, red_states)
+
+        pair = engine.next_nondeterministic_pair()
+
+        if pair is not None and output_level == "Full":
+            print(
+                "Merging of previous non-deterministic pair "
+                "results in non-deterministic pairs:",
+                engine.nondeterministic_pairs(),
+            )
+
+    return True, red_states
+
+
+def get_blue_states(transition_matrix, red_states, states, fringe=None):
     """
     Return the blue states associated with a set of red states.
 
@@ -635,26 +1254,53 @@ def get_blue_states(transition_matrix, red_states, states):
 
     Parameters
     ----------
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array, DeltaTable or MergeEngine
         Transition-count matrix with shape
-        ``(n_symbols, n_states, n_states)``.
+        ``(n_symbols, n_states, n_states)``, or a merge engine holding one.
     red_states : list
         State identifiers currently classified as red.
     states : list
         State identifiers corresponding to the final two dimensions of
         transition_matrix.
+    fringe : RedBlueFringe, optional
+        Fringe maintained for red_states over transition_matrix. If it
+        belongs to transition_matrix, its blue states are returned without
+        visiting the transitions of the red states.
 
     Returns
     -------
     list
         Sorted blue-state identifiers.
     """
+    if fringe is not None and fringe.engine is transition_matrix:
+        return fringe.blue
+
     blue_states = []
 
+    if isinstance(transition_matrix, MergeEngine):
+        for q in red_states:
+            blue_states += [
+                x
+                for z in range(transition_matrix.n_symbols)
+                for x in transition_matrix.destinations(q, z)
+            ]
+
+        blue_states = [x for x in blue_states if x not in red_states]
+
+        return sorted(blue_states)
+
+    if _is_delta(transition_matrix):
+        n_symbols = transition_matrix.destinations.shape[1]
+    else:
+        n_symbols = len(transition_matrix)
+
     for q in red_states:
+        i = states.index(q)
+
         blue_states += [
             states[x]
-            for x in list(np.where(transition_matrix[:, states.index(q), :] > 0)[1])
+            for z in range(n_symbols)
+            for x in _positive_destinations(transition_matrix, z, i)
         ]
 
     blue_states = [x for x in blue_states if x not in red_states]
@@ -0,0 +1,138 @@
+"""
+Constant-time lookup of state identifiers.
+
+Transition matrices are indexed by the position of each state in a list of
+state identifiers, and most operations begin by finding that position
+with ``states.index(q)``, which is linear in the number of states. A
+``StateRegistry`` is a list of state identifiers that also holds a hash
+index from identifier to position, so lookups and membership tests take
+constant time. Being a list, it is accepted wherever a states list is.
+"""
+
+
+class StateRegistry(list):
+    """
+    List of state identifiers with a hash index of their positions.
+
+    ``index`` and ``in`` use a dictionary from identifier to position
+    instead of scanning the list. The dictionary is discarded by any
+    operation that modifies the list, such as the removal of a merged
+    state, and rebuilt on the next lookup, so the registry always agrees
+    with its contents. State identifiers must be hashable and unique.
+
+    Parameters
+    ----------
+    states : iterable, optional
+        State identifiers, beginning with the artificial initial state
+        ``"*"``.
+    """
+
+    def __init__(self, states=()):
+        super().__init__(states)
+        self._positions = None
+
+    def _index(self):
+        """
+        Return the mapping from state identifier to position.
+
+        Returns
+        -------
+        dict
+            Position of every state identifier in the registry.
+        """
+        if self._positions is None:
+            self._positions = {state: i for i, state in enumerate(self)}
+
+        return self._positions
+
+    def index(self, state, *args):
+        """
+        Return the position of a state identifier.
+
+        Parameters
+        ----------
+        state : int or str
+            State identifier.
+        *args
+            Optional start and stop positions, as for ``list.index``.
+            These fall back to a linear search.
+
+        Returns
+        -------
+        int
+            Position of state in the registry.
+
+        Raises
+        ------
+        ValueError
+            If state is not in the registry.
+        """
+        if args:
+            return super().index(state, *args)
+
+        try:
+            return self._index()[state]
+        except (KeyError, TypeError):
+            raise ValueError(f"{state!r} is not in list") from None
+
+    def __contains__(self, state):
+        try:
+            return state in self._index()
+        except TypeError:
+            return super().__contains__(state)
+
+    def copy(self):
+        """
+        Return a shallow copy of the registry.
+
+        Returns
+        -------
+        StateRegistry
+            Registry with the same state identifiers.
+        """
+        return StateRegistry(self)
+
+
+def _invalidating(name):
+    """
+    Wrap a list method so that it discards the index of a registry.
+
+    Parameters
+    ----------
+    name : str
+        Name of a list method that modifies the list.
+
+    Returns
+    -------
+    callable
+        Method that discards the index and then calls the list method.
+    """
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._positions = None
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+
+    return wrapper
+
+
+for _name in (
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "__setitem__",
+    "append",
+    "clear",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "reverse",
+    "sort",
+):
+    setattr(StateRegistry, _name, _invalidating(_name))
+
+del _name
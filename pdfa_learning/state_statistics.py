@@ -4,9 +4,231 @@ State-level count and probability statistics for probabilistic automata.
 This module provides the fundamental state statistics used during ALERGIA
 learning. These include the number of sequences entering and terminating
 at a state, symbol-specific transition probabilities, and the probability
-that a sequence terminates at a state.
+that a sequence terminates at a state. Dense and sparse transition
+matrices are both supported.
+
+The functions recompute each statistic from the transition matrix. The
+``get_all_*`` functions return a statistic for every state at once using a
+few array reductions. During learning, ``StateStatistics`` holds the
+statistics of every state instead, and is updated as states are merged,
+so that compatibility tests read stored values rather than summing the
+matrix.
 """
 
+import numpy as np
+
+from .matrix_formats import (
+    _incoming_count,
+    _incoming_counts,
+    _outgoing_count,
+    _outgoing_counts,
+)
+
+
+class StateStatistics:
+    """
+    Per-state counts of a transition-count matrix, maintained across merges.
+
+    The number of sequences entering each state, leaving it through each
+    symbol, and terminating at it are computed once. Merging two states
+    adds the counts of the removed state to those of the surviving state
+    in ``O(n_symbols)`` time, which matches the counts of the merged
+    transition matrix because merging never changes the totals of the
+    other states. Every merge is journaled so that a failed recursive
+    merge can be rolled back.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+    states : list
+        State identifiers corresponding to the final two dimensions of
+        transition_matrix.
+
+    Attributes
+    ----------
+    incoming : np.ndarray
+        Number of sequences entering each state, by original row.
+    outgoing : np.ndarray
+        Array with shape ``(n_states, n_symbols)`` containing the number of
+        sequences leaving each state through each symbol.
+    final : np.ndarray
+        Number of sequences terminating at each state.
+    rows : dict
+        Mapping from each current state identifier to its row in the
+        arrays. Removed states are deleted from the mapping, so rows are
+        never renumbered.
+    versions : np.ndarray
+        Version stamp of the counts in each row. A merge gives the
+        surviving state a stamp that has not been used before, and a
+        rollback restores the previous stamp, so equal stamps always mean
+        equal counts.
+    """
+
+    def __init__(self, transition_matrix, states):
+        self.incoming = np.asarray(_incoming_counts(transition_matrix))
+        self.outgoing = _outgoing_counts(transition_matrix)
+        self.final = self.incoming - self.outgoing.sum(axis=1)
+        self.rows = {state: i for i, state in enumerate(states)}
+        self.versions = np.zeros(len(self.incoming), dtype=np.int64)
+        self._stamp = 0
+        self._journal = []
+
+    def n(self, q):
+        """
+        Return the number of sequences entering a state.
+
+        Parameters
+        ----------
+        q : int or str
+            State identifier.
+
+        Returns
+        -------
+        int or float
+            Number of sequences entering the state.
+        """
+        return self.incoming[self.rows[q]]
+
+    def endpoint(self, q):
+        """
+        Return the number of sequences terminating at a state.
+
+        Parameters
+        ----------
+        q : int or str
+            State identifier.
+
+        Returns
+        -------
+        int or float
+            Number of sequences terminating at the state.
+        """
+        return self.final[self.rows[q]]
+
+    def version(self, q):
+        """
+        Return the version stamp of the counts of a state.
+
+        Parameters
+        ----------
+        q : int or str
+            State identifier.
+
+        Returns
+        -------
+        int
+            Version stamp of the state.
+        """
+        return int(self.versions[self.rows[q]])
+
+    def pi(self, q):
+        """
+        Return the probabilities of leaving a state via each symbol.
+
+        Parameters
+        ----------
+        q : int or str
+            State identifier.
+
+        Returns
+        -------
+        np.ndarray
+            Probability of leaving state q via each symbol, in alphabet
+            order.
+        """
+        i = self.rows[q]
+        return self.outgoing[i] / self.incoming[i]
+
+    def merge(self, surviving_state, removed_state):
+        """
+        Merge the counts of one state into those of another.
+
+        Parameters
+        ----------
+        surviving_state : int or str
+            State that represents the merged state.
+        removed_state : int or str
+            State removed by the merge.
+        """
+        i = self.rows[surviving_state]
+        j = self.rows.pop(removed_state)
+
+        self._journal.append(
+            (
+                surviving_state,
+                removed_state,
+                j,
+                self.incoming[i],
+                self.outgoing[i].copy(),
+                self.final[i],
+                self.versions[i],
+            )
+        )
+
+        self._stamp += 1
+        self.versions[i] = self._stamp
+
+        self.incoming[i] += self.incoming[j]
+        self.outgoing[i] += self.outgoing[j]
+        self.final[i] += self.final[j]
+
+    def checkpoint(self):
+        """
+        Return a marker for the current position in the merge journal.
+
+        Returns
+        -------
+        int
+            Number of merges recorded so far.
+        """
+        return len(self._journal)
+
+    def merged_since(self, checkpoint):
+        """
+        Return the states whose counts changed after a checkpoint.
+
+        Parameters
+        ----------
+        checkpoint : int
+            Marker returned by ``checkpoint``.
+
+        Returns
+        -------
+        list
+            Surviving states of the merges recorded after the checkpoint,
+            in the order they were first merged into.
+        """
+        return list(dict.fromkeys(entry[0] for entry in self._journal[checkpoint:]))
+
+    def rollback(self, checkpoint):
+        """
+        Undo every merge recorded after a checkpoint.
+
+        Parameters
+        ----------
+        checkpoint : int
+            Marker returned by ``checkpoint``.
+        """
+        while len(self._journal) > checkpoint:
+            (
+                surviving_state,
+                removed_state,
+                j,
+                incoming,
+                outgoing,
+                final,
+                version,
+            ) = self._journal.pop()
+
+            i = self.rows[surviving_state]
+            self.rows[removed_state] = j
+            self.incoming[i] = incoming
+            self.outgoing[i] = outgoing
+            self.final[i] = final
+            self.versions[i] = version
+
 
 def get_n(q, transition_matrix, states):
     """
@@ -19,7 +241,7 @@ def get_n(q, transition_matrix, states):
     ----------
     q : int or str
         State identifier.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -32,7 +254,7 @@ def get_n(q, transition_matrix, states):
         Number of sequences entering the state.
     """
     i = states.index(q)
-    return transition_matrix[:, :, i].sum()
+    return _incoming_count(transition_matrix, i)
 
 
 def get_endpoint(q, transition_matrix, states):
@@ -46,7 +268,7 @@ def get_endpoint(q, transition_matrix, states):
     ----------
     q : int or str
         State identifier.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -59,7 +281,7 @@ def get_endpoint(q, transition_matrix, states):
         Number of sequences terminating at the state.
     """
     i = states.index(q)
-    return transition_matrix[:, :, i].sum() - transition_matrix[:, i, :].sum()
+    return _incoming_count(transition_matrix, i) - _outgoing_count(transition_matrix, i)
 
 
 def get_pi(q, z, transition_matrix, states):
@@ -75,7 +297,7 @@ def get_pi(q, z, transition_matrix, states):
         State identifier.
     z : int
         Index of the symbol in the first dimension of transition_matrix.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -88,7 +310,9 @@ def get_pi(q, z, transition_matrix, states):
         Probability of leaving state q via the indexed symbol.
     """
     i = states.index(q)
-    return transition_matrix[z, i, :].sum() / get_n(q, transition_matrix, states)
+    return _outgoing_count(transition_matrix, i, z) / get_n(
+        q, transition_matrix, states
+    )
 
 
 def get_pi_endpoint(q, transition_matrix, alphabet, states):
@@ -102,7 +326,7 @@ def get_pi_endpoint(q, transition_matrix, alphabet, states):
     ----------
     q : int or str
         State identifier.
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     alphabet : collection of str
@@ -124,4 +348,102 @@ def get_pi_endpoint(q, transition_matrix, alphabet, states):
             states,
         )
         for z in range(len(alphabet))
-    )
\ No newline at end of file
+    )
+
+
+def get_all_n(transition_matrix):
+    """
+    Return the number of sequences entering every state.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+
+    Returns
+    -------
+    np.ndarray
+        Number of sequences entering each state, in the order of the
+        states of transition_matrix.
+    """
+    return np.asarray(_incoming_counts(transition_matrix))
+
+
+def get_all_endpoints(transition_matrix):
+    """
+    Return the number of sequences terminating at every state.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+
+    Returns
+    -------
+    np.ndarray
+        Number of sequences terminating at each state. The entry of the
+        artificial initial state is not meaningful.
+    """
+    return get_all_n(transition_matrix) - _outgoing_counts(transition_matrix).sum(
+        axis=1
+    )
+
+
+def get_all_pi(transition_matrix):
+    """
+    Return the probabilities of leaving every state via every symbol.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+
+    Returns
+    -------
+    np.ndarray
+        Array with shape ``(n_states, n_symbols)`` whose entry ``[i, z]``
+        equals ``get_pi(states[i], z, transition_matrix, states)``. The
+        row of the artificial initial state, which no sequence enters,
+        is NaN.
+    """
+    n = get_all_n(transition_matrix).astype(float)
+    n[0] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _outgoing_counts(transition_matrix) / n[:, np.newaxis]
+
+
+def get_all_pi_endpoints(transition_matrix):
+    """
+    Return the probability of terminating at every state.
+
+    Parameters
+    ----------
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
+        Transition-count matrix with shape
+        ``(n_symbols, n_states, n_states)``.
+
+    Returns
+    -------
+    np.ndarray
+        Probability of terminating at each state. The entry of the
+        artificial initial state is NaN.
+
+    Notes
+    -----
+    The probabilities are calculated as the terminating counts divided by
+    the entering counts. This equals one minus the sum of the symbol
+    probabilities, as in ``get_pi_endpoint``, but is exactly zero for
+    states at which no sequence terminates.
+    """
+    n = get_all_n(transition_matrix)
+    endpoints = n - _outgoing_counts(transition_matrix).sum(axis=1)
+
+    n = n.astype(float)
+    n[0] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return endpoints / n
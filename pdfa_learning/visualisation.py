@@ -5,19 +5,27 @@ This module renders an automaton as a directed Graphviz network using its
 transition matrix, state identifiers, and alphabet. Nodes and transitions
 may be labelled using either observed transition counts or estimated
 probabilities, and the resulting graph can be written to a range of
-Graphviz-supported output formats.
+Graphviz-supported output formats. Only the positive transitions are
+visited, so sparse transition matrices are rendered without densifying
+them, and the terminating statistics of all states are computed together.
 """
 
+import itertools as it
+
 import graphviz
 
 from ._validation import (
     _validate_alphabet,
     _validate_transition_matrix,
 )
+from .matrix_formats import (
+    _entry,
+    _positive_transitions,
+)
 from .probabilities import probability_transition_matrix
 from .state_statistics import (
-    get_endpoint,
-    get_pi_endpoint,
+    get_all_endpoints,
+    get_all_pi_endpoints,
 )
 
 
@@ -44,7 +52,7 @@ def network_visualisation(
 
     Parameters
     ----------
-    transition_matrix : np.ndarray
+    transition_matrix : np.ndarray, list of scipy.sparse.csr_array or DeltaTable
         Transition-count matrix with shape
         ``(n_symbols, n_states, n_states)``.
     states : list
@@ -79,8 +87,9 @@ def network_visualisation(
     Raises
     ------
     TypeError
-        If ``transition_matrix`` is not a NumPy array or ``alphabet`` has an
-        invalid type.
+        If ``transition_matrix`` is not a NumPy array, a list of SciPy
+        sparse matrices or a DeltaTable, or ``alphabet`` has an invalid
+        type.
     ValueError
         If ``alphabet`` or ``transition_matrix`` has invalid contents or
         dimensions.
@@ -110,19 +119,17 @@ def network_visualisation(
 
     dot.graph_attr["rankdir"] = "LR"
 
+    endpoint_counts = get_all_endpoints(transition_matrix)
+    endpoint_probabilities = get_all_pi_endpoints(transition_matrix)
+
     # Add states.
-    for state in states:
+    for i, state in enumerate(states):
         if state == "*":
             node_label = str(state)
             node_shape = "circle"
             default_font_size = 14
         else:
-            endpoint_probability = get_pi_endpoint(
-                state,
-                transition_matrix,
-                alphabet,
-                states,
-            )
+            endpoint_probability = endpoint_probabilities[i]
 
             if endpoint_probability > 0:
                 node_shape = "doublecircle"
@@ -131,12 +138,7 @@ def network_visualisation(
                 if probabilities:
                     endpoint_label = f"{endpoint_probability:.2f}"
                 else:
-                    endpoint_count = get_endpoint(
-                        state,
-                        transition_matrix,
-                        states,
-                    )
-                    endpoint_label = str(endpoint_count)
+                    endpoint_label = str(endpoint_counts[i])
 
                 node_label = f"{state}: {endpoint_label}"
             else:
@@ -162,85 +164,78 @@ def network_visualisation(
         )
 
     # Add positive transitions.
-    for source_index, source_state in enumerate(states):
-        for destination_index, destination_state in enumerate(states):
+    transitions = it.groupby(
+        _positive_transitions(transition_matrix),
+        key=lambda transition: transition[1:],
+    )
 
-            # Combine multiple self-loop labels into a single loop.
-            if source_state == destination_state:
-                self_loop_labels = []
+    for (source_index, destination_index), edge_transitions in transitions:
+        source_state = states[source_index]
+        destination_state = states[destination_index]
 
-                for symbol_index, symbol in enumerate(alphabet):
-                    transition_count = transition_matrix[
-                        symbol_index,
-                        source_index,
-                        destination_index,
-                    ]
+        # Combine multiple self-loop labels into a single loop.
+        if source_state == destination_state:
+            self_loop_labels = []
 
-                    if transition_count <= 0:
-                        continue
+            for symbol_index, _, _ in edge_transitions:
+                symbol = alphabet[symbol_index]
 
-                    label_value = label_matrix[
-                        symbol_index,
-                        source_index,
-                        destination_index,
-                    ]
+                label_value = _entry(
+                    label_matrix,
+                    symbol_index,
+                    source_index,
+                    destination_index,
+                )
 
-                    if probabilities:
-                        self_loop_labels.append(
-                            f"{symbol}: {label_value:.2f}"
-                        )
-                    else:
-                        self_loop_labels.append(
-                            f"{symbol}: {label_value}"
-                        )
-
-                if self_loop_labels:
-                    dot.edge(
-                        str(source_state),
-                        str(destination_state),
-                        label="\n".join(self_loop_labels),
-                        arrowsize="0.35",
-                        fontsize=str(edge_fontsize),
-                        penwidth=str(line_width),
+                if probabilities:
+                    self_loop_labels.append(
+                        f"{symbol}: {label_value:.2f}"
+                    )
+                else:
+                    self_loop_labels.append(
+                        f"{symbol}: {label_value}"
                     )
 
-            # Keep transitions between different states as separate edges.
-            else:
-                for symbol_index, symbol in enumerate(alphabet):
-                    transition_count = transition_matrix[
-                        symbol_index,
-                        source_index,
-                        destination_index,
-                    ]
-
-                    if transition_count <= 0:
-                        continue
-
-                    label_value = label_matrix[
-                        symbol_index,
-                        source_index,
-                        destination_index,
-                    ]
-
-                    if source_state == "*":
-                        if probabilities:
-                            edge_label = f"{label_value:.2f}"
-                        else:
-                            edge_label = str(label_value)
+            dot.edge(
+                str(source_state),
+                str(destination_state),
+                label="\n".join(self_loop_labels),
+                arrowsize="0.35",
+                fontsize=str(edge_fontsize),
+                penwidth=str(line_width),
+            )
+
+        # Keep transitions between different states as separate edges.
+        else:
+            for symbol_index, _, _ in edge_transitions:
+                symbol = alphabet[symbol_index]
+
+                label_value = _entry(
+                    label_matrix,
+                    symbol_index,
+                    source_index,
+                    destination_index,
+                )
+
+                if source_state == "*":
+                    if probabilities:
+                        edge_label = f"{label_value:.2f}"
                     else:
-                        if probabilities:
-                            edge_label = f"{symbol}: {label_value:.2f}"
-                        else:
-                            edge_label = f"{symbol}: {label_value}"
-
-                    dot.edge(
-                        str(source_state),
-                        str(destination_state),
-                        label=edge_label,
-                        arrowsize="0.35",
-                        fontsize=str(edge_fontsize),
-                        penwidth=str(line_width),
-                    )
+                        edge_label = str(label_value)
+                else:
+                    if probabilities:
+                        edge_label = f"{symbol}: {label_value:.2f}"
+                    else:
+                        edge_label = f"{symbol}: {label_value}"
+
+                dot.edge(
+                    str(source_state),
+                    str(destination_state),
+                    label=edge_label,
+                    arrowsize="0.35",
+                    fontsize=str(edge_fontsize),
+                    penwidth=str(line_width),
+                )
 
     if save:
         dot.render(cleanup=True)
@@ -27,6 +27,20 @@ def test_get_blue_states_arnolds_example(arnolds_example):
     assert obtained_blue_states == expected_blue_states
 
 
+def test_get_blue_states_delta_table_with_many_symbols():
+    sequences = ["AB", "C", "D", "E", "AE", "DDA"]
+    alphabet = ["A", "B", "C", "D", "E"]
+    transition_matrix = pl.get_transition_matrix(sequences, alphabet)
+    states = pl.get_initial_states(sequences)
+    red_states = ["*", 0, 3]
+
+    obtained_blue_states = pl.get_blue_states(
+        pl.to_delta_table(transition_matrix), red_states, states
+    )
+    expected_blue_states = pl.get_blue_states(transition_matrix, red_states, states)
+    assert obtained_blue_states == expected_blue_states == [1, 2, 4, 7]
+
+
 def test_get_pairs_to_check_simple_example(simple_pta):
     obtained_pairs = pl.get_pairs_to_check(simple_pta.states)
     expected_pairs = [
@@ -181,6 +195,58 @@ def test_alergia_raises_for_invalid_method(simple_pta):
         )
 
 
+def test_alergia_raises_for_invalid_blue_order(simple_pta):
+    with pytest.raises(
+        ValueError,
+        match="blue_order must be",
+    ):
+        pl.alergia(
+            simple_pta.transition_matrix,
+            simple_pta.states,
+            simple_pta.alphabet,
+            alpha=0.2,
+            method="de_la_higuera",
+            blue_order="Invalid",
+        )
+
+
+@pytest.mark.parametrize(
+    "min_count, error, message",
+    [
+        (1.5, TypeError, "min_count must be an integer"),
+        (-1, ValueError, "min_count must be non-negative"),
+    ],
+)
+def test_alergia_raises_for_invalid_min_count(simple_pta, min_count, error, message):
+    with pytest.raises(error, match=message):
+        pl.alergia(
+            simple_pta.transition_matrix,
+            simple_pta.states,
+            simple_pta.alphabet,
+            alpha=0.2,
+            min_count=min_count,
+        )
+
+
+@pytest.mark.parametrize(
+    "n_jobs, error, message",
+    [
+        (0, ValueError, "n_jobs must be"),
+        (1.5, TypeError, "n_jobs must be an integer"),
+    ],
+)
+def test_alergia_raises_for_invalid_n_jobs(simple_pta, n_jobs, error, message):
+    with pytest.raises(error, match=message):
+        pl.alergia(
+            simple_pta.transition_matrix,
+            simple_pta.states,
+            simple_pta.alphabet,
+            alpha=0.2,
+            method="de_la_higuera",
+            n_jobs=n_jobs,
+        )
+
+
 def test_alergia_raises_for_invalid_alpha_less_than_or_equal_to_zero(simple_pta):
     with pytest.raises(
         ValueError,
@@ -845,3 +911,262 @@ def test_alergia_arnolds_example_alpha_point_nine_higuera(arnolds_example):
     print(obtained_tracking)
     print(expected_tracking)
     assert obtained_tracking == expected_tracking
+
+
+@pytest.mark.parametrize("alpha", [0.9, 1.5])
+def test_alergia_incremental_skips_failed_pairs(arnolds_example, alpha):
+    expected_matrix, expected_states, expected_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        alpha,
+    )
+
+    obtained_matrix, obtained_states, obtained_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        alpha,
+        incremental=True,
+    )
+
+    assert np.array_equal(obtained_matrix, expected_matrix)
+    assert obtained_states == expected_states
+    assert obtained_tracking["successful_merges"] == (
+        expected_tracking["successful_merges"]
+    )
+    assert obtained_tracking["attempted_merges"] < (
+        expected_tracking["attempted_merges"]
+    )
+    assert (
+        pl.check_is_deterministic(
+            obtained_matrix,
+            obtained_states,
+            arnolds_example.alphabet,
+        )
+        == []
+    )
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+def test_alergia_cache_does_not_change_result(arnolds_example, method):
+    expected_matrix, expected_states, expected_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+    )
+
+    obtained_matrix, obtained_states, obtained_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+        cache=True,
+    )
+
+    hits = obtained_tracking.pop("cache_hits")
+    misses = obtained_tracking.pop("cache_misses")
+
+    assert np.array_equal(obtained_matrix, expected_matrix)
+    assert obtained_states == expected_states
+    assert obtained_tracking == expected_tracking
+    assert misses > 0
+
+    if method == "carrasco":
+        assert hits > 0
+
+
+@pytest.mark.parametrize("blue_order", ["identifier", "frequency"])
+def test_alergia_blue_order_reports_order_and_time(arnolds_example, blue_order):
+    expected_matrix, expected_states, expected_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method="de_la_higuera",
+    )
+
+    obtained_matrix, obtained_states, obtained_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method="de_la_higuera",
+        blue_order=blue_order,
+    )
+
+    elapsed_time = obtained_tracking.pop("elapsed_time")
+
+    assert obtained_tracking.pop("blue_order") == blue_order
+    assert elapsed_time >= 0
+    assert set(obtained_tracking) == set(expected_tracking)
+    assert (
+        pl.check_is_deterministic(
+            obtained_matrix,
+            obtained_states,
+            arnolds_example.alphabet,
+        )
+        == []
+    )
+
+    if blue_order == "identifier":
+        assert np.array_equal(obtained_matrix, expected_matrix)
+        assert obtained_states == expected_states
+        assert obtained_tracking == expected_tracking
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+def test_alergia_min_count_reduces_attempted_merges(arnolds_example, method):
+    _, _, expected_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        1.9,
+        method=method,
+    )
+
+    obtained_matrix, obtained_states, obtained_tracking = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        1.9,
+        method=method,
+        min_count=2,
+    )
+
+    assert set(obtained_tracking) == set(expected_tracking)
+    assert obtained_tracking["attempted_merges"] < (
+        expected_tracking["attempted_merges"]
+    )
+    assert (
+        pl.check_is_deterministic(
+            obtained_matrix,
+            obtained_states,
+            arnolds_example.alphabet,
+        )
+        == []
+    )
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+def test_alergia_min_count_merges_low_count_subtrees(method):
+    sequences = ["A"] * 30 + ["B"] * 30 + ["AC", "ACC", "BD"]
+    alphabet = ["A", "B", "C", "D"]
+    transition_matrix = pl.get_transition_matrix(sequences, alphabet)
+    states = pl.get_initial_states(sequences)
+
+    obtained_matrix, obtained_states, _ = pl.alergia(
+        transition_matrix,
+        states,
+        alphabet,
+        0.9,
+        method=method,
+        min_count=5,
+    )
+
+    assert obtained_states == ["*", 0, 1]
+    assert all(
+        pl.get_n(q, obtained_matrix, obtained_states) >= 5
+        for q in obtained_states[1:]
+    )
+
+
+def test_pair_index_matches_get_pairs_to_check(arnolds_example):
+    pairs = pl.get_pairs_to_check(arnolds_example.states)
+    pair_states = arnolds_example.states[1:]
+
+    j, i = alergia_module._pair_index(np.arange(len(pairs)))
+
+    assert [(pair_states[a], pair_states[b]) for a, b in zip(j, i)] == pairs
+    assert alergia_module._pair_index(len(pairs) - 1) == (
+        len(pair_states) - 1,
+        len(pair_states) - 2,
+    )
+
+
+@pytest.mark.parametrize("output_level", ["Suppressed", "Truncated"])
+def test_alergia_carrasco_screens_pairs_in_chunks(
+    arnolds_example,
+    monkeypatch,
+    capsys,
+    output_level,
+):
+    expected = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        output_level=output_level,
+    )
+    expected_output = capsys.readouterr().out
+
+    monkeypatch.setattr(alergia_module, "_SCREEN_CHUNK_SIZE", 4)
+
+    obtained = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        output_level=output_level,
+    )
+
+    assert np.array_equal(obtained[0], expected[0])
+    assert obtained[1:] == expected[1:]
+    assert capsys.readouterr().out == expected_output
+
+
+@pytest.mark.parametrize("alpha, min_count", [(0.3, 0), (0.9, 0), (1.5, 5)])
+def test_alergia_n_jobs_does_not_change_result(alpha, min_count, monkeypatch, capsys):
+    monkeypatch.setattr(alergia_module, "_PARALLEL_MIN_STATES", 1)
+
+    pools = []
+    start_trial_pool = alergia_module._start_trial_pool
+
+    def counting_start_trial_pool(*args):
+        pools.append(args)
+        return start_trial_pool(*args)
+
+    monkeypatch.setattr(
+        alergia_module,
+        "_start_trial_pool",
+        counting_start_trial_pool,
+    )
+
+    rng = np.random.default_rng(1)
+    sequences = [
+        "".join(rng.choice(["A", "B"], size=rng.integers(1, 9)))
+        for _ in range(300)
+    ]
+    ppta = pl.build_ppta(sequences, ["A", "B"], sparse=True)
+
+    results = []
+
+    for n_jobs in [None, 2]:
+        learned_matrix, learned_states, tracking = pl.alergia(
+            ppta.transition_matrix,
+            ppta.states,
+            ppta.alphabet,
+            alpha,
+            output_level="Truncated",
+            method="de_la_higuera",
+            min_count=min_count,
+            n_jobs=n_jobs,
+        )
+        results.append(
+            (
+                pl.to_dense_transition_matrix(learned_matrix),
+                learned_states,
+                tracking,
+                capsys.readouterr().out,
+            )
+        )
+
+    (expected_matrix, *expected), (obtained_matrix, *obtained) = results
+
+    assert len(pools) > 0
+    assert expected[1]["recursive_merge_failures"] > 0
+    assert np.array_equal(obtained_matrix, expected_matrix)
+    assert obtained == expected
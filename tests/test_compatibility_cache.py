@@ -0,0 +1,79 @@
+import importlib
+
+import pdfa_learning as pl
+
+compatibility_cache_module = importlib.import_module(
+    "pdfa_learning.compatibility_cache"
+)
+
+
+def test_compatibility_cache_reuses_results_until_a_state_changes(arnolds_example):
+    statistics = pl.StateStatistics(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+    cache = pl.CompatibilityCache(statistics)
+
+    calls = []
+
+    def test(q1, q2, alpha):
+        calls.append((q1, q2))
+        return pl.hoeffding_bound(
+            q1,
+            q2,
+            alpha,
+            arnolds_example.transition_matrix,
+            arnolds_example.alphabet,
+            arnolds_example.states,
+            statistics=statistics,
+        )
+
+    first = cache.lookup(1, 2, test, 0.9)
+    second = cache.lookup(2, 1, test, 0.9)
+
+    assert first == second
+    assert calls == [(1, 2)]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    checkpoint = statistics.checkpoint()
+    statistics.merge(1, 4)
+
+    cache.lookup(1, 2, test, 0.9)
+
+    assert calls == [(1, 2), (1, 2)]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    statistics.rollback(checkpoint)
+
+    assert cache.lookup(2, 3, test, 0.9) == cache.lookup(3, 2, test, 0.9)
+    assert cache.lookup(2, 1, test, 0.9) == first
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_compatibility_cache_discards_results_of_merged_states(
+    arnolds_example,
+    monkeypatch,
+):
+    monkeypatch.setattr(compatibility_cache_module, "_MIN_PURGE_SIZE", 3)
+
+    statistics = pl.StateStatistics(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+    cache = pl.CompatibilityCache(statistics)
+
+    def test(q1, q2):
+        return True
+
+    cache.lookup(2, 4, test)
+    cache.lookup(1, 3, test)
+
+    statistics.merge(1, 4)
+
+    cache.lookup(3, 5, test)
+
+    assert set(cache._results) == {(3, 5)}
+
+    cache.lookup(1, 3, test)
+
+    assert (cache.hits, cache.misses) == (0, 4)
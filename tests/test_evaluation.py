@@ -99,6 +99,30 @@ def test_get_sequence_probability_table_accepts_generator():
     )
 
 
+def test_get_sequence_probability_table_accepts_integer_codes():
+    probability_matrix, alphabet = _make_probability_matrix()
+
+    obtained_table = pm.get_sequence_probability_table(
+        [np.array([0]), [0], np.array([1])],
+        probability_matrix,
+        alphabet,
+    )
+
+    expected_table = pd.DataFrame(
+        {
+            "sequence": [(0,), (1,)],
+            "count": [2, 1],
+            "empirical_probability": [2 / 3, 1 / 3],
+            "pdfa_probability": [0.60, 0.40],
+        }
+    )
+
+    pd.testing.assert_frame_equal(
+        obtained_table,
+        expected_table,
+    )
+
+
 def test_get_sequence_probability_table_rejects_single_string():
     probability_matrix, alphabet = _make_probability_matrix()
 
@@ -0,0 +1,518 @@
+import importlib
+
+import numpy as np
+import pdfa_learning as pl
+import pytest
+import scipy.sparse as sp
+
+matrix_formats_module = importlib.import_module(
+    "pdfa_learning.matrix_formats",
+)
+
+
+def test_sparse_transition_matrix_round_trip(arnolds_example):
+    sparse_matrix = pl.to_sparse_transition_matrix(arnolds_example.transition_matrix)
+
+    assert len(sparse_matrix) == len(arnolds_example.alphabet)
+    assert all(sp.issparse(m) and m.format == "csr" for m in sparse_matrix)
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(sparse_matrix),
+        arnolds_example.transition_matrix,
+    )
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_get_transition_matrix_sparse_matches_dense(arnolds_example, build):
+    dense_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        build=build,
+    )
+    sparse_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        build=build,
+        sparse=True,
+    )
+
+    assert np.array_equal(pl.to_dense_transition_matrix(sparse_matrix), dense_matrix)
+
+
+def test_validate_transition_matrix_raises_for_non_csr_matrices(simple_pta):
+    with pytest.raises(
+        TypeError,
+        match="list of SciPy CSR matrices",
+    ):
+        pl._validate_transition_matrix(
+            [sp.coo_array(m) for m in simple_pta.transition_matrix],
+            simple_pta.alphabet,
+            simple_pta.states,
+        )
+
+
+def test_validate_transition_matrix_raises_for_sparse_symbol_mismatch(simple_pta):
+    sparse_matrix = pl.to_sparse_transition_matrix(simple_pta.transition_matrix)
+
+    with pytest.raises(
+        ValueError,
+        match="first transition_matrix dimension must equal len",
+    ):
+        pl._validate_transition_matrix(
+            sparse_matrix[:-1],
+            simple_pta.alphabet,
+            simple_pta.states,
+        )
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+@pytest.mark.parametrize("alpha", [0.2, 0.9, 1.5])
+def test_alergia_sparse_matches_dense(simple_pta, arnolds_example, method, alpha):
+    for example in (simple_pta, arnolds_example):
+        dense_result = pl.alergia(
+            example.transition_matrix,
+            example.states,
+            example.alphabet,
+            alpha,
+            method=method,
+        )
+        sparse_result = pl.alergia(
+            pl.to_sparse_transition_matrix(example.transition_matrix),
+            example.states,
+            example.alphabet,
+            alpha,
+            method=method,
+        )
+
+        assert np.array_equal(
+            pl.to_dense_transition_matrix(sparse_result[0]),
+            dense_result[0],
+        )
+        assert sparse_result[1:] == dense_result[1:]
+
+
+def test_check_is_deterministic_sparse_matches_dense(simple_pta):
+    transition_matrix = simple_pta.transition_matrix.copy()
+    transition_matrix[0, 2, 4] = 1
+    transition_matrix[0, 2, 5] = 1
+
+    dense_pairs = pl.check_is_deterministic(
+        transition_matrix,
+        simple_pta.states,
+        simple_pta.alphabet,
+    )
+    sparse_pairs = pl.check_is_deterministic(
+        pl.to_sparse_transition_matrix(transition_matrix),
+        simple_pta.states,
+        simple_pta.alphabet,
+    )
+
+    assert dense_pairs
+    assert sparse_pairs == dense_pairs
+
+
+def test_predecessors_agree_across_formats(arnolds_example):
+    sparse_matrix = pl.to_sparse_transition_matrix(arnolds_example.transition_matrix)
+    delta_table = pl.to_delta_table(arnolds_example.transition_matrix)
+
+    for i in range(len(arnolds_example.states)):
+        expected = matrix_formats_module._predecessors(
+            arnolds_example.transition_matrix,
+            i,
+        )
+
+        assert np.array_equal(
+            matrix_formats_module._predecessors(sparse_matrix, i),
+            expected,
+        )
+        assert np.array_equal(
+            matrix_formats_module._predecessors(delta_table, i),
+            expected,
+        )
+
+    assert matrix_formats_module._predecessors(
+        arnolds_example.transition_matrix,
+        2,
+    ).tolist() == [1]
+
+
+def test_probability_transition_matrix_sparse_matches_dense(simple_pta):
+    dense_matrix = pl.probability_transition_matrix(
+        simple_pta.final_transition_matrix,
+        simple_pta.final_states,
+        simple_pta.alphabet,
+    )
+    sparse_matrix = pl.probability_transition_matrix(
+        pl.to_sparse_transition_matrix(simple_pta.final_transition_matrix),
+        simple_pta.final_states,
+        simple_pta.alphabet,
+    )
+
+    assert np.allclose(pl.to_dense_transition_matrix(sparse_matrix), dense_matrix)
+
+
+def test_probability_estimates_sparse_match_dense(jacquemont_example):
+    p_mat = jacquemont_example.probability_matrix
+    sparse_p_mat = pl.to_sparse_transition_matrix(p_mat)
+    alphabet = jacquemont_example.alphabet
+
+    for symbol in alphabet:
+        assert np.allclose(
+            pl.probability_estimate_of_symbol(sparse_p_mat, symbol, alphabet),
+            pl.probability_estimate_of_symbol(p_mat, symbol, alphabet),
+        )
+        assert np.allclose(
+            pl.probability_sequence_contains_letter_at_distance_theta(
+                sparse_p_mat, symbol, 2, alphabet
+            ),
+            pl.probability_sequence_contains_letter_at_distance_theta(
+                p_mat, symbol, 2, alphabet
+            ),
+        )
+
+    for pattern in pl.string_enumerator(alphabet, 3):
+        assert np.isclose(
+            pl.probability_estimate_of_exact_sequence(sparse_p_mat, pattern, alphabet),
+            pl.probability_estimate_of_exact_sequence(p_mat, pattern, alphabet),
+        )
+
+        if len(pattern) < 2:
+            continue
+
+        assert np.allclose(
+            pl.probability_estimate_of_pattern(sparse_p_mat, pattern, alphabet),
+            pl.probability_estimate_of_pattern(p_mat, pattern, alphabet),
+        )
+        assert np.allclose(
+            pl.probability_to_encounter_a_pattern_at_a_distance_theta(
+                sparse_p_mat, pattern, 1, alphabet
+            ),
+            pl.probability_to_encounter_a_pattern_at_a_distance_theta(
+                p_mat, pattern, 1, alphabet
+            ),
+        )
+
+    assert np.allclose(
+        pl.probability_sequence_contains_digram(sparse_p_mat, "ab", alphabet),
+        pl.probability_sequence_contains_digram(p_mat, "ab", alphabet),
+    )
+
+
+def test_update_transition_matrix_sparse_matches_dense(arnolds_example):
+    dense_result = pl.update_transition_matrix(
+        ["ABD", "CA", "AB"],
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+    sparse_result = pl.update_transition_matrix(
+        ["ABD", "CA", "AB"],
+        pl.to_sparse_transition_matrix(arnolds_example.transition_matrix),
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(sparse_result[0]),
+        dense_result[0],
+    )
+    assert sparse_result[1:] == dense_result[1:]
+
+
+def test_delta_table_round_trip(arnolds_example):
+    delta_table = pl.to_delta_table(arnolds_example.transition_matrix)
+
+    assert delta_table.destinations.shape == (
+        len(arnolds_example.states),
+        len(arnolds_example.alphabet),
+    )
+    assert delta_table.destinations[0, 0] == 1
+    assert delta_table.counts[0, 0] == 10
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(delta_table),
+        arnolds_example.transition_matrix,
+    )
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(pl.to_sparse_transition_matrix(delta_table)),
+        arnolds_example.transition_matrix,
+    )
+
+
+def test_delta_table_final_counts_match_endpoints(simple_pta):
+    delta_table = pl.to_delta_table(simple_pta.transition_matrix)
+
+    expected_final_counts = [0] + [
+        pl.get_endpoint(q, simple_pta.transition_matrix, simple_pta.states)
+        for q in simple_pta.states[1:]
+    ]
+
+    assert np.array_equal(delta_table.final_counts, expected_final_counts)
+
+
+def test_to_delta_table_raises_for_nondeterministic_matrix(simple_pta):
+    transition_matrix = simple_pta.transition_matrix.copy()
+    transition_matrix[0, 2, 4] = 1
+    transition_matrix[0, 2, 5] = 1
+
+    with pytest.raises(
+        ValueError,
+        match="must be deterministic to be stored as a delta table",
+    ):
+        pl.to_delta_table(transition_matrix)
+
+
+def test_validate_transition_matrix_raises_for_delta_table_shape(simple_pta):
+    delta_table = pl.to_delta_table(simple_pta.transition_matrix)
+
+    with pytest.raises(
+        ValueError,
+        match="must have shape",
+    ):
+        pl._validate_transition_matrix(
+            delta_table,
+            simple_pta.alphabet,
+            simple_pta.states[:-1],
+        )
+
+
+def test_check_is_deterministic_delta_table(simple_pta):
+    delta_table = pl.to_delta_table(simple_pta.transition_matrix)
+
+    assert pl.check_is_deterministic(
+        delta_table,
+        simple_pta.states,
+        simple_pta.alphabet,
+    ) == []
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+def test_alergia_delta_table_matches_dense(arnolds_example, method):
+    dense_result = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+    )
+    delta_result = pl.alergia(
+        pl.to_delta_table(arnolds_example.transition_matrix),
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+    )
+
+    assert isinstance(delta_result[0], pl.DeltaTable)
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(delta_result[0]),
+        dense_result[0],
+    )
+    assert delta_result[1:] == dense_result[1:]
+
+
+def test_probability_estimate_of_exact_sequence_delta_table(arnolds_example):
+    learned_matrix, learned_states, _ = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+    )
+    p_mat = pl.probability_transition_matrix(
+        learned_matrix,
+        learned_states,
+        arnolds_example.alphabet,
+    )
+    delta_p_mat = pl.probability_transition_matrix(
+        pl.to_delta_table(learned_matrix),
+        learned_states,
+        arnolds_example.alphabet,
+    )
+
+    assert isinstance(delta_p_mat, pl.DeltaTable)
+    assert np.allclose(pl.to_dense_transition_matrix(delta_p_mat), p_mat)
+
+    for sequence in pl.string_enumerator(arnolds_example.alphabet, 3):
+        assert np.isclose(
+            pl.probability_estimate_of_exact_sequence(
+                delta_p_mat, sequence, arnolds_example.alphabet
+            ),
+            pl.probability_estimate_of_exact_sequence(
+                p_mat, sequence, arnolds_example.alphabet
+            ),
+        )
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_get_transition_matrix_memmap_matches_dense(arnolds_example, build, tmp_path):
+    delta_table = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        build=build,
+        memmap=tmp_path,
+    )
+
+    assert isinstance(delta_table.counts, np.memmap)
+    assert not delta_table.counts.flags.writeable
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(delta_table),
+        pl.get_transition_matrix(
+            arnolds_example.sequences,
+            arnolds_example.alphabet,
+            build=build,
+        ),
+    )
+
+    loaded_table, states, alphabet = pl.load_delta_table(tmp_path)
+
+    assert states == arnolds_example.states
+    assert alphabet == arnolds_example.alphabet
+    assert all(
+        np.array_equal(loaded_array, array)
+        for loaded_array, array in zip(loaded_table, delta_table)
+    )
+
+
+def test_alergia_on_loaded_delta_table(arnolds_example, tmp_path):
+    pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        memmap=tmp_path / "ppta",
+    )
+    delta_table, states, alphabet = pl.load_delta_table(tmp_path / "ppta")
+
+    learned_table, learned_states, _ = pl.alergia(delta_table, states, alphabet, 0.9)
+    dense_result = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+    )
+
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(learned_table),
+        dense_result[0],
+    )
+    assert learned_states == dense_result[1]
+
+    p_mat = pl.probability_transition_matrix(learned_table, learned_states, alphabet)
+    pl.save_delta_table(p_mat, learned_states, alphabet, tmp_path / "pdfa")
+    loaded_p_mat, loaded_states, _ = pl.load_delta_table(tmp_path / "pdfa")
+
+    assert loaded_states == learned_states
+
+    for sequence in pl.string_enumerator(alphabet, 3):
+        assert pl.probability_estimate_of_exact_sequence(
+            loaded_p_mat, sequence, alphabet
+        ) == pl.probability_estimate_of_exact_sequence(p_mat, sequence, alphabet)
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+def test_alergia_reads_delta_table_in_chunks(arnolds_example, method, monkeypatch, tmp_path):
+    monkeypatch.setattr(matrix_formats_module, "_DELTA_CHUNK_ROWS", 2)
+
+    delta_table = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        memmap=tmp_path,
+    )
+
+    learned_table, learned_states, _ = pl.alergia(
+        delta_table,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+    )
+    dense_result = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+    )
+
+    assert isinstance(learned_table, pl.DeltaTable)
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(learned_table),
+        dense_result[0],
+    )
+    assert learned_states == dense_result[1]
+
+
+def test_probability_transition_matrix_memmap_matches_delta_table(
+    arnolds_example, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(matrix_formats_module, "_DELTA_CHUNK_ROWS", 2)
+
+    delta_table = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        memmap=tmp_path / "ppta",
+    )
+
+    p_mat = pl.probability_transition_matrix(
+        delta_table,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        memmap=tmp_path / "pdfa",
+    )
+    expected = pl.probability_transition_matrix(
+        pl.to_delta_table(arnolds_example.transition_matrix),
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+
+    assert isinstance(p_mat.counts, np.memmap)
+    assert not p_mat.counts.flags.writeable
+    assert all(
+        np.array_equal(array, expected_array, equal_nan=True)
+        for array, expected_array in zip(p_mat, expected)
+    )
+
+    loaded_p_mat, states, _ = pl.load_delta_table(tmp_path / "pdfa")
+
+    assert states == arnolds_example.states
+    assert all(
+        np.array_equal(array, expected_array, equal_nan=True)
+        for array, expected_array in zip(loaded_p_mat, expected)
+    )
+
+
+def test_probability_transition_matrix_raises_for_dense_memmap(simple_pta, tmp_path):
+    with pytest.raises(
+        ValueError,
+        match="memmap can only be given for a delta table",
+    ):
+        pl.probability_transition_matrix(
+            simple_pta.transition_matrix,
+            simple_pta.states,
+            simple_pta.alphabet,
+            memmap=tmp_path,
+        )
+
+
+def test_save_delta_table_raises_for_unsaveable_states(simple_pta, tmp_path):
+    delta_table = pl.to_delta_table(simple_pta.transition_matrix)
+
+    with pytest.raises(
+        ValueError,
+        match="states must begin with",
+    ):
+        pl.save_delta_table(
+            delta_table,
+            ["*"] + [str(state) for state in simple_pta.states[1:]],
+            simple_pta.alphabet,
+            tmp_path,
+        )
+
+
+def test_get_transition_matrix_raises_for_sparse_memmap(simple_pta, tmp_path):
+    with pytest.raises(
+        ValueError,
+        match="sparse and memmap cannot both be given",
+    ):
+        pl.get_transition_matrix(
+            simple_pta.sequences,
+            simple_pta.alphabet,
+            sparse=True,
+            memmap=tmp_path,
+        )
@@ -0,0 +1,172 @@
+import numpy as np
+import pdfa_learning as pl
+import pytest
+
+
+def test_merge_engine_merge_matches_merge_two_states(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+
+    surviving_state, removed_state = engine.merge(3, 1)
+
+    expected_matrix, expected_states = pl.merge_two_states(
+        3,
+        1,
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+
+    obtained_matrix, obtained_states = engine.compact()
+
+    assert (surviving_state, removed_state) == (1, 3)
+    assert np.array_equal(obtained_matrix, expected_matrix)
+    assert obtained_states == expected_states
+    assert engine.states == expected_states
+    assert engine.find(3) == 1
+
+
+def test_merge_engine_nondeterministic_pairs_match_check(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+
+    engine.merge(0, 1)
+
+    merged_matrix, merged_states = engine.compact()
+
+    assert engine.nondeterministic_pairs() == pl.check_is_deterministic(
+        merged_matrix,
+        merged_states,
+        arnolds_example.alphabet,
+    )
+    assert len(engine.nondeterministic_pairs()) > 0
+
+
+def test_merge_engine_next_nondeterministic_pair_follows_worklist(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+
+    assert engine.next_nondeterministic_pair() is None
+
+    engine.merge(0, 1)
+
+    while engine.nondeterministic_pairs():
+        expected_pair = engine.nondeterministic_pairs()[0]
+
+        assert engine.next_nondeterministic_pair() == expected_pair
+
+        engine.merge(*expected_pair)
+
+    assert engine.next_nondeterministic_pair() is None
+
+
+def test_merge_engine_rollback_restores_automaton(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+
+    checkpoint = engine.checkpoint()
+
+    engine.merge(0, 1)
+    engine.merge(2, 5)
+
+    engine.rollback(checkpoint)
+
+    obtained_matrix, obtained_states = engine.compact()
+
+    assert np.array_equal(obtained_matrix, arnolds_example.transition_matrix)
+    assert obtained_states == arnolds_example.states
+    assert engine.nondeterministic_pairs() == []
+    assert engine.find(1) == 1
+    assert engine.statistics.n(1) == pl.get_n(
+        1,
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+
+
+def test_merge_engine_states_are_brought_up_to_date_when_read(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+    states = engine.states
+    checkpoint = engine.checkpoint()
+
+    engine.merge(0, 1)
+    engine.merge(2, 5)
+
+    assert engine.states is states
+    assert states == [q for q in arnolds_example.states if q not in (1, 5)]
+    assert states.index(6) == 5
+
+    engine.rollback(checkpoint)
+
+    assert engine.states == arnolds_example.states
+    assert states.index(6) == 7
+
+
+def test_merge_engine_compacts_sparse_matrices(arnolds_example):
+    sparse_matrix = pl.to_sparse_transition_matrix(arnolds_example.transition_matrix)
+
+    engine = pl.MergeEngine(sparse_matrix, arnolds_example.states)
+    engine.merge(3, 1)
+
+    obtained_matrix, _ = engine.compact()
+
+    expected_matrix, _ = pl.merge_two_states(
+        3,
+        1,
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+
+    assert isinstance(obtained_matrix, list)
+    assert np.array_equal(
+        pl.to_dense_transition_matrix(obtained_matrix),
+        expected_matrix,
+    )
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+def test_recursive_merge_in_place_matches_matrix_merge(simple_pta, method):
+    red_states = [0, 1] if method == "de_la_higuera" else None
+
+    expected = pl._recursive_merge_two_states(
+        1,
+        2,
+        simple_pta.transition_matrix,
+        pl.StateRegistry(simple_pta.states),
+        0.2,
+        simple_pta.alphabet,
+        red_states=red_states,
+        method=method,
+    )
+
+    engine = pl.MergeEngine(simple_pta.transition_matrix, simple_pta.states)
+
+    obtained = pl._recursive_merge_two_states(
+        1,
+        2,
+        engine,
+        engine.states,
+        0.2,
+        simple_pta.alphabet,
+        red_states=red_states,
+        method=method,
+    )
+
+    obtained_matrix, obtained_states = engine.compact()
+
+    assert obtained[0] is engine
+    assert np.array_equal(obtained_matrix, expected[0])
+    assert obtained_states == expected[1]
+    assert obtained[2:] == expected[2:]
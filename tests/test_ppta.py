@@ -1,7 +1,17 @@
+import importlib
+import itertools
+import os
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+
 import numpy as np
 import pdfa_learning as pl
 import pytest
 
+ppta_module = importlib.import_module(
+    "pdfa_learning.ppta"
+)
+
 
 def test_validate_sequences_raises_for_none():
     with pytest.raises(
@@ -45,6 +55,95 @@ def test_validate_sequences_raises_for_non_string_sequences(
         pl._validate_sequences(invalid_sequences)
 
 
+def test_iter_sequence_counts_accepts_mappings_and_pairs():
+    obtained_from_mapping = list(
+        pl._iter_sequence_counts(Counter(["AB", "AB", "B"]))
+    )
+    obtained_from_pairs = list(pl._iter_sequence_counts([("AB", 2), "B"]))
+
+    expected = [("AB", 2), ("B", 1)]
+
+    assert obtained_from_mapping == expected
+    assert obtained_from_pairs == expected
+
+
+def test_iter_sequence_counts_accepts_token_tuples():
+    obtained_tokens = list(
+        pl._iter_sequence_counts([("ADM", "DIS"), (("ADM", "DIS"), 2), ""])
+    )
+    obtained_codes = list(pl._iter_sequence_counts([(0, 1), ((0, 1), 3)]))
+
+    assert obtained_tokens == [(("ADM", "DIS"), 1), (("ADM", "DIS"), 2), ("", 1)]
+    assert obtained_codes == [((0, 1), 1), ((0, 1), 3)]
+
+
+@pytest.mark.parametrize(
+    "invalid_sequences, message",
+    [
+        (["AB", ["A", "B"]], "must not mix strings and lists of tokens"),
+        ([["A"], [0, 1]], "must not mix integer-coded and symbol sequences"),
+    ],
+)
+def test_iter_sequence_counts_raises_for_mixed_sequence_kinds(
+    invalid_sequences, message
+):
+    with pytest.raises(ValueError, match=message):
+        list(pl._iter_sequence_counts(invalid_sequences))
+
+
+@pytest.mark.parametrize(
+    "invalid_sequences",
+    [
+        [("AB", 1.5)],
+        [("AB", None)],
+        {"AB": None},
+    ],
+)
+def test_iter_sequence_counts_raises_for_non_integer_counts(
+    invalid_sequences,
+):
+    with pytest.raises(
+        TypeError,
+        match="every sequence count must be an integer",
+    ):
+        list(pl._iter_sequence_counts(invalid_sequences))
+
+
+@pytest.mark.parametrize(
+    "invalid_sequences",
+    [
+        [("AB", 0)],
+        {"AB": 2, "B": -1},
+    ],
+)
+def test_iter_sequence_counts_raises_for_non_positive_counts(
+    invalid_sequences,
+):
+    with pytest.raises(
+        ValueError,
+        match="every sequence count must be positive",
+    ):
+        list(pl._iter_sequence_counts(invalid_sequences))
+
+
+@pytest.mark.parametrize(
+    "invalid_sequences",
+    [
+        ["AB", 1],
+        [(1, "A")],
+        [("AB", 1, 2)],
+    ],
+)
+def test_iter_sequence_counts_raises_for_non_string_sequences(
+    invalid_sequences,
+):
+    with pytest.raises(
+        TypeError,
+        match="every sequence must be a string",
+    ):
+        list(pl._iter_sequence_counts(invalid_sequences))
+
+
 def test_validate_alphabet_raises_for_none():
     with pytest.raises(
         TypeError,
@@ -90,20 +189,24 @@ def test_validate_alphabet_raises_for_non_string_symbols(
 @pytest.mark.parametrize(
     "invalid_alphabet_sizes",
     [
-        ["A", "AB"],
+        ["A", ""],
         ["", "BC"],
     ],
 )
-def test_validate_alphabet_raises_for_non_single_character_symbols(
+def test_validate_alphabet_raises_for_empty_symbols(
     invalid_alphabet_sizes,
 ):
     with pytest.raises(
         ValueError,
-        match="every alphabet symbol must contain exactly one character.",
+        match="every alphabet symbol must be a non-empty string.",
     ):
         pl._validate_alphabet(invalid_alphabet_sizes)
 
 
+def test_validate_alphabet_accepts_multi_character_symbols():
+    assert pl._validate_alphabet(["ADM", "DIS", "XRAY"]) == ["ADM", "DIS", "XRAY"]
+
+
 def test_validate_alphabet_raises_for_duplicate_symbols():
     with pytest.raises(
         ValueError,
@@ -320,3 +423,559 @@ def test_get_initial_states_arnolds_example(arnolds_example):
     obtained_states = pl.get_initial_states(arnolds_example.sequences)
     expected_states = ["*", 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
     assert obtained_states == expected_states
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_get_transition_matrix_follows_state_path_order(arnolds_example, build):
+    sequences = arnolds_example.sequences
+    alphabet = arnolds_example.alphabet
+
+    obtained_transition_matrix = pl.get_transition_matrix(
+        sequences,
+        alphabet,
+        build=build,
+    )
+
+    state_paths = ["*"] + pl.get_state_paths(sequences, build=build)
+    n = len(state_paths)
+
+    expected_transition_matrix = np.zeros((len(alphabet), n, n), dtype=int)
+    expected_transition_matrix[0, 0, 1] = len(sequences)
+
+    for i, path in enumerate(state_paths[1:], start=1):
+        for k, symbol in enumerate(alphabet):
+            if path + symbol in state_paths:
+                expected_transition_matrix[
+                    k, i, state_paths.index(path + symbol)
+                ] = len([x for x in sequences if x.startswith(path + symbol)])
+
+    assert np.array_equal(obtained_transition_matrix, expected_transition_matrix)
+
+
+def test_get_transition_matrix_raises_for_invalid_build(simple_pta):
+    with pytest.raises(
+        ValueError,
+        match="build must be either 'breadth' or 'depth'.",
+    ):
+        pl.get_transition_matrix(
+            simple_pta.sequences,
+            simple_pta.alphabet,
+            build="invalid",
+        )
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_get_state_paths_with_repeated_and_empty_sequences(build):
+    sequences = ["", "BA", "A", "BA", "", "BB", "A"]
+
+    obtained_state_paths = pl.get_state_paths(sequences, build)
+    expected_state_paths = ["", "A", "B", "BA", "BB"]
+
+    assert obtained_state_paths == expected_state_paths
+    assert pl.get_initial_states(sequences) == ["*", 0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize(
+    "aggregate",
+    [
+        Counter,
+        lambda sequences: list(Counter(sequences).items()),
+    ],
+)
+def test_ppta_construction_accepts_aggregated_sequences(arnolds_example, aggregate):
+    sequences = arnolds_example.sequences * 3 + ["AB", "BCA"]
+    aggregated = aggregate(sequences)
+
+    assert pl.get_alphabet(aggregated) == pl.get_alphabet(sequences)
+    assert pl.get_initial_states(aggregated) == pl.get_initial_states(sequences)
+
+    for build in ["breadth", "depth"]:
+        assert pl.get_state_paths(aggregated, build) == pl.get_state_paths(
+            sequences, build
+        )
+        assert np.array_equal(
+            pl.get_transition_matrix(aggregated, arnolds_example.alphabet, build),
+            pl.get_transition_matrix(sequences, arnolds_example.alphabet, build),
+        )
+
+
+def test_read_sequences_streams_lines_from_file(tmp_path):
+    filepath = tmp_path / "sequences.txt"
+    filepath.write_text("AB\nABA\r\n\nBC\n")
+
+    obtained_from_path = list(pl.read_sequences(filepath))
+
+    with open(filepath) as f:
+        obtained_from_file = list(pl.read_sequences(f))
+
+    expected = ["AB", "ABA", "", "BC"]
+
+    assert obtained_from_path == expected
+    assert obtained_from_file == expected
+
+
+def test_ppta_construction_accepts_streamed_sequences(arnolds_example, tmp_path):
+    filepath = tmp_path / "sequences.txt"
+    filepath.write_text("\n".join(arnolds_example.sequences) + "\n")
+
+    chunks = (
+        arnolds_example.sequences[i : i + 3]
+        for i in range(0, len(arnolds_example.sequences), 3)
+    )
+
+    assert pl.get_alphabet(pl.read_sequences(filepath)) == arnolds_example.alphabet
+    assert np.array_equal(
+        pl.get_transition_matrix(
+            pl.read_sequences(filepath),
+            arnolds_example.alphabet,
+        ),
+        arnolds_example.transition_matrix,
+    )
+    assert np.array_equal(
+        pl.get_transition_matrix(
+            itertools.chain.from_iterable(chunks),
+            arnolds_example.alphabet,
+        ),
+        arnolds_example.transition_matrix,
+    )
+    assert pl.get_initial_states(
+        sequence for sequence in arnolds_example.sequences
+    ) == arnolds_example.states
+
+
+def test_ppta_construction_raises_for_empty_stream():
+    with pytest.raises(
+        ValueError,
+        match="sequences must contain at least one sequence",
+    ):
+        pl.get_alphabet(sequence for sequence in [])
+
+
+def _prefix_counts(transition_matrix, alphabet):
+    prefix_counts = {"": transition_matrix[0, 0, 1]}
+    to_visit = [("", 1)]
+
+    while to_visit:
+        path, i = to_visit.pop()
+
+        for k, j in zip(*np.nonzero(transition_matrix[:, i, :])):
+            prefix_counts[path + alphabet[k]] = transition_matrix[k, i, j]
+            to_visit.append((path + alphabet[k], j))
+
+    return prefix_counts
+
+
+def test_update_transition_matrix_matches_rebuild_for_existing_prefixes(
+    arnolds_example,
+):
+    new_sequences = ["AB", "BCA", "ACC"]
+
+    obtained_matrix, obtained_states, obtained_alphabet = pl.update_transition_matrix(
+        new_sequences,
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+
+    expected_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences + new_sequences,
+        arnolds_example.alphabet,
+    )
+
+    assert np.array_equal(obtained_matrix, expected_matrix)
+    assert obtained_states == arnolds_example.states
+    assert obtained_alphabet == arnolds_example.alphabet
+
+
+def test_update_transition_matrix_adds_states_and_symbols(arnolds_example):
+    new_sequences = {"ABD": 2, "CA": 1, "": 3}
+
+    obtained_matrix, obtained_states, obtained_alphabet = pl.update_transition_matrix(
+        new_sequences,
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+
+    all_sequences = arnolds_example.sequences + ["ABD", "ABD", "CA", "", "", ""]
+    expected_alphabet = ["A", "B", "C", "D"]
+    expected_matrix = pl.get_transition_matrix(all_sequences, expected_alphabet)
+
+    assert obtained_alphabet == expected_alphabet
+    assert obtained_states == arnolds_example.states + [14, 15, 16]
+    assert _prefix_counts(obtained_matrix, obtained_alphabet) == _prefix_counts(
+        expected_matrix,
+        expected_alphabet,
+    )
+
+
+def test_update_transition_matrix_raises_for_nondeterministic_state():
+    transition_matrix = np.zeros((1, 4, 4), dtype=int)
+    transition_matrix[0, 0, 1] = 2
+    transition_matrix[0, 1, 2] = 1
+    transition_matrix[0, 1, 3] = 1
+
+    with pytest.raises(
+        ValueError,
+        match="transition_matrix must be deterministic",
+    ):
+        pl.update_transition_matrix(
+            ["AA"],
+            transition_matrix,
+            ["*", 0, 1, 2],
+            ["A"],
+        )
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_get_transition_matrix_in_parallel_matches_serial(
+    arnolds_example,
+    monkeypatch,
+    build,
+):
+    monkeypatch.setattr(ppta_module, "_PARALLEL_BATCH_SIZE", 3)
+    monkeypatch.setattr(ppta_module, "_PARALLEL_MIN_SEQUENCES", 4)
+
+    sequences = arnolds_example.sequences * 2 + ["", "CAB"]
+    alphabet = arnolds_example.alphabet
+
+    obtained_transition_matrix = pl.get_transition_matrix(
+        sequences,
+        alphabet,
+        build=build,
+        n_jobs=2,
+    )
+
+    expected_transition_matrix = pl.get_transition_matrix(
+        sequences,
+        alphabet,
+        build=build,
+    )
+
+    assert np.array_equal(obtained_transition_matrix, expected_transition_matrix)
+
+
+@pytest.mark.parametrize("min_sequences", [1, 100])
+@pytest.mark.parametrize(
+    "sequences, error, message",
+    [
+        (["AB", "B", "A", 1], TypeError, "must be a string"),
+        (["AB", "B", "A", ["B", "A"]], ValueError, "must not mix strings"),
+        ({"AB": 1, "A": 2, "BA": 1, "B": -1}, ValueError, "count"),
+        (["AB", "B", "A", ["A", lambda: 0]], Exception, None),
+        ([], ValueError, "at least one sequence"),
+    ],
+)
+def test_build_ppta_in_parallel_raises_for_invalid_sequences(
+    monkeypatch,
+    min_sequences,
+    sequences,
+    error,
+    message,
+):
+    monkeypatch.setattr(ppta_module, "_PARALLEL_BATCH_SIZE", 2)
+    monkeypatch.setattr(ppta_module, "_PARALLEL_MIN_SEQUENCES", min_sequences)
+
+    with pytest.raises(error, match=message):
+        pl.build_ppta(sequences, ["A", "B"], n_jobs=2)
+
+
+class _ExitOnUnpickle:
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+def test_build_ppta_in_parallel_raises_when_a_worker_dies(monkeypatch):
+    monkeypatch.setattr(ppta_module, "_PARALLEL_BATCH_SIZE", 2)
+    monkeypatch.setattr(ppta_module, "_PARALLEL_MIN_SEQUENCES", 1)
+
+    with pytest.raises(BrokenProcessPool):
+        pl.build_ppta(["AB", "B", "A", _ExitOnUnpickle()], ["A", "B"], n_jobs=2)
+
+
+@pytest.mark.parametrize(
+    "n_jobs, error, message",
+    [
+        (0, ValueError, "n_jobs must be a positive integer or -1"),
+        (-2, ValueError, "n_jobs must be a positive integer or -1"),
+        (1.5, TypeError, "n_jobs must be an integer or None"),
+    ],
+)
+def test_get_transition_matrix_raises_for_invalid_n_jobs(
+    simple_pta,
+    n_jobs,
+    error,
+    message,
+):
+    with pytest.raises(error, match=message):
+        pl.get_transition_matrix(
+            simple_pta.sequences,
+            simple_pta.alphabet,
+            n_jobs=n_jobs,
+        )
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_get_transition_matrix_accepts_tokens_and_codes(arnolds_example, build):
+    token_sequences = [list(sequence) for sequence in arnolds_example.sequences]
+    encoded_sequences, alphabet = pl.encode_sequences(arnolds_example.sequences)
+
+    assert alphabet == arnolds_example.alphabet
+    assert all(
+        "".join(alphabet[code] for code in encoded_sequence) == sequence
+        for encoded_sequence, sequence in zip(
+            encoded_sequences,
+            arnolds_example.sequences,
+        )
+    )
+
+    expected_transition_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        alphabet,
+        build=build,
+    )
+
+    for sequences in (token_sequences, encoded_sequences):
+        assert np.array_equal(
+            pl.get_transition_matrix(sequences, alphabet, build=build),
+            expected_transition_matrix,
+        )
+
+
+def test_get_transition_matrix_accepts_multi_character_tokens():
+    sequences = [["ADM", "XRAY", "DIS"], ["ADM", "DIS"], ["ADM", "XRAY"]]
+    alphabet = pl.get_alphabet(sequences)
+
+    transition_matrix = pl.get_transition_matrix(sequences, alphabet)
+
+    assert alphabet == ["ADM", "DIS", "XRAY"]
+    assert transition_matrix[0, 0, 1] == 3
+    assert transition_matrix[0, 1, 2] == 3
+    assert transition_matrix.sum() == 3 + 3 + 1 + 2 + 1
+
+
+def test_get_transition_matrix_raises_for_mixed_codes_and_symbols():
+    with pytest.raises(
+        ValueError,
+        match="integer-coded",
+    ):
+        pl.get_transition_matrix(["AB", [0, 1]], ["A", "B"])
+
+
+def test_encode_sequences_raises_for_missing_symbols():
+    with pytest.raises(
+        ValueError,
+        match="alphabet is missing symbols found in sequences",
+    ):
+        pl.encode_sequences(["AB", "AC"], ["A", "B"])
+
+
+def test_read_sequences_splits_delimited_tokens(tmp_path):
+    filepath = tmp_path / "sequences.txt"
+    filepath.write_text("ADM,XRAY,DIS\n\nADM,DIS\n")
+
+    assert list(pl.read_sequences(filepath, delimiter=",")) == [
+        ["ADM", "XRAY", "DIS"],
+        [],
+        ["ADM", "DIS"],
+    ]
+
+
+def test_update_transition_matrix_accepts_codes(arnolds_example):
+    expected = pl.update_transition_matrix(
+        ["ABC", "CA"],
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+    obtained = pl.update_transition_matrix(
+        [[0, 1, 2], np.array([2, 0])],
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+    )
+
+    assert np.array_equal(obtained[0], expected[0])
+    assert obtained[1:] == expected[1:]
+
+    with pytest.raises(
+        ValueError,
+        match="alphabet is missing symbols found in sequences",
+    ):
+        pl.update_transition_matrix(
+            [[0, 3]],
+            arnolds_example.transition_matrix,
+            arnolds_example.states,
+            arnolds_example.alphabet,
+        )
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_get_transition_matrix_truncates_rare_prefixes(arnolds_example, build):
+    truncated_sequences = [
+        "AB", "AB", "AB", "AB", "AC", "AC", "BA", "BA", "BC", "BC"
+    ]
+
+    obtained_transition_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        build=build,
+        min_count=2,
+    )
+    expected_transition_matrix = pl.get_transition_matrix(
+        truncated_sequences,
+        arnolds_example.alphabet,
+        build=build,
+    )
+
+    assert np.array_equal(obtained_transition_matrix, expected_transition_matrix)
+    assert pl.get_initial_states(
+        arnolds_example.sequences,
+        min_count=2,
+    ) == pl.get_initial_states(truncated_sequences)
+    assert pl.get_state_paths(
+        arnolds_example.sequences,
+        build=build,
+        min_count=2,
+    ) == pl.get_state_paths(truncated_sequences, build=build)
+
+
+def test_get_transition_matrix_folds_deep_prefixes_into_sink(arnolds_example):
+    transition_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        max_depth=1,
+        pruning="sink",
+    )
+    states = pl.get_initial_states(
+        arnolds_example.sequences,
+        max_depth=1,
+        pruning="sink",
+    )
+
+    assert states == ["*", 0, 1, 2, 3]
+    assert pl.get_state_paths(
+        arnolds_example.sequences,
+        max_depth=1,
+        pruning="sink",
+    ) == ["", "A", "B", None]
+    assert transition_matrix[:, 2, 4].tolist() == [0, 4, 2]
+    assert transition_matrix[:, 3, 4].tolist() == [2, 0, 2]
+    assert pl.get_endpoint(3, transition_matrix, states) == 10
+    assert pl.check_is_deterministic(
+        transition_matrix,
+        states,
+        arnolds_example.alphabet,
+    ) == []
+
+
+def test_get_transition_matrix_pruning_matches_sparse(arnolds_example):
+    dense_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        min_count=3,
+        pruning="sink",
+    )
+    sparse_matrix = pl.get_transition_matrix(
+        arnolds_example.sequences,
+        arnolds_example.alphabet,
+        sparse=True,
+        min_count=3,
+        pruning="sink",
+    )
+
+    assert np.array_equal(pl.to_dense_transition_matrix(sparse_matrix), dense_matrix)
+
+
+@pytest.mark.parametrize(
+    "options, error, message",
+    [
+        ({"min_count": 0}, ValueError, "min_count must be a positive integer"),
+        ({"min_count": 1.5}, TypeError, "min_count must be an integer"),
+        ({"max_depth": -1}, ValueError, "max_depth must be non-negative"),
+        ({"max_depth": "1"}, TypeError, "max_depth must be an integer or None"),
+        ({"pruning": "drop"}, ValueError, "pruning must be either"),
+    ],
+)
+def test_get_transition_matrix_raises_for_invalid_pruning(
+    simple_pta,
+    options,
+    error,
+    message,
+):
+    with pytest.raises(error, match=message):
+        pl.get_transition_matrix(
+            simple_pta.sequences,
+            simple_pta.alphabet,
+            **options,
+        )
+
+
+@pytest.mark.parametrize("build", ["breadth", "depth"])
+def test_build_ppta_matches_separate_builders(arnolds_example, build):
+    ppta = pl.build_ppta(arnolds_example.sequences, build=build)
+
+    assert ppta.alphabet == arnolds_example.alphabet
+    assert ppta.states == arnolds_example.states
+    assert np.array_equal(
+        ppta.transition_matrix,
+        pl.get_transition_matrix(
+            arnolds_example.sequences,
+            arnolds_example.alphabet,
+            build=build,
+        ),
+    )
+    assert list(ppta.prefix_states) == pl.get_state_paths(
+        arnolds_example.sequences,
+        build=build,
+    )
+    assert list(ppta.prefix_states.values()) == ppta.states[1:]
+
+
+def test_build_ppta_consumes_sequences_once(arnolds_example):
+    ppta = pl.build_ppta(
+        sequence for sequence in arnolds_example.sequences
+    )
+
+    transition_matrix, states, alphabet, prefix_states = ppta
+
+    assert states == arnolds_example.states
+    assert alphabet == arnolds_example.alphabet
+    assert prefix_states["AB"] == 3
+    assert np.array_equal(transition_matrix, arnolds_example.transition_matrix)
+
+    learned_matrix, learned_states, _ = pl.alergia(*ppta[:3], 0.9)
+    expected_matrix, expected_states, _ = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+    )
+
+    assert np.array_equal(learned_matrix, expected_matrix)
+    assert learned_states == expected_states
+
+
+def test_build_ppta_with_sink_omits_sink_prefix(arnolds_example):
+    ppta = pl.build_ppta(
+        arnolds_example.sequences,
+        max_depth=1,
+        pruning="sink",
+    )
+
+    assert ppta.states == ["*", 0, 1, 2, 3]
+    assert ppta.prefix_states == {"": 0, "A": 1, "B": 2}
+
+
+def test_build_ppta_raises_for_codes_without_alphabet():
+    with pytest.raises(
+        TypeError,
+        match="alphabet of integer-coded sequences cannot be derived",
+    ):
+        pl.build_ppta([[0, 1], [1]])
+
+
+@pytest.mark.parametrize("sequences", [[""], ["", ""], {"": 3}])
+def test_build_ppta_raises_for_sequences_without_symbols(sequences):
+    with pytest.raises(ValueError, match="alphabet must contain at least one symbol"):
+        pl.build_ppta(sequences)
@@ -457,3 +457,39 @@ def test_string_probabilities(arnolds_example):
         ("C", 0.06228373702422145),
     ]
     assert obtained_probabilities[0][1] == expected_probabilities[0][1]
+
+
+def test_probability_estimates_accept_integer_codes(jacquemont_example):
+    p_mat = jacquemont_example.probability_matrix
+    alphabet = jacquemont_example.alphabet
+    strings = pl.string_enumerator(alphabet, 3)
+    encoded_strings, _ = pl.encode_sequences(strings, alphabet)
+
+    for string, encoded_string in zip(strings, encoded_strings):
+        assert np.isclose(
+            pl.probability_estimate_of_exact_sequence(p_mat, encoded_string, alphabet),
+            pl.probability_estimate_of_exact_sequence(p_mat, string, alphabet),
+        )
+
+        if len(string) < 2:
+            continue
+
+        assert np.allclose(
+            pl.probability_estimate_of_pattern(p_mat, encoded_string, alphabet),
+            pl.probability_estimate_of_pattern(p_mat, string, alphabet),
+        )
+
+    assert [p for _, p in pl.string_probabilities(p_mat, alphabet, encoded_strings)] == [
+        p for _, p in pl.string_probabilities(p_mat, alphabet, strings)
+    ]
+
+
+def test_string_enumerator_returns_tuples_for_multi_character_symbols():
+    assert pl.string_enumerator(["AB", "C"], 2) == [
+        ("AB",),
+        ("C",),
+        ("AB", "AB"),
+        ("AB", "C"),
+        ("C", "AB"),
+        ("C", "C"),
+    ]
@@ -0,0 +1,73 @@
+import pdfa_learning as pl
+
+
+def test_red_blue_fringe_matches_get_blue_states(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+    fringe = pl.RedBlueFringe(engine, [0])
+
+    fringe.promote(2)
+    fringe.promote(1)
+
+    assert fringe.red == [0, 1, 2]
+
+    engine.merge(1, 3)
+    fringe.update([0, 1, 2])
+
+    expected_blue_states = pl.get_blue_states(
+        engine,
+        fringe.red,
+        engine.states,
+    )
+
+    assert fringe.blue == sorted(set(expected_blue_states))
+    assert (
+        pl.get_blue_states(engine, fringe.red, engine.states, fringe=fringe)
+        == fringe.blue
+    )
+
+
+def test_red_blue_fringe_ignores_rolled_back_merges(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+    fringe = pl.RedBlueFringe(engine, [0])
+    expected_blue_states = list(fringe.blue)
+
+    checkpoint = engine.checkpoint()
+    engine.merge(0, 1)
+    engine.rollback(checkpoint)
+
+    fringe.promote(expected_blue_states[0])
+
+    assert engine.pop_changed_states() == set()
+    assert fringe.blue == sorted(
+        set(pl.get_blue_states(engine, fringe.red, engine.states))
+    )
+
+
+def test_red_blue_fringe_first_follows_key(arnolds_example):
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+    fringe = pl.RedBlueFringe(
+        engine,
+        [0],
+        key=lambda q: (-engine.statistics.n(q), q),
+    )
+
+    while fringe.blue:
+        expected_state = min(
+            fringe.blue,
+            key=lambda q: (-engine.statistics.n(q), q),
+        )
+
+        assert fringe.first() == expected_state
+
+        fringe.promote(expected_state)
+
+    assert fringe.first() is None
@@ -475,6 +475,31 @@ def test_check_is_deterministic_with_multiple_pairs_simple_example(simple_pta):
     assert obtained_nondeterministic_pairs == expected_nondeterministic_pairs
 
 
+def test_check_is_deterministic_restricted_to_candidates(simple_pta):
+    transition_matrix = np.zeros((3, 8, 8), dtype=int)
+    transition_matrix[0, 1, 2] = 15
+    transition_matrix[0, 1, 7] = 2
+    transition_matrix[0, 4, 2] = 1
+    transition_matrix[0, 4, 5] = 5
+    transition_matrix[1, 2, 3] = 7
+    transition_matrix[1, 2, 5] = 1
+
+    obtained_nondeterministic_pairs = pl.check_is_deterministic(
+        transition_matrix,
+        simple_pta.states,
+        simple_pta.alphabet,
+        candidates=[1, 3],
+    )
+
+    assert obtained_nondeterministic_pairs == [(1, 4), (2, 4)]
+    assert pl.check_is_deterministic(
+        pl.to_sparse_transition_matrix(transition_matrix),
+        simple_pta.states,
+        simple_pta.alphabet,
+        candidates=[1, 3],
+    ) == [(1, 4), (2, 4)]
+
+
 def test_recursive_merge_raises_for_invalid_output(simple_pta):
     with pytest.raises(ValueError, match="output_level must be"):
         pl.recursive_merge_two_states(
@@ -501,6 +526,19 @@ def test_recursive_merge_raises_for_invalid_method(simple_pta):
         )
 
 
+def test_recursive_merge_raises_for_negative_min_count(simple_pta):
+    with pytest.raises(ValueError, match="min_count must be"):
+        pl.recursive_merge_two_states(
+            1,
+            2,
+            simple_pta.transition_matrix,
+            simple_pta.states,
+            0.2,
+            simple_pta.alphabet,
+            min_count=-1,
+        )
+
+
 def test_recursive_merge_higuera_requires_red_states(simple_pta):
     with pytest.raises(
         ValueError,
@@ -1067,6 +1105,59 @@ def test_recursive_merge_two_states_with_red_states_arnolds_example_failure(
     assert red_states == arnolds_example.red_states
 
 
+def test_recursive_merge_two_states_min_count_skips_low_count_tests(
+    arnolds_example,
+):
+    (
+        obtained_matrix,
+        obtained_states,
+        obtained_recursive_merge,
+        red_states,
+    ) = pl.recursive_merge_two_states(
+        0,
+        3,
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        0.9,
+        arnolds_example.alphabet,
+        arnolds_example.red_states,
+        method="de_la_higuera",
+        min_count=10**6,
+    )
+
+    engine = pl.MergeEngine(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+
+    in_place_result = pl._recursive_merge_two_states(
+        0,
+        3,
+        engine,
+        engine.states,
+        0.9,
+        arnolds_example.alphabet,
+        arnolds_example.red_states,
+        method="de_la_higuera",
+        min_count=10**6,
+    )
+    expected_matrix, expected_states = engine.compact()
+
+    assert obtained_recursive_merge is True
+    assert in_place_result[2] is True
+    assert np.array_equal(obtained_matrix, expected_matrix)
+    assert obtained_states == expected_states
+    assert red_states == in_place_result[3]
+    assert (
+        pl.check_is_deterministic(
+            obtained_matrix,
+            obtained_states,
+            arnolds_example.alphabet,
+        )
+        == []
+    )
+
+
 def test_recursive_merge_two_states_with_red_states_arnolds_example_merge_red_state(
     arnolds_example,
 ):
@@ -1123,3 +1214,96 @@ def test_recursive_merge_two_states_with_red_states_arnolds_example_merge_red_st
     assert obtained_states == expected_states
     assert obtained_recursive_merge == expected_recursive_merge
     assert red_states == expected_red_states
+
+
+@pytest.mark.parametrize("alpha", [0.05, 0.5, 1.5])
+def test_hoeffding_bound_with_statistics_matches_matrix(arnolds_example, alpha):
+    statistics = pl.StateStatistics(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+    )
+
+    for q1, q2 in pl.get_pairs_to_check(arnolds_example.states):
+        assert pl.hoeffding_bound(
+            q1,
+            q2,
+            alpha,
+            arnolds_example.transition_matrix,
+            arnolds_example.alphabet,
+            arnolds_example.states,
+            statistics=statistics,
+        ) == pl.hoeffding_bound(
+            q1,
+            q2,
+            alpha,
+            arnolds_example.transition_matrix,
+            arnolds_example.alphabet,
+            arnolds_example.states,
+        )
+
+
+@pytest.mark.parametrize("alpha", [0.05, 0.5, 1.5])
+def test_hoeffding_bound_mask_matches_hoeffding_bound(arnolds_example, alpha):
+    pairs = pl.get_pairs_to_check(arnolds_example.states)
+
+    mask = pl.hoeffding_bound_mask(
+        pairs,
+        alpha,
+        arnolds_example.transition_matrix,
+        arnolds_example.alphabet,
+        arnolds_example.states,
+    )
+
+    expected = [
+        pl.hoeffding_bound(
+            q1,
+            q2,
+            alpha,
+            arnolds_example.transition_matrix,
+            arnolds_example.alphabet,
+            arnolds_example.states,
+        )
+        for q1, q2 in pairs
+    ]
+
+    assert mask.dtype == bool
+    assert mask.tolist() == expected
+
+
+def test_hoeffding_bound_mask_handles_no_pairs(arnolds_example):
+    mask = pl.hoeffding_bound_mask(
+        [],
+        0.05,
+        arnolds_example.transition_matrix,
+        arnolds_example.alphabet,
+        arnolds_example.states,
+    )
+
+    assert mask.shape == (0,)
+
+
+def test_hoeffding_bound_mask_accepts_low_count_pairs(arnolds_example):
+    pairs = pl.get_pairs_to_check(arnolds_example.states)
+    arguments = (
+        pairs,
+        2,
+        arnolds_example.transition_matrix,
+        arnolds_example.alphabet,
+        arnolds_example.states,
+    )
+
+    mask = pl.hoeffding_bound_mask(*arguments)
+    low_count_mask = pl.hoeffding_bound_mask(*arguments, min_count=3)
+
+    expected = [
+        compatible
+        or min(
+            pl.get_n(q, arnolds_example.transition_matrix, arnolds_example.states)
+            for q in pair
+        )
+        < 3
+        for pair, compatible in zip(pairs, mask)
+    ]
+
+    assert low_count_mask.tolist() == expected
+    assert low_count_mask.sum() > mask.sum()
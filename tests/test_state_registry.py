@@ -0,0 +1,68 @@
+import numpy as np
+import pdfa_learning as pl
+import pytest
+
+
+def test_state_registry_index_follows_modifications():
+    states = pl.StateRegistry(["*", 0, 1, 2, 3])
+
+    assert states.index(2) == 3
+    assert 3 in states
+
+    states.remove(1)
+
+    assert states == ["*", 0, 2, 3]
+    assert states.index(2) == 2
+    assert 1 not in states
+
+    states.append(7)
+    states.insert(1, 5)
+
+    assert [states.index(q) for q in states] == list(range(len(states)))
+
+
+def test_state_registry_raises_for_unknown_state():
+    states = pl.StateRegistry(["*", 0, 1])
+
+    with pytest.raises(ValueError, match="is not in list"):
+        states.index(4)
+
+
+def test_state_registry_copy_is_independent():
+    states = pl.StateRegistry(["*", 0, 1, 2])
+    states_copy = states.copy()
+
+    states_copy.remove(0)
+
+    assert isinstance(states_copy, pl.StateRegistry)
+    assert states.index(2) == 3
+    assert states_copy.index(2) == 2
+
+
+def test_get_initial_states_returns_registry(arnolds_example):
+    states = pl.get_initial_states(arnolds_example.sequences)
+
+    assert isinstance(states, pl.StateRegistry)
+    assert states == arnolds_example.states
+
+
+@pytest.mark.parametrize("method", ["carrasco", "de_la_higuera"])
+def test_alergia_accepts_state_registry(arnolds_example, method):
+    list_result = pl.alergia(
+        arnolds_example.transition_matrix,
+        arnolds_example.states,
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+    )
+    registry_result = pl.alergia(
+        arnolds_example.transition_matrix,
+        pl.StateRegistry(arnolds_example.states),
+        arnolds_example.alphabet,
+        0.9,
+        method=method,
+    )
+
+    assert np.array_equal(registry_result[0], list_result[0])
+    assert registry_result[1:] == list_result[1:]
+    assert isinstance(registry_result[1], pl.StateRegistry)
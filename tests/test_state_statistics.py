@@ -359,3 +359,111 @@ def test_get_pi_endpoint_arnolds_example(arnolds_example):
     ]
     expected_endpoints = [0, 0, 0, 1 / 4, 1 / 2, 1, 1, 0, 1, 1, 1 / 2, 1 / 2, 1, 1]
     assert np.allclose(obtained_endpoints, expected_endpoints)
+
+
+@pytest.mark.parametrize(
+    "to_format",
+    [
+        lambda m: m,
+        pl.to_sparse_transition_matrix,
+        pl.to_delta_table,
+    ],
+)
+def test_state_statistics_match_state_functions(arnolds_example, to_format):
+    transition_matrix = arnolds_example.transition_matrix
+    states = arnolds_example.states
+
+    statistics = pl.StateStatistics(to_format(transition_matrix), states)
+
+    for q in states[1:]:
+        assert statistics.n(q) == pl.get_n(q, transition_matrix, states)
+        assert statistics.endpoint(q) == pl.get_endpoint(
+            q, transition_matrix, states
+        )
+        assert statistics.pi(q).tolist() == [
+            pl.get_pi(q, z, transition_matrix, states)
+            for z in range(len(arnolds_example.alphabet))
+        ]
+
+
+def test_state_statistics_follow_merges_and_rollback(arnolds_example):
+    transition_matrix = arnolds_example.transition_matrix
+    states = arnolds_example.states
+
+    statistics = pl.StateStatistics(transition_matrix, states)
+    checkpoint = statistics.checkpoint()
+
+    merged_matrix, merged_states = pl.merge_two_states(
+        1, 4, transition_matrix, states, arnolds_example.alphabet
+    )
+    statistics.merge(1, 4)
+
+    assert statistics.merged_since(checkpoint) == [1]
+    assert statistics.version(1) == 1
+    assert statistics.version(2) == 0
+
+    for q in merged_states[1:]:
+        assert statistics.n(q) == pl.get_n(q, merged_matrix, merged_states)
+        assert statistics.endpoint(q) == pl.get_endpoint(
+            q, merged_matrix, merged_states
+        )
+
+    statistics.rollback(checkpoint)
+
+    assert statistics.version(1) == 0
+
+    statistics.merge(1, 4)
+
+    assert statistics.version(1) == 2
+
+    statistics.rollback(checkpoint)
+
+    for q in states[1:]:
+        assert statistics.n(q) == pl.get_n(q, transition_matrix, states)
+        assert statistics.endpoint(q) == pl.get_endpoint(
+            q, transition_matrix, states
+        )
+
+
+@pytest.mark.parametrize(
+    "to_format",
+    [
+        lambda m: m,
+        pl.to_sparse_transition_matrix,
+        pl.to_delta_table,
+    ],
+)
+def test_all_state_statistics_match_state_functions(arnolds_example, to_format):
+    transition_matrix = arnolds_example.transition_matrix
+    states = arnolds_example.states
+    converted_matrix = to_format(transition_matrix)
+
+    n = pl.get_all_n(converted_matrix)
+    endpoints = pl.get_all_endpoints(converted_matrix)
+    pi = pl.get_all_pi(converted_matrix)
+    pi_endpoints = pl.get_all_pi_endpoints(converted_matrix)
+
+    assert pi.shape == (len(states), len(arnolds_example.alphabet))
+    assert np.isnan(pi[0]).all()
+    assert np.isnan(pi_endpoints[0])
+
+    for i, q in enumerate(states[1:], start=1):
+        assert n[i] == pl.get_n(q, transition_matrix, states)
+        assert endpoints[i] == pl.get_endpoint(q, transition_matrix, states)
+        assert pi[i].tolist() == [
+            pl.get_pi(q, z, transition_matrix, states)
+            for z in range(len(arnolds_example.alphabet))
+        ]
+        assert np.isclose(
+            pi_endpoints[i],
+            pl.get_pi_endpoint(
+                q, transition_matrix, arnolds_example.alphabet, states
+            ),
+        )
+
+
+def test_get_all_pi_endpoints_is_zero_for_non_terminating_states(simple_pta):
+    pi_endpoints = pl.get_all_pi_endpoints(simple_pta.transition_matrix)
+    endpoints = pl.get_all_endpoints(simple_pta.transition_matrix)
+
+    assert np.array_equal(pi_endpoints[1:] == 0, endpoints[1:] == 0)